@@ -44,6 +44,12 @@ def test_setting_changed_handler(**kwargs):
     elif kwargs['setting'].startswith('AVOCADO_'):
         key = kwargs['setting'][8:]
         value = kwargs['value']
+
+        # The override is being disabled, restore the configured setting
+        if not hasattr(django_settings, kwargs['setting']):
+            value = getattr(django_settings, 'AVOCADO', {}).get(
+                key, getattr(global_settings, key, None))
+
         setattr(settings._wrapped, key, value)
 
 
@@ -166,6 +172,42 @@ class Objectset(Dependency):
             return False
 
 
+class Numpy(Dependency):
+    """NumPy provides array-backed implementations of the statistical
+    routines in `avocado.stats`, such as k-means clustering, which are
+    significantly faster on large numeric fields. The pure Python versions
+    are used when it is not installed.
+
+    Install by doing `pip install numpy`.
+    """
+
+    name = 'numpy'
+
+    def test_install(self):
+        try:
+            import numpy    # noqa
+        except ImportError:
+            return False
+
+
+class Pyarrow(Dependency):
+    """Apache Arrow is used by the Parquet exporter to write typed, columnar
+    files which are much smaller and faster to load than CSV, e.g. into
+    pandas.
+
+    Install by doing `pip install pyarrow`.
+    """
+
+    name = 'pyarrow'
+
+    def test_install(self):
+        try:
+            import pyarrow              # noqa
+            import pyarrow.parquet      # noqa
+        except ImportError:
+            return False
+
+
 # Keep track of the officially supported apps and libraries used for various
 # features.
 OPTIONAL_DEPS = {
@@ -173,6 +215,8 @@ OPTIONAL_DEPS = {
     'openpyxl': Openpyxl(),
     'guardian': Guardian(),
     'objectset': Objectset(),
+    'numpy': Numpy(),
+    'pyarrow': Pyarrow(),
 }
 
 
@@ -99,3 +99,115 @@ VALIDATION_WARNINGS = {}
 # Toggle whether DataField instances should cache the underlying data
 # for their most common data access methods.
 DATA_CACHE_ENABLED = True
+
+# Toggle an in-process LRU cache in front of the Django cache for the data
+# cached by DataField instances. This saves a round trip to the cache backend
+# for frequently accessed values. The cache keys include the `data_version`
+# of the field so stale entries are never used after the version changes.
+DATA_CACHE_LOCAL_ENABLED = False
+
+# The maximum number of entries and the approximate total size in bytes of
+# the entries kept in the in-process cache. The least recently used entries
+# are evicted when either limit is exceeded.
+DATA_CACHE_LOCAL_MAX_ENTRIES = 1000
+DATA_CACHE_LOCAL_MAX_BYTES = 1024 * 1024 * 10
+
+# Toggle single-flight computation of the data cached by DataField instances.
+# When the `data_version` of fields is incremented, all of their cache keys
+# change at once. With this enabled, only one process computes a given key
+# while the others serve the data from the previous version, if
+# `DATA_CACHE_SERVE_STALE` is enabled, or wait up to `DATA_CACHE_LOCK_WAIT`
+# seconds for it to be set. The lock expires after `DATA_CACHE_LOCK_TIMEOUT`
+# seconds in case the process computing the data dies. The cache backend
+# must support an atomic `add` for the lock to be reliable, e.g. memcached.
+DATA_CACHE_SINGLE_FLIGHT = False
+DATA_CACHE_SERVE_STALE = True
+DATA_CACHE_LOCK_WAIT = 5
+DATA_CACHE_LOCK_TIMEOUT = 60
+
+# The serializer used for the data cached by DataField instances. The
+# default passes the data to the cache backend as is. The `ZlibSerializer`
+# compresses the pickled data and the `ArraySerializer` additionally stores
+# sequences of numbers as typed arrays. Both are defined in
+# `avocado.core.cache.serializers`.
+DATA_CACHE_SERIALIZER = 'avocado.core.cache.serializers.PickleSerializer'
+
+# Serialized data larger than this number of bytes is split across multiple
+# cache keys. The default is just under the 1MB item limit of memcached.
+# Only applies to serializers that produce strings.
+DATA_CACHE_CHUNK_SIZE = 1000 * 1000
+
+# Toggle a process-wide, read-only snapshot of the DataField, DataConcept,
+# DataConceptField and DataCategory tables used by the query parsers,
+# validators and formatters to resolve metadata without database queries.
+# Saving or deleting any of these increments a metadata version stored in
+# the cache which causes each process to rebuild its snapshot. Changes to
+# the data only increment a separate data version, which reloads the
+# `data_version` of the fields in the snapshot. Snapshots older than
+# `METADATA_SNAPSHOT_TIMEOUT` seconds are also rebuilt to bound the
+# staleness in case a change is missed, e.g. a bulk update.
+METADATA_SNAPSHOT_ENABLED = True
+METADATA_SNAPSHOT_TIMEOUT = 60 * 5
+
+# The number of seconds a snapshot is used before its versions are checked
+# against the cache again, which bounds the cache round trips for metadata
+# lookups. Changes made in the same process are seen immediately.
+METADATA_SNAPSHOT_CHECK_INTERVAL = 1
+
+# Toggle memoization of the query plans compiled from the JSON of contexts
+# and views. Applying the same context repeatedly, e.g. for counts and
+# pagination, skips parsing and translating the conditions. Plans are keyed
+# by the JSON, tree, user and metadata version and the least recently used
+# are evicted beyond `QUERY_PLAN_CACHE_MAX_ENTRIES` per process.
+QUERY_PLAN_CACHE_ENABLED = True
+QUERY_PLAN_CACHE_MAX_ENTRIES = 500
+
+# Toggle recomputing stale counts of contexts and queries in a background
+# thread while serving the previous count. If disabled, stale counts are
+# recomputed immediately. Counts are only stored if `DATA_CACHE_ENABLED`.
+QUERY_COUNT_REFRESH_ASYNC = True
+
+# Toggle streaming the rows of exported queries with a server-side cursor,
+# fetching `QUERY_STREAM_CHUNK_SIZE` rows at a time, so memory stays flat
+# regardless of the number of rows. Export jobs always stream.
+QUERY_STREAM_ENABLED = False
+QUERY_STREAM_CHUNK_SIZE = 2000
+
+# Bounds on the read-ahead buffers used for paging through query results,
+# see `avocado.query.buffers`. The total number of rows buffered across all
+# sessions in the process is limited to `QUERY_BUFFER_MAX_ROWS`. Once a page
+# is read, the `QUERY_BUFFER_PREFETCH_PAGES` following pages are fetched in a
+# background thread unless `QUERY_BUFFER_PREFETCH_ASYNC` is disabled.
+QUERY_BUFFER_MAX_ROWS = 10000
+QUERY_BUFFER_PREFETCH_PAGES = 2
+QUERY_BUFFER_PREFETCH_ASYNC = True
+
+# The number of processes and rows per chunk used to format the rows of a
+# parallel export, see `avocado.export.parallel`. If the number of workers
+# is None, the number of CPUs is used.
+EXPORT_PARALLEL_WORKERS = None
+EXPORT_PARALLEL_CHUNK_SIZE = 5000
+
+# The zlib compression level, from 0 to 9, of the members of the archives
+# written by the SAS and R exporters. If None, members are stored without
+# compression. Higher levels trade CPU time for smaller archives.
+EXPORT_COMPRESSION_LEVEL = None
+
+# The number of rows per row group of Parquet exports and the compression
+# codec of the columns, see `avocado.export._parquet`.
+EXPORT_PARQUET_ROW_GROUP_SIZE = 50000
+EXPORT_PARQUET_COMPRESSION = 'snappy'
+
+# The executor used to run count and export jobs, see `avocado.jobs`. One of
+# 'thread' or 'process' to run jobs in a pool of `JOBS_WORKERS` threads or
+# processes within the web server, or 'sync' to run them immediately.
+JOBS_EXECUTOR = 'thread'
+JOBS_WORKERS = 2
+
+# Directory for the output of export jobs. If None, a directory in the
+# system's temporary directory is used.
+JOBS_FILE_ROOT = None
+
+# Number of rows between recording the progress of an export job. This is
+# also how often a request to cancel the job is checked.
+JOBS_PROGRESS_INTERVAL = 1000
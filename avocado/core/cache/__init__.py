@@ -1,5 +1,8 @@
-from .model import instance_cache_key, cached_method  # noqa
+from .model import instance_cache_key, cached_method, prefetch_cached  # noqa
 from .receivers import post_save_cache, pre_delete_uncache  # noqa
 from .managers import CacheManager  # noqa
 from .query import CacheQuerySet  # noqa
 from .proxy import CacheProxy  # noqa
+from .local import LocalCache, local_cache  # noqa
+from . import serializers  # noqa
+from . import invalidation  # noqa
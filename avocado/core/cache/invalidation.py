@@ -0,0 +1,141 @@
+"""Event-driven invalidation of the data cached by `DataField` instances.
+
+Models registered here have their `post_save` and `post_delete` signals
+connected so that any change increments the `data_version` of the
+`DataField`s pointing to the model, rather than relying on the
+`avocado data --incr` command. Since bulk operations such as
+`QuerySet.update` do not send signals, `touch` must be called explicitly
+after them.
+
+Within a `batch` block, changes are coalesced and the versions of all the
+touched models are incremented once in a single query when the outermost
+block exits. The `BatchMiddleware` wraps each request in a batch.
+"""
+import threading
+from contextlib import contextmanager
+from django.db.models import F, Q
+from django.db.models.signals import post_save, post_delete
+from avocado.core.loader import AlreadyRegistered, NotRegistered
+
+registry = {}
+
+_state = threading.local()
+
+
+def _get_state():
+    if not hasattr(_state, 'depth'):
+        _state.depth = 0
+        _state.pending = set()
+    return _state
+
+
+def increment_versions(labels):
+    """Increments the `data_version` of the fields for a set of
+    `(app_label, model_name)` pairs. Returns the number of updated fields.
+    """
+    from avocado import metadata
+    from avocado.models import DataField
+
+    if not labels:
+        return 0
+
+    condition = Q()
+    for app_name, model_name in labels:
+        condition |= Q(app_name=app_name, model_name=model_name)
+
+    # The cached instances holding the previous version are removed by
+    # `CacheQuerySet.update`
+    fields = DataField.objects.filter(condition)
+    updated = fields.update(data_version=F('data_version') + 1)
+
+    # Bulk updates do not send signals
+    metadata.increment_data_version()
+
+    return updated
+
+
+def touch(model):
+    """Marks the data of the model as changed. The versions are incremented
+    immediately unless called within a `batch` block.
+    """
+    opts = model._meta
+    label = (opts.app_label, opts.module_name)
+    state = _get_state()
+
+    if state.depth:
+        state.pending.add(label)
+    else:
+        increment_versions([label])
+
+
+@contextmanager
+def batch():
+    "Coalesces all changes within the block into a single version increment."
+    state = _get_state()
+    state.depth += 1
+
+    try:
+        yield
+    finally:
+        state.depth -= 1
+
+        if not state.depth:
+            labels, state.pending = state.pending, set()
+            increment_versions(labels)
+
+
+def data_changed(sender, **kwargs):
+    touch(sender)
+
+
+def register(model):
+    "Registers a model whose changes increment the version of its fields."
+    if model in registry:
+        raise AlreadyRegistered(u'The model {0} is already registered'.format(
+            model.__name__))
+
+    dispatch_uid = '{0}_data_version'.format(model.__name__)
+
+    post_save.connect(data_changed, weak=False, sender=model,
+                      dispatch_uid=dispatch_uid)
+    post_delete.connect(data_changed, weak=False, sender=model,
+                        dispatch_uid=dispatch_uid)
+
+    registry[model] = {
+        'dispatch_uid': dispatch_uid,
+    }
+
+
+def unregister(model):
+    "Unregisters a model."
+    if model not in registry:
+        raise NotRegistered(u'The model {0} is not registered'.format(
+            model.__name__))
+    entry = registry.pop(model)
+    post_save.disconnect(sender=model, dispatch_uid=entry['dispatch_uid'])
+    post_delete.disconnect(sender=model, dispatch_uid=entry['dispatch_uid'])
+
+
+class BatchMiddleware(object):
+    """Coalesces the changes made during a request into a single version
+    increment per model when the response is returned.
+    """
+    def process_request(self, request):
+        _get_state().depth += 1
+
+    def _exit(self):
+        state = _get_state()
+
+        if state.depth:
+            state.depth -= 1
+
+            if not state.depth:
+                labels, state.pending = state.pending, set()
+                increment_versions(labels)
+
+    def process_response(self, request, response):
+        self._exit()
+        return response
+
+    def process_exception(self, request, exception):
+        self._exit()
@@ -0,0 +1,166 @@
+import time
+import datetime
+import cPickle as pickle
+from decimal import Decimal
+from threading import RLock
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+from avocado.conf import settings
+
+# Types of values that cannot be modified in place
+IMMUTABLE_TYPES = (basestring, int, long, float, bool, type(None), Decimal,
+                   datetime.date, datetime.time, datetime.timedelta)
+
+
+def is_immutable(value):
+    "Returns true if the value and any values it contains are immutable."
+    if isinstance(value, IMMUTABLE_TYPES):
+        return True
+
+    if isinstance(value, (tuple, frozenset)):
+        return all(is_immutable(v) for v in value)
+
+    return False
+
+
+class LocalCache(object):
+    """In-process LRU cache used as a first tier in front of the Django cache.
+
+    The number of entries and the approximate total size of the entries, as
+    measured by the size of their pickled representation, are bounded. The
+    least recently used entries are evicted first when either limit is
+    exceeded. Limits that are not passed in are read from the
+    `DATA_CACHE_LOCAL_MAX_ENTRIES` and `DATA_CACHE_LOCAL_MAX_BYTES` settings.
+
+    Entries are shared by all callers in the process, so mutable values are
+    stored in their pickled representation and a copy is returned by each
+    `get`. Immutable values are returned as is.
+
+    Since the entries are local to the process, deleting a key only affects
+    the current process. This is safe for cache keys that embed a version,
+    such as those produced by `instance_cache_key`, since a new version
+    results in a new key.
+    """
+    def __init__(self, max_entries=None, max_bytes=None):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._lock = RLock()
+        self.clear()
+
+    @property
+    def max_entries(self):
+        if self._max_entries is not None:
+            return self._max_entries
+        return settings.DATA_CACHE_LOCAL_MAX_ENTRIES
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return settings.DATA_CACHE_LOCAL_MAX_BYTES
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_entry(self, key):
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            expires = entry[2]
+
+            if expires is not None and expires <= time.time():
+                self._delete(key)
+                return None
+
+        return entry
+
+    def _delete(self, key):
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self.bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self.bytes -= entry[1]
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._get_entry(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            # Move the entry to the end to mark it as most recently used
+            del self._entries[key]
+            self._entries[key] = entry
+            self.hits += 1
+
+            value, size, expires, pickled = entry
+
+        if pickled:
+            return pickle.loads(value)
+
+        return value
+
+    def set(self, key, value, timeout=None):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        pickled = not is_immutable(value)
+
+        if pickled:
+            value = payload
+
+        if timeout:
+            expires = time.time() + timeout
+        else:
+            expires = None
+
+        with self._lock:
+            self._delete(key)
+
+            # Values larger than the entire budget are never stored
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, size, expires, pickled)
+            self.bytes += size
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._delete(key)
+
+    def clear(self):
+        "Removes all entries and resets the counters."
+        with self._lock:
+            self._entries = OrderedDict()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        "Returns a dict of the counters and current size of the cache."
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+            }
+
+
+# Process-wide instance used by `CacheProxy`
+local_cache = LocalCache()
@@ -1,7 +1,9 @@
 import inspect
+from collections import defaultdict
 from functools import wraps
 from avocado.conf import settings
 from .proxy import CacheProxy
+from . import serializers
 
 NEVER_EXPIRE = 60 * 60 * 24 * 30  # 30 days
 CACHE_KEY_FUNC = lambda l: ':'.join([str(x) for x in l])
@@ -36,8 +38,16 @@ def instance_cache_key(instance, label=None, version=None):
 
 
 def cached_method(func=None, version=None, timeout=NEVER_EXPIRE,
-                  key_func=instance_cache_key):
-    "Wraps a method and caches the output indefinitely."
+                  key_func=instance_cache_key, cache_args=False):
+    """Wraps a method and caches the output indefinitely.
+
+    By default, calls with arguments bypass the cache. If `cache_args` is
+    true, the output of calls with arguments is cached under a key that
+    includes a hash of the arguments. The arguments must be JSON
+    serializable, saved model instances or define a `cache_key`, see
+    `args_hash`. The `flush`, `cached` and `cache_key` helpers take the same
+    arguments to target a specific call.
+    """
 
     def decorator(func):
         # Single cache proxy shared across all instances. All methods require
@@ -49,18 +59,84 @@ def cached_method(func=None, version=None, timeout=NEVER_EXPIRE,
             # This check is here to be ensure transparency of the augmented
             # methods below. The agumented methods will be a no-op since the
             # `func_self` will never be set as long as this condition is true.
-            if not settings.DATA_CACHE_ENABLED or args or kwargs:
+            if not settings.DATA_CACHE_ENABLED or \
+                    ((args or kwargs) and not cache_args):
                 return func(self, *args, **kwargs)
             return cache_proxy.get_or_set(self, *args, **kwargs)
 
         # Augment method with a few methods. These are wrapped in a lambda
         # to prevent mucking the cache_proxy instance directly..
-        inner.flush = lambda i: cache_proxy.flush(i)
-        inner.cached = lambda i: cache_proxy.cached(i)
-        inner.cache_key = lambda i: cache_proxy.cache_key(i)
+        inner.flush = lambda i, *a, **k: cache_proxy.flush(i, *a, **k)
+        inner.cached = lambda i, *a, **k: cache_proxy.cached(i, *a, **k)
+        inner.cache_key = lambda i, *a, **k: cache_proxy.cache_key(i, *a, **k)
+
+        # Exposed for bulk operations across instances, see `prefetch_cached`
+        inner.cache_proxy = cache_proxy
 
         return inner
 
     if inspect.isfunction(func):
         return decorator(func)
     return decorator
+
+
+def prefetch_cached(instances, methods):
+    """Bulk loads the cached data for `methods` on each of the `instances`.
+
+    All cache keys are fetched in a single `get_many` call. Only the missing
+    values are computed and they are stored back with a single `set_many`
+    call per timeout. The data is bound to the instances so subsequent calls
+    to the methods do not touch the cache at all.
+
+    `methods` is a sequence of names of methods decorated with
+    `cached_method`, e.g. `('size', 'values', 'labels')`.
+    """
+    if not settings.DATA_CACHE_ENABLED:
+        return
+
+    lookups = []
+    for instance in instances:
+        for name in methods:
+            proxy = getattr(instance.__class__, name).cache_proxy
+            lookups.append((proxy, instance, proxy.cache_key(instance)))
+
+    if not lookups:
+        return
+
+    found = {}
+    remaining = []
+
+    # Check the local tier first, if enabled
+    for proxy, instance, key in lookups:
+        data = None
+        if proxy.local is not None:
+            data = proxy.local.get(key)
+
+        if data is not None:
+            found[key] = data
+        else:
+            remaining.append(key)
+
+    if remaining:
+        found.update(serializers.get_many(remaining))
+
+    missing = defaultdict(dict)
+
+    for proxy, instance, key in lookups:
+        data = found.get(key)
+
+        if data is None:
+            data = proxy.func(instance)
+
+            if data is not None:
+                missing[proxy.timeout][key] = data
+                found[key] = data
+
+        if data is not None:
+            proxy.bind(instance, key, data)
+
+            if proxy.local is not None:
+                proxy.local.set(key, data, timeout=proxy.timeout)
+
+    for timeout, data in missing.items():
+        serializers.set_many(data, timeout=timeout)
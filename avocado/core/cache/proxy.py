@@ -1,8 +1,50 @@
+import json
+import time
+import hashlib
 import logging
 from django.core.cache import cache
+from django.db.models import Model
+from avocado.conf import settings
+from .local import local_cache
+from . import serializers
 
 logger = logging.getLogger(__name__)
 
+# Attribute on instances holding data bound by `prefetch_cached`
+BOUND_DATA_ATTR = '_cached_method_data'
+
+# Seconds between checks while waiting on another process to compute data
+LOCK_POLL_INTERVAL = 0.1
+
+
+def _stable_arg(obj):
+    """Returns a JSON serializable representation of an argument that is not
+    JSON serializable itself. Only objects with a stable identity are
+    supported, since a representation that differs across processes, such
+    as the default `repr`, would never hit the cache.
+    """
+    cache_key = getattr(obj, 'cache_key', None)
+
+    if cache_key is not None:
+        return cache_key() if callable(cache_key) else cache_key
+
+    if isinstance(obj, Model) and obj.pk is not None:
+        opts = obj._meta
+        return u'{0}.{1}:{2}'.format(opts.app_label, opts.module_name, obj.pk)
+
+    raise TypeError(u'{0!r} cannot be used as an argument of a cached '
+                    'method, arguments must be JSON serializable, saved '
+                    'model instances or define a `cache_key`'.format(obj))
+
+
+def args_hash(args, kwargs):
+    """Returns a stable hash of positional and keyword arguments. Arguments
+    must be JSON serializable, saved model instances or define `cache_key`,
+    otherwise a `TypeError` is raised.
+    """
+    data = json.dumps([args, kwargs], sort_keys=True, default=_stable_arg)
+    return hashlib.md5(data).hexdigest()
+
 
 class CacheProxy(object):
     def __init__(self, func, version, timeout, key_func):
@@ -12,37 +54,158 @@ class CacheProxy(object):
         self.timeout = timeout
         self.key_func = key_func
 
-    def cache_key(self, instance):
-        return self.key_func(instance, label=self.label, version=self.version)
+    @property
+    def local(self):
+        "Returns the in-process cache tier if enabled."
+        if settings.DATA_CACHE_LOCAL_ENABLED:
+            return local_cache
+
+    def get_label(self, args=None, kwargs=None):
+        "Returns the label, including a hash of the arguments if any."
+        if not args and not kwargs:
+            return self.label
+        return u'{0}:{1}'.format(self.label, args_hash(args, kwargs))
+
+    def cache_key(self, instance, *args, **kwargs):
+        label = self.get_label(args, kwargs)
+        return self.key_func(instance, label=label, version=self.version)
+
+    def stale_cache_key(self, instance, *args, **kwargs):
+        """Returns the unversioned key holding the most recently computed
+        data, regardless of version. This is used to serve the previous
+        version's data while the current version is being computed.
+        """
+        label = u'{0}:stale'.format(self.get_label(args, kwargs))
+        return self.key_func(instance, label=label)
+
+    def bind(self, instance, key, data):
+        """Binds data to the instance so subsequent calls for this key do not
+        touch the cache.
+        """
+        instance.__dict__.setdefault(BOUND_DATA_ATTR, {})[key] = data
+
+    def bound(self, instance, key):
+        "Returns the data bound to the instance for this key, if any."
+        return instance.__dict__.get(BOUND_DATA_ATTR, {}).get(key)
+
+    def _get(self, key):
+        local = self.local
+
+        if local is not None:
+            data = local.get(key)
+            if data is not None:
+                return data
+
+        data = serializers.get(key)
+
+        # Populate the local tier on a hit in the shared cache
+        if data is not None and local is not None:
+            local.set(key, data, timeout=self.timeout)
+
+        return data
 
     def _set(self, key, data):
         logger.debug('Compute property cache "{0}"'.format(key))
         if data is not None:
-            cache.set(key, data, timeout=self.timeout)
+            serializers.set_one(key, data, timeout=self.timeout)
+
+            if self.local is not None:
+                self.local.set(key, data, timeout=self.timeout)
+
             logger.debug('Set property cache "{0}"'.format(key))
 
-    def get(self, instance):
-        key = self.cache_key(instance)
-        data = cache.get(key)
+    def get(self, instance, *args, **kwargs):
+        key = self.cache_key(instance, *args, **kwargs)
+        data = self.bound(instance, key)
+        if data is None:
+            data = self._get(key)
         logger.debug('Get property cache "{0}"'.format(key))
         return data
 
     def get_or_set(self, instance, *args, **kwargs):
         # Reference to prevent the key from being changed mid-execution
-        key = self.cache_key(instance)
+        key = self.cache_key(instance, *args, **kwargs)
+
+        data = self.bound(instance, key)
+        if data is not None:
+            return data
 
-        data = cache.get(key)
+        data = self._get(key)
         if data is None:
+            data = self._compute(instance, key, *args, **kwargs)
+        return data
+
+    def _compute(self, instance, key, *args, **kwargs):
+        """Computes and sets the data for the key. If single-flight is enabled,
+        only one process computes a key at a time. Other processes serve the
+        stale data from the previous version if available, otherwise they
+        wait for the data to be set.
+        """
+        if not settings.DATA_CACHE_SINGLE_FLIGHT:
             data = self.func(instance, *args, **kwargs)
             self._set(key, data)
+            return data
+
+        lock_key = u'{0}:lock'.format(key)
+
+        if cache.add(lock_key, 1, settings.DATA_CACHE_LOCK_TIMEOUT):
+            try:
+                data = self.func(instance, *args, **kwargs)
+                self._set(key, data)
+
+                if data is not None and self.version is not None:
+                    serializers.set_one(
+                        self.stale_cache_key(instance, *args, **kwargs),
+                        data, timeout=self.timeout)
+            finally:
+                cache.delete(lock_key)
+
+            return data
+
+        logger.debug('Property cache "{0}" is locked'.format(key))
+
+        if settings.DATA_CACHE_SERVE_STALE and self.version is not None:
+            data = serializers.get(
+                self.stale_cache_key(instance, *args, **kwargs))
+            if data is not None:
+                logger.debug('Serve stale property cache "{0}"'.format(key))
+                return data
+
+        deadline = time.time() + settings.DATA_CACHE_LOCK_WAIT
+
+        while time.time() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+
+            data = self._get(key)
+            if data is not None:
+                return data
+
+            # The other process finished without setting any data
+            if lock_key not in cache:
+                break
+
+        data = self.func(instance, *args, **kwargs)
+        self._set(key, data)
         return data
 
-    def flush(self, instance):
-        "Flushes cached data for this method."
-        key = self.cache_key(instance)
-        cache.delete(key)
+    def flush(self, instance, *args, **kwargs):
+        """Flushes cached data for this method and arguments. Only the local
+        tier of the current process is flushed.
+        """
+        key = self.cache_key(instance, *args, **kwargs)
+        serializers.delete(key)
+        instance.__dict__.get(BOUND_DATA_ATTR, {}).pop(key, None)
+
+        if self.local is not None:
+            self.local.delete(key)
+
         logger.debug('Delete property cache "{0}"'.format(key))
 
-    def cached(self, instance):
-        "Checks if the data is in the cache."
-        return self.cache_key(instance) in cache
+    def cached(self, instance, *args, **kwargs):
+        "Checks if the data for the arguments is in the cache."
+        key = self.cache_key(instance, *args, **kwargs)
+
+        if self.local is not None and key in self.local:
+            return True
+
+        return key in cache
@@ -1,32 +1,264 @@
+import json
+import hashlib
 from django.core.cache import cache
 from django.db.models.query import QuerySet
-from .model import CACHE_KEY_FUNC
+from .model import instance_cache_key, CACHE_KEY_FUNC, NEVER_EXPIRE
 
 PK_LOOKUPS = ('pk', 'pk__exact')
 
 
+def index_cache_key(model, names, values):
+    """Creates the cache key of a secondary index entry which maps the
+    `values` of the fields `names` to the primary key of an instance. The
+    values are hashed since they may contain characters that are not valid
+    in cache keys.
+    """
+    opts = model._meta
+    digest = hashlib.md5(json.dumps(values)).hexdigest()
+    return CACHE_KEY_FUNC([opts.app_label, opts.module_name, 'index',
+                           '-'.join(names), digest])
+
+
+def unique_indexes(model, indexes):
+    """Returns the indexes whose fields are unique together for the model.
+    A lookup by the fields of any other index may match more than one
+    instance which must raise `MultipleObjectsReturned` rather than return
+    a cached instance, so these indexes are ignored.
+    """
+    opts = model._meta
+    unique_together = [set(names) for names in opts.unique_together]
+    unique = []
+
+    for names in indexes:
+        if set(names) in unique_together or \
+                any(opts.get_field(name).unique for name in names):
+            unique.append(tuple(names))
+
+    return tuple(unique)
+
+
+def get_cache_indexes(model):
+    "Returns the unique secondary indexes defined by the model's query set."
+    queryset = model._default_manager.get_query_set()
+    return unique_indexes(model, getattr(queryset, 'cache_indexes', ()))
+
+
+def cache_instance(instance):
+    "Caches the instance along with its secondary index entries."
+    values = {instance_cache_key(instance): instance}
+
+    for names in get_cache_indexes(instance.__class__):
+        index_values = [getattr(instance, name) for name in names]
+
+        # Null values are not unique
+        if None not in index_values:
+            key = index_cache_key(instance.__class__, names, index_values)
+            values[key] = instance.pk
+
+    cache.set_many(values, timeout=NEVER_EXPIRE)
+
+
+def uncache_instance(instance):
+    "Removes the cached instance along with its secondary index entries."
+    keys = [instance_cache_key(instance)]
+
+    for names in get_cache_indexes(instance.__class__):
+        index_values = [getattr(instance, name) for name in names]
+        keys.append(index_cache_key(instance.__class__, names, index_values))
+
+    cache.delete_many(keys)
+
+
 class CacheQuerySet(QuerySet):
+    """Query set which answers lookups by primary key, by the fields of a
+    secondary index or by a list of primary keys from the instance cache
+    populated by the `post_save_cache` receiver.
+
+    `cache_indexes` is a sequence of tuples of field names which uniquely
+    identify an instance, such as a natural key. Only indexes of fields that
+    are unique or unique together are used. Index entries only point to the
+    primary key, so an entry that is out of date is detected by comparing
+    the field values of the cached instance.
+
+    The cache is only used for lookups on an otherwise unfiltered and
+    unmodified query set since the cached instance does not necessarily
+    match other conditions, e.g. `extra` or `defer`, and cannot be locked
+    by `select_for_update`.
+    This must be used in conjunction with the `post_save_cache` and
+    `pre_delete_uncache` receivers for the model.
+    """
+    cache_indexes = ()
+
+    def _cacheable(self, args, kwargs):
+        "Returns the normalized lookup if it can be answered by the cache."
+        if args or not kwargs:
+            return
+
+        query = self.query
+
+        if query.where or query.having or query.low_mark or \
+                query.high_mark is not None:
+            return
+
+        if query.select_for_update or query.distinct or query.extra or \
+                query.extra_tables or query.aggregates or \
+                query.deferred_loading[0] or self._db is not None:
+            return
+
+        pk_name = self.model._meta.pk.name
+        lookup = {}
+
+        for key, value in kwargs.items():
+            if key.endswith('__exact'):
+                key = key[:-len('__exact')]
+            elif key.endswith('__in'):
+                key = key[:-len('__in')]
+
+                if key not in ('pk', pk_name) or len(kwargs) > 1 or \
+                        not isinstance(value, (list, tuple, set)):
+                    return
+
+                lookup['pk__in'] = value
+                continue
+
+            if key == pk_name:
+                key = 'pk'
+
+            lookup[key] = value
+
+        return lookup
+
+    def _get_cached(self, pk):
+        return cache.get(instance_cache_key(self.model(pk=pk)))
+
+    def _get_cached_many(self, pks):
+        "Returns a dict of the cached instances by primary key."
+        keys = dict((instance_cache_key(self.model(pk=pk)), pk) for pk in pks)
+        cached = cache.get_many(keys.keys())
+        return dict((keys[key], obj) for key, obj in cached.items())
+
+    def _get_indexes(self):
+        return unique_indexes(self.model, self.cache_indexes)
+
+    def _get_indexed(self, lookup):
+        for names in self._get_indexes():
+            if set(names) != set(lookup):
+                continue
+
+            values = [lookup[name] for name in names]
+            pk = cache.get(index_cache_key(self.model, names, values))
+
+            if pk is None:
+                return
+
+            obj = self._get_cached(pk)
+
+            # The index entry is out of date
+            if obj is None or [getattr(obj, n) for n in names] != values:
+                return
+
+            return obj
+
+    def _indexed(self, lookup):
+        "Returns true if the lookup is by primary key or a secondary index."
+        if lookup.keys() == ['pk']:
+            return True
+        return any(set(names) == set(lookup)
+                   for names in self._get_indexes())
+
+    def _cache_lookup(self, lookup):
+        "Returns the cached instance for a single instance lookup."
+        if lookup.keys() == ['pk']:
+            return self._get_cached(lookup['pk'])
+        return self._get_indexed(lookup)
+
     def filter(self, *args, **kwargs):
         """For primary-key-based lookups, instances may be cached to prevent
         excessive database hits. If this is a primary-key lookup, the cache
         will be checked and populated in the `_result_cache` if available.
+
+        A `pk__in` lookup is answered with a single `get_many` if all the
+        instances are cached and the query set is not ordered, e.g. after
+        calling `order_by()` with no arguments. The instances are returned
+        in the order of the primary keys.
         """
         clone = super(CacheQuerySet, self).filter(*args, **kwargs)
 
-        pk = None
-        opts = self.model._meta
-        pk_name = opts.pk.name
+        lookup = self._cacheable(args, kwargs)
+
+        if not lookup:
+            return clone
+
+        if 'pk__in' in lookup:
+            if not self.ordered:
+                pks = list(lookup['pk__in'])
+                cached = self._get_cached_many(pks)
 
-        # Look for `pk` and the actual name of the primary key field
-        for key in list(PK_LOOKUPS) + [pk_name, u'{0}__exact'.format(pk_name)]:
-            if key in kwargs:
-                pk = kwargs[key]
-                break
+                if len(cached) == len(set(pks)):
+                    seen = set()
+                    clone._result_cache = []
+
+                    for pk in pks:
+                        if pk not in seen:
+                            seen.add(pk)
+                            clone._result_cache.append(cached[pk])
+        else:
+            obj = self._cache_lookup(lookup)
 
-        if pk is not None:
-            key = CACHE_KEY_FUNC([opts.app_label, opts.module_name, pk])
-            obj = cache.get(key)
             if obj is not None:
                 clone._result_cache = [obj]
 
         return clone
+
+    def get(self, *args, **kwargs):
+        """Returns the cached instance for primary key and index lookups.
+        Instances fetched from the database for these lookups are cached.
+        """
+        lookup = self._cacheable(args, kwargs)
+
+        if not lookup or 'pk__in' in lookup or not self._indexed(lookup):
+            return super(CacheQuerySet, self).get(*args, **kwargs)
+
+        obj = self._cache_lookup(lookup)
+
+        if obj is None:
+            obj = super(CacheQuerySet, self).get(*args, **kwargs)
+            cache_instance(obj)
+
+        return obj
+
+    def in_bulk(self, id_list):
+        """Returns a dict of instances by primary key. Cached instances are
+        fetched with a single `get_many` and only the remaining are fetched
+        from the database.
+        """
+        if self.query.where or self.query.having:
+            return super(CacheQuerySet, self).in_bulk(id_list)
+
+        objs = self._get_cached_many(id_list)
+        missing = [pk for pk in id_list if pk not in objs]
+
+        if missing:
+            fetched = super(CacheQuerySet, self).in_bulk(missing)
+
+            for obj in fetched.values():
+                cache_instance(obj)
+
+            objs.update(fetched)
+
+        return objs
+
+    def update(self, **kwargs):
+        """Removes the cached instances affected by the update since the
+        `post_save_cache` receiver is not called for bulk updates.
+        """
+        instances = [self.model(pk=pk) for pk in
+                     self.values_list('pk', flat=True)]
+
+        rows = super(CacheQuerySet, self).update(**kwargs)
+
+        cache.delete_many([instance_cache_key(i) for i in instances])
+
+        return rows
+
+    update.alters_data = True
@@ -1,5 +1,5 @@
-from django.core.cache import cache
-from .model import instance_cache_key, NEVER_EXPIRE
+from .proxy import BOUND_DATA_ATTR
+from .query import cache_instance, uncache_instance
 
 
 def post_save_cache(sender, instance, **kwargs):
@@ -7,9 +7,15 @@ def post_save_cache(sender, instance, **kwargs):
     be used in conjunction with the `pre_delete_uncache` since the cache is set
     to never expire.
     """
-    cache.set(instance_cache_key(instance), instance, timeout=NEVER_EXPIRE)
+    # Data bound by `prefetch_cached` is not cached with the instance
+    data = instance.__dict__.pop(BOUND_DATA_ATTR, None)
+
+    cache_instance(instance)
+
+    if data is not None:
+        instance.__dict__[BOUND_DATA_ATTR] = data
 
 
 def pre_delete_uncache(sender, instance, **kwargs):
     "General post-delete handler for removing cache for model instances."
-    cache.delete(instance_cache_key(instance))
+    uncache_instance(instance)
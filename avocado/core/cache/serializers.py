@@ -0,0 +1,265 @@
+import zlib
+import logging
+import cPickle as pickle
+from array import array
+from collections import namedtuple
+from django.core.cache import cache
+from django.utils.importlib import import_module
+from avocado.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Stored under the cache key with the format of the serializer that
+# produced the payload, so payloads of another serializer are not loaded.
+Payload = namedtuple('Payload', ('format', 'data'))
+
+# Stored under the cache key in place of the payload when the payload is
+# split across multiple chunk keys.
+ChunkManifest = namedtuple('ChunkManifest', ('count', 'size', 'format'))
+
+
+class PickleSerializer(object):
+    """Passes data through unchanged and lets the cache backend pickle it.
+    Since the payload is not a string, it is never chunked. This is the
+    default and matches the behavior of the Django cache.
+    """
+    def __init__(self):
+        self.reset()
+
+    @property
+    def format(self):
+        "Identifies the format of the payloads, the path of the class."
+        klass = self.__class__
+        return u'{0}.{1}'.format(klass.__module__, klass.__name__)
+
+    def reset(self):
+        "Resets the counters."
+        self.count = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.chunked = 0
+
+    def record(self, raw_size, stored_size):
+        self.count += 1
+        self.raw_bytes += raw_size
+        self.stored_bytes += stored_size
+
+    def stats(self):
+        "Returns a dict of the serialized sizes and compression ratio."
+        if self.stored_bytes:
+            ratio = self.raw_bytes / float(self.stored_bytes)
+        else:
+            ratio = None
+
+        return {
+            'count': self.count,
+            'raw_bytes': self.raw_bytes,
+            'stored_bytes': self.stored_bytes,
+            'chunked': self.chunked,
+            'ratio': ratio,
+        }
+
+    def dumps(self, data):
+        return data
+
+    def loads(self, payload):
+        return payload
+
+
+class ZlibSerializer(PickleSerializer):
+    "Pickles and compresses the data with zlib."
+    def __init__(self, level=6):
+        self.level = level
+        super(ZlibSerializer, self).__init__()
+
+    def dumps(self, data):
+        raw = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        payload = zlib.compress(raw, self.level)
+        self.record(len(raw), len(payload))
+        return payload
+
+    def loads(self, payload):
+        return pickle.loads(zlib.decompress(payload))
+
+
+class ArraySerializer(ZlibSerializer):
+    """Stores tuples and lists consisting solely of ints or floats as
+    compressed typed arrays which is far more compact than pickling each
+    number individually. All other data is compressed with zlib.
+
+    The first byte of the payload denotes the sequence type or a pickle and
+    the second the array typecode.
+    """
+    def _typecode(self, data):
+        if not isinstance(data, (tuple, list)) or not data:
+            return
+
+        # bool is a subclass of int, so the exact type is checked
+        if all(type(x) is int for x in data):
+            return 'l'
+
+        if all(type(x) is float for x in data):
+            return 'd'
+
+    def dumps(self, data):
+        typecode = self._typecode(data)
+
+        if typecode is None:
+            return 'p' + super(ArraySerializer, self).dumps(data)
+
+        raw = array(typecode, data).tostring()
+        payload = zlib.compress(raw, self.level)
+        self.record(len(raw), len(payload))
+
+        kind = 't' if isinstance(data, tuple) else 'l'
+        return kind + typecode + payload
+
+    def loads(self, payload):
+        kind = payload[0]
+
+        if kind == 'p':
+            return super(ArraySerializer, self).loads(payload[1:])
+
+        values = array(payload[1], zlib.decompress(payload[2:])).tolist()
+
+        if kind == 't':
+            return tuple(values)
+        return values
+
+
+DEFAULT_SERIALIZER = 'avocado.core.cache.serializers.PickleSerializer'
+
+_serializers = {}
+
+
+def get_serializer():
+    "Returns the serializer defined by the `DATA_CACHE_SERIALIZER` setting."
+    path = settings.DATA_CACHE_SERIALIZER or DEFAULT_SERIALIZER
+
+    if path not in _serializers:
+        toks = path.split('.')
+        klass_name = toks.pop()
+        klass = getattr(import_module('.'.join(toks)), klass_name)
+        _serializers[path] = klass()
+
+    return _serializers[path]
+
+
+def chunk_key(key, index):
+    return u'{0}:chunk:{1}'.format(key, index)
+
+
+def _dumps(key, data):
+    """Returns a dict of cache keys and values for the data. Payloads larger
+    than `DATA_CACHE_CHUNK_SIZE` are split into multiple keys.
+    """
+    serializer = get_serializer()
+    payload = serializer.dumps(data)
+    size = settings.DATA_CACHE_CHUNK_SIZE
+
+    if not isinstance(payload, str) or not size or len(payload) <= size:
+        return {key: Payload(serializer.format, payload)}
+
+    serializer.chunked += 1
+
+    values = {}
+    for i, start in enumerate(xrange(0, len(payload), size)):
+        values[chunk_key(key, i)] = payload[start:start + size]
+
+    values[key] = ChunkManifest(len(values), len(payload), serializer.format)
+
+    logger.debug('Split cache "{0}" into {1} chunks'.format(key, len(values)))
+
+    return values
+
+
+def _loads(key, payload, chunks):
+    serializer = get_serializer()
+
+    # Payloads stored by a different serializer are misses
+    if not isinstance(payload, (Payload, ChunkManifest)) or \
+            payload.format != serializer.format:
+        logger.debug('Ignore cache "{0}" of another format'.format(key))
+        return None
+
+    if isinstance(payload, ChunkManifest):
+        keys = [chunk_key(key, i) for i in xrange(payload.count)]
+
+        # A chunk was evicted
+        if not all(k in chunks for k in keys):
+            return None
+
+        data = ''.join(chunks[k] for k in keys)
+    else:
+        data = payload.data
+
+    try:
+        return serializer.loads(data)
+    except Exception:
+        logger.exception('Error loading cache "{0}"'.format(key))
+
+
+def get_many(keys):
+    "Returns a dict of the deserialized data for the keys that are set."
+    payloads = cache.get_many(keys)
+
+    chunk_keys = []
+    for key, payload in payloads.items():
+        if isinstance(payload, ChunkManifest):
+            chunk_keys.extend(chunk_key(key, i)
+                              for i in xrange(payload.count))
+
+    chunks = cache.get_many(chunk_keys) if chunk_keys else {}
+
+    data = {}
+    for key, payload in payloads.items():
+        value = _loads(key, payload, chunks)
+
+        if value is not None:
+            data[key] = value
+
+    return data
+
+
+def get(key):
+    "Returns the deserialized data for the key."
+    payload = cache.get(key)
+
+    if payload is None:
+        return None
+
+    chunks = {}
+    if isinstance(payload, ChunkManifest):
+        chunks = cache.get_many([chunk_key(key, i)
+                                 for i in xrange(payload.count)])
+
+    return _loads(key, payload, chunks)
+
+
+def set_many(data, timeout):
+    "Serializes and sets a dict of keys and data."
+    values = {}
+    for key, value in data.items():
+        values.update(_dumps(key, value))
+
+    cache.set_many(values, timeout=timeout)
+
+
+def set_one(key, data, timeout):
+    "Serializes and sets the data for the key."
+    values = _dumps(key, data)
+
+    if len(values) == 1:
+        cache.set(key, values[key], timeout=timeout)
+    else:
+        cache.set_many(values, timeout=timeout)
+
+
+def delete(key):
+    "Deletes the key along with any chunks."
+    payload = cache.get(key)
+
+    if isinstance(payload, ChunkManifest):
+        cache.delete_many([chunk_key(key, i) for i in xrange(payload.count)])
+
+    cache.delete(key)
@@ -26,14 +26,22 @@ class BufferedPaginator(Paginator):
     `buf_size` represents the size of the buffer, i.e. number of rows that will
     be available at any given time and in most cases the size of `object_list`
     assuming `_count` is greater than `buf_size`..
+
+    `cursors` maps page numbers to the cursor token of the last row preceding
+    the page for use with keyset pagination, see `avocado.query.keysets`.
+    Pages can be retrieved by one of these tokens in place of the number.
     """
     def __init__(self, count, object_list=None, offset=0, buf_size=None,
                  *args, **kwargs):
         if offset > count:
             raise ValueError('"offset" cannot be greater than the "count"')
 
+        cursors = kwargs.pop('cursors', None)
+
         super(BufferedPaginator, self).__init__(object_list, *args, **kwargs)
 
+        self.cursors = dict(cursors or {})
+
         self._count = count
 
         # Negative offsets are relative to to `count`
@@ -46,6 +54,27 @@ class BufferedPaginator(Paginator):
             buf_size = len(object_list)
         self.buf_size = buf_size or count
 
+    def validate_number(self, number):
+        "Validates the page number or resolves the cursor token of a page."
+        if isinstance(number, basestring):
+            for page, token in self.cursors.iteritems():
+                if token == number:
+                    number = page
+                    break
+
+        return super(BufferedPaginator, self).validate_number(number)
+
+    def set_cursor(self, number, token):
+        "Sets the cursor token of the row preceding the page."
+        self.cursors[number] = token
+
+    def get_cursor(self, number):
+        """Returns the cursor token of the row preceding the page. The first
+        page has no preceding row.
+        """
+        if number > 1:
+            return self.cursors.get(number)
+
     def page(self, number):
         """Returns a `BufferedPage` object representing the slice of data
         relative to the `per_page` number.
@@ -154,6 +183,23 @@ class BufferedPage(Page):
         "Returns a zero-based offset of this page."
         return max(self.start_index(), 1) - 1
 
+    @property
+    def cursor(self):
+        "Returns the cursor token of the row preceding this page."
+        return self.paginator.get_cursor(self.number)
+
+    def next_cursor(self):
+        "Returns the cursor token of the last row of this page if known."
+        return self.paginator.get_cursor(self.number + 1)
+
+    def set_next_cursor(self, token):
+        "Sets the cursor token of the last row of this page."
+        self.paginator.set_cursor(self.number + 1, token)
+
+    def can_seek(self):
+        "Returns true if this page can be retrieved by keyset pagination."
+        return self.number == 1 or self.cursor is not None
+
     def get_list(self, object_list=None):
         """Get the list of objects for this page.
 
@@ -2,7 +2,8 @@ from random import choice
 from string import ascii_lowercase, digits
 from django import forms
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, connections
+from django.core.cache import cache
 from django.utils.importlib import import_module
 from avocado.conf import settings
 
@@ -105,3 +106,16 @@ def create_email_based_user(email):
     user.save()
 
     return user
+
+
+def close_connections():
+    """Closes the database connections and the cache client of the current
+    thread or process. Threads and forked processes must open their own
+    rather than share those of the parent.
+    """
+    for connection in connections.all():
+        connection.close()
+
+    # Only some backends, such as memcached, hold a connection
+    if hasattr(cache, 'close'):
+        cache.close()
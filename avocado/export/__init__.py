@@ -19,4 +19,8 @@ if OPTIONAL_DEPS['openpyxl']:
     from _excel import ExcelExporter
     registry.register(ExcelExporter, 'excel')
 
+if OPTIONAL_DEPS['pyarrow']:
+    from _parquet import ParquetExporter
+    registry.register(ParquetExporter, 'parquet')
+
 loader.autodiscover('exporters')
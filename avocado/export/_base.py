@@ -1,14 +1,49 @@
+import functools
 from avocado.models import DataConcept, DataView
 from avocado.formatters import Formatter
 from cStringIO import StringIO
 
 
+class DictAdapter(object):
+    """Adapts a formatter function that returns a dict of values to the flat
+    row protocol of `BaseExporter.read_rows`. The formatted values of the
+    row slice are appended to the output. The keys of the first dict are the
+    header since the keys of such formatters are only known once a row has
+    been formatted.
+    """
+    def __init__(self, func, start, end):
+        self.func = func
+        self.start = start
+        self.end = end
+        self.keys = None
+
+    def __call__(self, row, output):
+        data = self.func(row[self.start:self.end])
+
+        if self.keys is None:
+            self.keys = list(data.keys())
+
+        output.extend(data.values())
+
+
 class BaseExporter(object):
     "Base class for all exporters"
     file_extension = 'txt'
     content_type = 'text/plain'
     preferred_formats = []
 
+    # Whether the output of consecutive writes can be concatenated into a
+    # single file, given the header is only written by the first.
+    concatenable = False
+
+    # The number of leading columns identifying a run of rows that are
+    # contiguous in the iterable, such as the primary key when the rows are
+    # ordered by it within the ordering of the view. Duplicate rows can only
+    # occur within a run, so memory is bounded by the size of a run when
+    # filtering distinct rows. The `run_key_length` of an iterable, such as
+    # those of `QueryProcessor.get_iterable`, takes precedence.
+    run_key_length = None
+
     def __init__(self, concepts=None):
         if concepts is None:
             concepts = ()
@@ -30,7 +65,7 @@ class BaseExporter(object):
     def add_formatter(self, formatter, length=None, index=None):
         if isinstance(formatter, DataConcept):
             length = formatter.concept_fields.count()
-            formatter = formatter.format
+            formatter = formatter.get_formatter()
         elif isinstance(formatter, Formatter):
             length = len(formatter.keys)
         elif length is None:
@@ -58,30 +93,137 @@ class BaseExporter(object):
             yield formatter(values, preferred_formats=self.preferred_formats,
                             **kwargs)
 
-    def read(self, iterable, force_distinct=True, *args, **kwargs):
-        """Takes an iterable that produces rows to be formatted.
+    def _compile(self, **kwargs):
+        """Returns a list of functions and the row slice each formats. The
+        formatters are compiled once for the preferred formats and context.
+        """
+        compiled = []
+        start = 0
+
+        for formatter, length in self.params:
+            if isinstance(formatter, Formatter):
+                func = formatter.compile(self.preferred_formats, **kwargs)
+            else:
+                func = functools.partial(
+                    formatter, preferred_formats=self.preferred_formats,
+                    **kwargs)
+
+            compiled.append((func, start, start + length))
+            start += length
+
+        return compiled
+
+    def _compile_flat(self, **kwargs):
+        """Returns a list of functions that append the formatted values of a
+        row to a list and the list of their headers. Flat formatters index
+        the row directly at their column offset and other formatters are
+        adapted with `DictAdapter`.
+        """
+        funcs = []
+        headers = []
+        start = 0
+
+        for formatter, length in self.params:
+            if isinstance(formatter, Formatter) and \
+                    formatter.is_flat(self.preferred_formats):
+                func = formatter.compile_flat(self.preferred_formats, start,
+                                              **kwargs)
+                headers.append(list(formatter.keys))
+            else:
+                if isinstance(formatter, Formatter):
+                    formatter = formatter.compile(self.preferred_formats,
+                                                  **kwargs)
+                else:
+                    formatter = functools.partial(
+                        formatter, preferred_formats=self.preferred_formats,
+                        **kwargs)
+
+                func = DictAdapter(formatter, start, start + length)
+                headers.append(func)
+
+            funcs.append(func)
+            start += length
+
+        return funcs, headers
+
+    def _format_compiled(self, row, compiled):
+        for func, start, end in compiled:
+            yield func(row[start:end])
+
+    def filter_rows(self, iterable, force_distinct=True):
+        """Takes an iterable that produces rows and yields the slice of each
+        row that is going to be formatted.
 
         If `force_distinct` is true, rows will be filtered based on the slice
-        of the row that is going to be formatted.
+        of the row that is going to be formatted. If `run_key_length` is set
+        on the iterable or the exporter, only the slices of the current run of
+        rows are kept for comparison, otherwise the slices of all rows are
+        kept.
         """
-        unique_rows = set()
+        run_key_length = getattr(iterable, 'run_key_length',
+                                 self.run_key_length)
+        seen = set()
+        run_key = None
 
         for row in iterable:
-            _row = row[:self.row_length]
+            _row = tuple(row[:self.row_length])
 
             if force_distinct:
-                _row_hash = hash(tuple(_row))
+                if run_key_length:
+                    key = _row[:run_key_length]
 
-                if _row_hash in unique_rows:
+                    if key != run_key:
+                        seen = set()
+                        run_key = key
+
+                if _row in seen:
                     continue
 
-                unique_rows.add(_row_hash)
+                seen.add(_row)
+
+            yield _row
 
-            yield self._format_row(_row, **kwargs)
+    def read(self, iterable, force_distinct=True, *args, **kwargs):
+        """Takes an iterable that produces rows to be formatted.
+
+        If `force_distinct` is true, rows will be filtered based on the slice
+        of the row that is going to be formatted.
+        """
+        compiled = self._compile(**kwargs)
+
+        for row in self.filter_rows(iterable, force_distinct):
+            yield self._format_compiled(row, compiled)
+
+    def read_rows(self, iterable, force_distinct=True, *args, **kwargs):
+        """Takes an iterable that produces rows to be formatted and yields
+        each row as a flat list of the formatted values. If there are any
+        rows, the header of the values is yielded first.
+
+        If `force_distinct` is true, rows will be filtered based on the slice
+        of the row that is going to be formatted.
+        """
+        funcs, headers = self._compile_flat(**kwargs)
+
+        for i, row in enumerate(self.filter_rows(iterable, force_distinct)):
+            output = []
+
+            for func in funcs:
+                func(row, output)
+
+            if i == 0:
+                header = []
+                for keys in headers:
+                    header.extend(keys if isinstance(keys, list)
+                                  else keys.keys)
+                yield header
+
+            yield output
 
     def write(self, iterable, *args, **kwargs):
-        for row_gen in self.read(iterable, *args, **kwargs):
-            row = []
-            for data in row_gen:
-                row.extend(data.values())
+        rows = self.read_rows(iterable, *args, **kwargs)
+
+        # Skip the header
+        next(rows, None)
+
+        for row in rows:
             yield tuple(row)
@@ -11,18 +11,17 @@ class CSVExporter(BaseExporter):
 
     preferred_formats = ('csv', 'number', 'string')
 
+    concatenable = True
+
     def write(self, iterable, buff=None, *args, **kwargs):
-        header = []
+        include_header = kwargs.pop('header', True)
         buff = self.get_file_obj(buff)
         writer = csv.writer(buff, quoting=csv.QUOTE_MINIMAL)
 
-        for i, row_gen in enumerate(self.read(iterable, *args, **kwargs)):
-            row = []
-            for data in row_gen:
-                if i == 0:
-                    header.extend(data.keys())
-                row.extend(data.values())
-            if i == 0:
-                writer.writerow(header)
-            writer.writerow(row)
+        rows = self.read_rows(iterable, *args, **kwargs)
+
+        if not include_header:
+            next(rows, None)
+
+        writer.writerows(rows)
         return buff
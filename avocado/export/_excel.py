@@ -1,4 +1,6 @@
+from tempfile import TemporaryFile
 from django.http import HttpResponse
+from django.core.servers.basehttp import FileWrapper
 from django.core.exceptions import ImproperlyConfigured
 from avocado.conf import OPTIONAL_DEPS
 if not OPTIONAL_DEPS['openpyxl']:
@@ -6,6 +8,7 @@ if not OPTIONAL_DEPS['openpyxl']:
                                'exporter.')
 
 from openpyxl import Workbook
+from avocado.models import DataConceptField
 from _base import BaseExporter
 
 
@@ -26,19 +29,8 @@ class ExcelExporter(BaseExporter):
         ws_data = wb.create_sheet()
         ws_data.title = 'Data'
 
-        header = []
-        # Create the data worksheet
-        for i, row_gen in enumerate(self.read(iterable, *args, **kwargs)):
-            row = []
-            for data in row_gen:
-                if i == 0:
-                    # Build up header row
-                    header.extend(data.keys())
-                # Add formatted section to the row
-                row.extend(data.values())
-            # Write headers on first iteration
-            if i == 0:
-                ws_data.append(header)
+        # Create the data worksheet, the header is the first row
+        for row in self.read_rows(iterable, *args, **kwargs):
             ws_data.append(row)
 
         ws_dict = wb.create_sheet()
@@ -48,22 +40,45 @@ class ExcelExporter(BaseExporter):
         ws_dict.append(('Field Name', 'Data Type', 'Description',
                         'Concept Name', 'Concept Discription'))
 
-        for c in self.concepts:
-            cfields = c.concept_fields.select_related('field')
+        for c, cfields in self._get_concept_fields():
             for cfield in cfields:
                 field = cfield.field
                 ws_dict.append((field.field_name, field.simple_type,
                                 field.description, c.name, c.description))
 
-        # This hacked up implementation is due to `save_virtual_workbook`
-        # not behaving correctly. This function should handle the work
-        # https://bitbucket.org/ericgazoni/openpyxl/src/94b05cf9defb9787b4dfbf9e8dca7ba6e0b33d56/openpyxl/writer/excel.py?at=default#cl-154     # noqa
-        # however, no data is actually being saved to the worksheets..
-        if isinstance(buff, HttpResponse):
-            _buff = self.get_file_obj()
-            wb.save(_buff)
-            buff.content = _buff.getvalue()
-            _buff.close()
+        # The zip archive of the workbook can only be written to a seekable
+        # file, so responses are written from a temporary file rather than
+        # an in-memory copy. Streaming responses read the file in chunks as
+        # the response is sent.
+        streaming = getattr(buff, 'streaming', False)
+
+        if streaming or isinstance(buff, HttpResponse):
+            temp = TemporaryFile()
+            wb.save(temp)
+            temp.seek(0)
+
+            if streaming:
+                buff.streaming_content = FileWrapper(temp)
+            else:
+                for chunk in FileWrapper(temp):
+                    buff.write(chunk)
+                temp.close()
         else:
             wb.save(buff)
         return buff
+
+    def _get_concept_fields(self):
+        """Returns pairs of the concepts and their concept fields with the
+        fields selected. The concept fields of all concepts are fetched in a
+        single query.
+        """
+        pks = [c.pk for c in self.concepts]
+        cfields = {}
+
+        queryset = DataConceptField.objects.filter(concept__pk__in=pks)\
+            .select_related('field')
+
+        for cfield in queryset:
+            cfields.setdefault(cfield.concept_id, []).append(cfield)
+
+        return [(c, cfields.get(c.pk, ())) for c in self.concepts]
@@ -0,0 +1,306 @@
+import json
+from decimal import Decimal
+from tempfile import TemporaryFile
+from django.utils.encoding import force_unicode
+from django.http import HttpResponse
+from django.core.servers.basehttp import FileWrapper
+from django.core.exceptions import ImproperlyConfigured
+from avocado.conf import OPTIONAL_DEPS, settings
+if not OPTIONAL_DEPS['pyarrow']:
+    raise ImproperlyConfigured('pyarrow must be installed to use this '
+                               'exporter.')
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from avocado.formatters import Formatter
+from _base import BaseExporter
+
+# Arrow types by internal type of the field. Decimals and lexicons are
+# handled separately.
+ARROW_TYPES = {
+    'auto': pa.int64(),
+    'foreignkey': pa.int64(),
+    'onetoone': pa.int64(),
+
+    'biginteger': pa.int64(),
+    'integer': pa.int64(),
+    'positiveinteger': pa.int64(),
+    'positivesmallinteger': pa.int64(),
+    'smallinteger': pa.int64(),
+    'float': pa.float64(),
+
+    'boolean': pa.bool_(),
+    'nullboolean': pa.bool_(),
+
+    'date': pa.date32(),
+    'datetime': pa.timestamp('us'),
+    'time': pa.time64('us'),
+}
+
+# Arrow types by simple type, used for internal types not mapped above
+SIMPLE_ARROW_TYPES = {
+    'key': pa.int64(),
+    'number': pa.float64(),
+    'boolean': pa.bool_(),
+    'string': pa.string(),
+}
+
+# Maximum precision of the Arrow decimal type
+MAX_DECIMAL_PRECISION = 38
+
+
+def to_int(value):
+    "Converts an integral value to an int without truncating it."
+    if isinstance(value, (int, long)):
+        return value
+
+    if value != int(value):
+        raise ValueError(u'Cannot convert {0!r} to an integer without '
+                         'loss'.format(value))
+
+    return int(value)
+
+
+def to_unicode(value):
+    if isinstance(value, unicode):
+        return value
+    return force_unicode(value)
+
+
+class Column(object):
+    """Builds the arrays of a column from batches of values. The type is
+    derived from the field up front so every row group has the same schema
+    regardless of the values in the first batch, e.g. all nulls or integers
+    in a column of decimals. The values are converted to the type. Columns
+    without a field are strings.
+    """
+    def __init__(self, name, field=None):
+        self.name = name
+        self.field = field
+        self.metadata = None
+        self.index = None
+        self.convert = None
+        self.type = None
+
+        if field is not None:
+            self.type = self._get_type(field)
+
+        if self.type is None:
+            self.type = pa.string()
+            self.convert = to_unicode
+
+    def _get_type(self, field):
+        if field.lexicon:
+            return self._get_lexicon_type(field)
+
+        internal_type = field.internal_type
+
+        if internal_type == 'decimal':
+            return self._get_decimal_type(field.field)
+
+        arrow_type = ARROW_TYPES.get(internal_type) or \
+            SIMPLE_ARROW_TYPES.get(field.simple_type)
+
+        if arrow_type == pa.int64():
+            self.convert = to_int
+        elif arrow_type == pa.float64():
+            self.convert = float
+        elif arrow_type == pa.string():
+            self.convert = to_unicode
+
+        return arrow_type
+
+    def _get_decimal_type(self, model_field):
+        """Decimals within the precision of the Arrow decimal type are
+        rounded to the decimal places of the field, larger decimals are
+        converted to floats.
+        """
+        if model_field.max_digits > MAX_DECIMAL_PRECISION:
+            self.convert = float
+            return pa.float64()
+
+        exponent = Decimal(1).scaleb(-model_field.decimal_places)
+
+        def convert(value):
+            if isinstance(value, float):
+                value = Decimal(repr(value))
+            elif not isinstance(value, Decimal):
+                value = Decimal(value)
+            return value.quantize(exponent)
+
+        self.convert = convert
+
+        return pa.decimal128(model_field.max_digits,
+                             model_field.decimal_places)
+
+    def _get_lexicon_type(self, field):
+        """Lexicon values are dictionary-encoded with the labels of the coded
+        choices as the dictionary. The codes are kept in the metadata of the
+        column.
+
+        Views select the label of a lexicon, so values are looked up by their
+        label. Primary keys are also accepted for rows that select them.
+        """
+        choices = list(field.model.objects.values_list('pk', 'code',
+                                                       'label'))
+
+        self.index = {}
+
+        # Labels take precedence over keys
+        for i, (pk, code, label) in enumerate(choices):
+            self.index.setdefault(label, i)
+
+        for i, (pk, code, label) in enumerate(choices):
+            self.index.setdefault(pk, i)
+
+        self.dictionary = pa.array([unicode(l) for p, c, l in choices],
+                                   type=pa.string())
+        self.metadata = {'codes': json.dumps([c for p, c, l in choices])}
+
+        return pa.dictionary(pa.int32(), pa.string())
+
+    def get_field(self):
+        return pa.field(self.name, self.type, metadata=self.metadata)
+
+    def get_array(self, values):
+        if self.index is not None:
+            # Values that are not in the lexicon are null
+            indices = pa.array([self.index.get(v) for v in values],
+                               type=pa.int32())
+            return pa.DictionaryArray.from_arrays(indices, self.dictionary)
+
+        convert = self.convert
+
+        if convert is not None:
+            values = [v if v is None else convert(v) for v in values]
+
+        return pa.array(values, type=self.type)
+
+
+class ParquetExporter(BaseExporter):
+    short_name = 'Parquet'
+    long_name = 'Apache Parquet'
+
+    file_extension = 'parquet'
+    content_type = 'application/octet-stream'
+
+    # The raw values preserve their types, the columns are typed by the
+    # fields rather than by the formatted values.
+    preferred_formats = ('parquet', 'raw')
+
+    def get_columns(self, headers):
+        """Returns the columns of the formatters. Values of flat formatters
+        are the raw values of the fields and are typed by them. The values
+        of all other formatters are strings.
+        """
+        columns = []
+
+        for (formatter, length), keys in zip(self.params, headers):
+            if isinstance(keys, list):
+                fields = formatter.fields or {}
+
+                for key in keys:
+                    columns.append(Column(key, fields.get(key)))
+            else:
+                if keys.keys is not None:
+                    keys = keys.keys
+                elif isinstance(formatter, Formatter):
+                    keys = formatter.keys
+                else:
+                    keys = ()
+
+                for key in keys:
+                    columns.append(Column(key))
+
+        return columns
+
+    def get_batches(self, funcs, rows, size):
+        """Yields lists of up to `size` formatted rows. A single empty list
+        is yielded if there are no rows so the schema is still written.
+        """
+        batch = []
+        empty = True
+
+        for row in rows:
+            values = []
+
+            for func in funcs:
+                func(row, values)
+
+            batch.append(values)
+
+            if len(batch) >= size:
+                yield batch
+                batch = []
+                empty = False
+
+        if batch or empty:
+            yield batch
+
+    def get_table(self, columns, batch):
+        "Returns a table of the batch of rows."
+        if batch:
+            values = [list(v) for v in zip(*batch)]
+        else:
+            values = [[] for c in columns]
+
+        arrays = [column.get_array(v) for column, v in zip(columns, values)]
+
+        schema = pa.schema([c.get_field() for c in columns])
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def write(self, iterable, buff=None, force_distinct=True,
+              row_group_size=None, compression=None, *args, **kwargs):
+        """Writes the rows as a Parquet file with a row group for every
+        `row_group_size` rows. Only a single row group of values is held in
+        memory at a time.
+        """
+        if row_group_size is None:
+            row_group_size = settings.EXPORT_PARQUET_ROW_GROUP_SIZE
+
+        if compression is None:
+            compression = settings.EXPORT_PARQUET_COMPRESSION
+
+        buff = self.get_file_obj(buff)
+
+        # Responses are written from a temporary file, as in the Excel
+        # exporter.
+        streaming = getattr(buff, 'streaming', False)
+
+        if streaming or isinstance(buff, HttpResponse):
+            output = TemporaryFile()
+        else:
+            output = buff
+
+        funcs, headers = self._compile_flat(**kwargs)
+        rows = self.filter_rows(iterable, force_distinct)
+        columns = None
+        writer = None
+
+        for batch in self.get_batches(funcs, rows, row_group_size):
+            # The keys of adapted formatters are known once a row has been
+            # formatted.
+            if columns is None:
+                columns = self.get_columns(headers)
+
+            table = self.get_table(columns, batch)
+
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema,
+                                          compression=compression)
+
+            writer.write_table(table)
+
+        writer.close()
+
+        if output is not buff:
+            output.seek(0)
+
+            if streaming:
+                buff.streaming_content = FileWrapper(output)
+            else:
+                for chunk in FileWrapper(output):
+                    buff.write(chunk)
+                output.close()
+
+        return buff
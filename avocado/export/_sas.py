@@ -1,10 +1,9 @@
-from zipfile import ZipFile
-from cStringIO import StringIO
 from string import punctuation
 from django.template import Context
 from django.template.loader import get_template
 from _base import BaseExporter
 from _csv import CSVExporter
+from archives import open_archive, ZipEntryWriter
 
 
 class SASExporter(BaseExporter):
@@ -81,7 +80,8 @@ class SASExporter(BaseExporter):
 
     def write(self, iterable, buff=None, template_name='export/script.sas',
               *args, **kwargs):
-        zip_file = ZipFile(self.get_file_obj(buff), 'w')
+        compress_level = kwargs.pop('compress_level', None)
+        zip_file = open_archive(self.get_file_obj(buff), compress_level)
 
         formats = []            # sas formats for all fields
         informats = []          # sas informats for all fields
@@ -120,15 +120,13 @@ class SASExporter(BaseExporter):
         data_filename = 'data.csv'
         script_filename = 'script.sas'
 
-        # File buffers
-        data_buff = StringIO()
-        # Create the data file
+        # Create the data file, streamed into the archive
         data_exporter = CSVExporter(self.concepts)
         # Overwrite preferred formats for data file
         data_exporter.preferred_formats = self.preferred_formats
-        data_exporter.write(iterable, data_buff, *args, **kwargs)
 
-        zip_file.writestr(data_filename, data_buff.getvalue())
+        with ZipEntryWriter(zip_file, data_filename) as data_buff:
+            data_exporter.write(iterable, data_buff, *args, **kwargs)
 
         template = get_template(template_name)
         context = Context({
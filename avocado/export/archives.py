@@ -0,0 +1,131 @@
+"""Streaming of data files into zip archives.
+
+`ZipFile.writestr` requires the entire contents of a member in memory and
+`ZipFile.write` requires a file on disk and a seekable archive to rewrite
+the header once the size is known. `ZipEntryWriter` is a file-like object
+that compresses and writes the data of a member to the archive as it is
+written, so exporters can write a data file of any size with constant
+memory, including to responses.
+
+The CRC and sizes of a streamed member are not known until it is closed,
+so they follow the data in a data descriptor. Since the size is not known
+either, streamed members always use the ZIP64 extensions, which allows
+members and archives over 4GB.
+"""
+import time
+import zlib
+import struct
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED, crc32
+from avocado.conf import settings
+
+# Signature of the data descriptor following the data of a member
+DD_SIGNATURE = 0x08074b50
+
+# Version needed to extract members using the ZIP64 extensions
+ZIP64_VERSION = 45
+
+
+def open_archive(buff, compress_level=None):
+    """Returns a zip archive writing to `buff`. If `compress_level` is None,
+    the `EXPORT_COMPRESSION_LEVEL` setting is used. Members are stored
+    uncompressed if the level is None, otherwise they are deflated at the
+    level, from 0 to 9.
+    """
+    if compress_level is None:
+        compress_level = settings.EXPORT_COMPRESSION_LEVEL
+
+    if compress_level is None:
+        compression = ZIP_STORED
+    else:
+        compression = ZIP_DEFLATED
+
+    zip_file = ZipFile(buff, 'w', compression, allowZip64=True)
+    zip_file.compress_level = compress_level
+
+    return zip_file
+
+
+class ZipEntryWriter(object):
+    """File-like object for writing a member of the archive named `arcname`.
+    The member is complete once the writer is closed and no other member
+    can be written to the archive until then.
+    """
+    def __init__(self, zip_file, arcname, compress_level=None):
+        if not zip_file.fp:
+            raise RuntimeError('Attempt to write to ZIP archive that was '
+                               'already closed')
+
+        if compress_level is None:
+            compress_level = getattr(zip_file, 'compress_level', None)
+
+        zinfo = ZipInfo(arcname, time.localtime(time.time())[:6])
+        zinfo.compress_type = zip_file.compression
+        zinfo.external_attr = 0600 << 16
+        zinfo.flag_bits |= 0x08
+        zinfo.extract_version = ZIP64_VERSION
+        zinfo.create_version = ZIP64_VERSION
+        zinfo.file_size = zinfo.compress_size = zinfo.CRC = 0
+        zinfo.header_offset = zip_file.fp.tell()
+
+        zip_file._writecheck(zinfo)
+        zip_file._didModify = True
+        zip_file.fp.write(zinfo.FileHeader(zip64=True))
+
+        if zinfo.compress_type == ZIP_DEFLATED:
+            if compress_level is None:
+                compress_level = zlib.Z_DEFAULT_COMPRESSION
+            self._compressor = zlib.compressobj(compress_level,
+                                                zlib.DEFLATED, -15)
+        else:
+            self._compressor = None
+
+        self.zip_file = zip_file
+        self.zinfo = zinfo
+        self.closed = False
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+
+        zinfo = self.zinfo
+        zinfo.file_size += len(data)
+        zinfo.CRC = crc32(data, zinfo.CRC) & 0xffffffff
+
+        if self._compressor:
+            data = self._compressor.compress(data)
+
+        zinfo.compress_size += len(data)
+        self.zip_file.fp.write(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def close(self):
+        "Writes the data descriptor and adds the member to the archive."
+        if self.closed:
+            return
+
+        zinfo = self.zinfo
+
+        if self._compressor:
+            data = self._compressor.flush()
+            zinfo.compress_size += len(data)
+            self.zip_file.fp.write(data)
+
+        self.zip_file.fp.write(struct.pack(
+            '<LLQQ', DD_SIGNATURE, zinfo.CRC, zinfo.compress_size,
+            zinfo.file_size))
+
+        self.zip_file.filelist.append(zinfo)
+        self.zip_file.NameToInfo[zinfo.filename] = zinfo
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,210 @@
+"""Parallel export of large results across processes.
+
+Formatting the rows of an export is bound to a single core. Here the parent
+process streams the raw rows of the query, applies `force_distinct` across
+the whole result and splits the rows into chunks of contiguous ranges of
+the view's ordering. Each chunk is formatted and written by a pool of
+processes and the output of the chunks is merged in order.
+
+The output is either an ordered concatenation of the chunks, for
+exporters that are `concatenable`, or a zip archive with a part per chunk.
+At most twice as many chunks as workers are in flight at any time, so
+memory is bounded regardless of the number of rows.
+"""
+from collections import deque
+from cStringIO import StringIO
+from multiprocessing import Pool, cpu_count
+from zipfile import ZipFile, ZIP_DEFLATED
+from avocado.conf import settings
+
+# Arguments of the exporter of a worker process, set by `init_worker`, and
+# the exporter once it is built by the first task of the process
+_worker = {}
+
+
+def init_worker(*args):
+    """Initializes a worker process of an export with the arguments of
+    `get_exporter`. The exporter is built by the first task so errors are
+    raised by the task rather than the pool.
+    """
+    from avocado.core.utils import close_connections
+
+    close_connections()
+    _worker.clear()
+    _worker['args'] = args
+
+
+def get_processor(context_json=None, view_json=None, tree=None,
+                  processor='default', include_pk=True):
+    "Returns the query processor for the query."
+    from avocado.models import DataContext, DataView
+    from avocado.query.pipeline import query_processors
+
+    context = view = None
+
+    if context_json is not None:
+        context = DataContext(json=context_json)
+
+    if view_json is not None:
+        view = DataView(json=view_json)
+
+    return query_processors[processor](context=context, view=view, tree=tree,
+                                       include_pk=include_pk)
+
+
+def get_exporter(exporter, view_json=None, tree=None, processor='default',
+                 include_pk=True):
+    "Returns the exporter for the view."
+    from avocado.export import registry
+
+    query_processor = get_processor(view_json=view_json, tree=tree,
+                                    processor=processor,
+                                    include_pk=include_pk)
+
+    return query_processor.get_exporter(registry[exporter])
+
+
+def write_chunk(instance, rows, header):
+    """Formats and writes a chunk of rows with the exporter and returns the
+    output. The header is only written if `header` is true.
+    """
+    kwargs = {}
+    if instance.concatenable:
+        kwargs['header'] = header
+
+    buff = StringIO()
+    instance.write(rows, buff, force_distinct=False, **kwargs)
+
+    return buff.getvalue()
+
+
+def write_worker_chunk(args):
+    "Writes a chunk of rows with the exporter of the worker process."
+    if 'exporter' not in _worker:
+        _worker['exporter'] = get_exporter(*_worker['args'])
+
+    return write_chunk(_worker['exporter'], *args)
+
+
+def chunk_rows(rows, chunk_size):
+    "Yields lists of up to `chunk_size` consecutive rows."
+    chunk = []
+
+    for row in rows:
+        chunk.append(row)
+
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def merge_chunks(pool, func, tasks, write, window):
+    """Applies `func` to the arguments of each `(index, args)` task in the
+    pool and writes the outputs in the order of the tasks. At most `window`
+    tasks are pending at any time. Returns the number of chunks.
+    """
+    pending = deque()
+    count = 0
+
+    for index, args in tasks:
+        pending.append((index, pool.apply_async(func, (args,))))
+
+        # Write the completed chunks in order
+        while len(pending) >= window or \
+                (pending and pending[0][1].ready()):
+            index, result = pending.popleft()
+            write(index, result.get())
+            count += 1
+
+    while pending:
+        index, result = pending.popleft()
+        write(index, result.get())
+        count += 1
+
+    return count
+
+
+def part_name(index, file_extension):
+    return u'part-{0:05d}.{1}'.format(index + 1, file_extension)
+
+
+def export(exporter, buff, context_json=None, view_json=None, tree=None,
+           processor='default', include_pk=True, force_distinct=True,
+           workers=None, chunk_size=None, archive=None):
+    """Exports the query to `buff` using a pool of `workers` processes,
+    formatting `chunk_size` rows per task.
+
+    If `archive` is true, or the exporter is not `concatenable`, a zip
+    archive of the parts is written. If `workers` is 1 or less, the chunks
+    are written in the current process. Returns the number of chunks.
+    """
+    from avocado.core.utils import close_connections
+    from avocado.export import registry
+
+    if workers is None:
+        workers = settings.EXPORT_PARALLEL_WORKERS or cpu_count()
+
+    if chunk_size is None:
+        chunk_size = settings.EXPORT_PARALLEL_CHUNK_SIZE
+
+    klass = registry[exporter]
+
+    if archive is None:
+        archive = not klass.concatenable
+
+    query_processor = get_processor(context_json, view_json, tree=tree,
+                                    processor=processor,
+                                    include_pk=include_pk)
+
+    # The exporter of the parent filters the rows and writes the chunks if
+    # there are no workers
+    instance = query_processor.get_exporter(klass)
+    iterable = query_processor.get_iterable(stream=True)
+    rows = instance.filter_rows(iterable, force_distinct)
+
+    if archive:
+        zip_file = ZipFile(buff, 'w', ZIP_DEFLATED, allowZip64=True)
+
+    def write(index, output):
+        if archive:
+            zip_file.writestr(part_name(index, klass.file_extension), output)
+        else:
+            buff.write(output)
+
+    def tasks():
+        # Each part of an archive is a complete file
+        for index, chunk in enumerate(chunk_rows(rows, chunk_size)):
+            yield index, (chunk, archive or index == 0)
+
+    count = 0
+
+    if workers <= 1:
+        for index, args in tasks():
+            write(index, write_chunk(instance, *args))
+            count += 1
+    else:
+        # The forked workers must not inherit an open connection, the
+        # rows are only queried once the tasks are consumed.
+        close_connections()
+        pool = Pool(workers, initializer=init_worker,
+                    initargs=(exporter, view_json, tree, processor,
+                              include_pk))
+
+        try:
+            count = merge_chunks(pool, write_worker_chunk, tasks(), write,
+                                 workers * 2)
+            pool.close()
+        except Exception:
+            # Pending chunks are discarded rather than waited on
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    if archive:
+        zip_file.close()
+
+    return count
@@ -7,6 +7,7 @@ except ImportError:
     from ordereddict import OrderedDict
 from django.utils.encoding import force_unicode
 from avocado.core import loader
+from avocado import metadata
 
 log = logging.getLogger(__name__)
 
@@ -71,6 +72,17 @@ def process_multiple(func):
     return func
 
 
+def accepts(*types):
+    """Decorator for marking the types of values a formatter method is able
+    to format. The method is skipped for values of any other type when
+    formatting with a compiled formatter.
+    """
+    def decorator(func):
+        func.accepts = types
+        return func
+    return decorator
+
+
 class Formatter(object):
     """Provides support for the core data formats with sensible defaults
     for handling converting Python datatypes to their formatted equivalent.
@@ -102,7 +114,8 @@ class Formatter(object):
         self.fields = None
 
         if concept:
-            fields = list(concept.fields.order_by('concept_fields__order'))
+            fields = metadata.get_fields_for_concepts([concept.pk])\
+                .get(concept.pk, [])
             self.fields = OrderedDict(_unique_keys(fields))
             self.keys = self.fields.keys()
         else:
@@ -112,14 +125,76 @@ class Formatter(object):
         # logging the exception twice
         self._errors = {}
 
+    def _get_methods(self, preferred_formats=None):
+        """Returns the multi-value and single-value methods of the preferred
+        formats this formatter supports in order. The `raw` format is always
+        the last single-value method.
+        """
+        if preferred_formats is None:
+            preferred_formats = self.default_formats
+
+        multiple = []
+        single = []
+
+        for f in list(preferred_formats) + ['raw']:
+            method = getattr(self, u'to_{0}'.format(f), None)
+
+            # This formatter does not support this format
+            if not method:
+                continue
+
+            if getattr(method, 'process_multiple', False):
+                multiple.append(method)
+            else:
+                single.append(method)
+
+        return multiple, single
+
+    def _format_multiple(self, methods, values, **context):
+        """Attempts to process all values with each multi-value method and
+        returns the output of the first that succeeds.
+        """
+        for method in methods:
+            try:
+                output = method(values, fields=self.fields,
+                                concept=self.concept,
+                                process_multiple=True, **context)
+                if not isinstance(output, dict):
+                    return OrderedDict([(self.concept.name, output)])
+                return output
+            except Exception:
+                if self.concept and self.concept not in self._errors:
+                    self._errors[self.concept] = None
+                    log.warning(u'Multi-value formatter error',
+                                exc_info=True)
+
+    def _value_error(self, field):
+        if field and field not in self._errors:
+            self._errors[field] = None
+            log.warning(u'Single-value formatter error', exc_info=True)
+
+    def _format_value(self, methods, output, key, value, field, **context):
+        "Formats the value with the first method that succeeds."
+        for method in methods:
+            try:
+                fvalue = method(value, field=field, concept=self.concept,
+                                process_multiple=False, **context)
+            except Exception:
+                self._value_error(field)
+                continue
+
+            if isinstance(fvalue, dict):
+                output.update(fvalue)
+            else:
+                output[key] = fvalue
+            return
+
     def __call__(self, values, preferred_formats=None, **context):
-        # Create a copy of the preferred formats since each set values may
-        # be processed slightly differently (e.g. mixed data type in column)
+        # Resolve the methods for each set of values since each set may be
+        # processed slightly differently (e.g. mixed data type in column)
         # which could cause exceptions that would not be present during
         # processing of other values
-        if preferred_formats is None:
-            preferred_formats = self.default_formats
-        preferred_formats = list(preferred_formats) + ['raw']
+        multiple, single = self._get_methods(preferred_formats)
 
         # Create a OrderedDict of the values relative to the
         # concept fields objects the values represent. This
@@ -131,67 +206,183 @@ class Formatter(object):
                 values = [values]
             values = OrderedDict(zip(self.keys, values))
 
-        # Iterate over all preferred formats and attempt to process the values.
-        # For formatter methods that process all values must be tracked and
-        # attempted only once. They are removed from the list once attempted.
-        # If no preferred multi-value methods succeed, each value is processed
-        # independently with the remaining formats
-        for f in iter(preferred_formats):
-            method = getattr(self, u'to_{0}'.format(f), None)
-            # This formatter does not support this format, remove it
-            # from the available list
-            if not method:
-                preferred_formats.pop(0)
-                continue
-
-            # The implicit behavior when handling multiple values is to process
-            # them independently since, in most cases, they are not dependent
-            # on one another, but rather should be represented together since
-            # the data is related. A formatter method can be flagged to process
-            # all values together by setting the attribute
-            # `process_multiple=True`. we must # check to if that flag has been
-            # set and simply pass through the values and context to the method
-            # as is. if ``process_multiple`` is not set, each value is handled
-            # independently
-            if getattr(method, 'process_multiple', False):
-                try:
-                    output = method(values, fields=self.fields,
-                                    concept=self.concept,
-                                    process_multiple=True, **context)
-                    if not isinstance(output, dict):
-                        return OrderedDict([(self.concept.name, output)])
-                    return output
-                # Remove from the preferred formats list since it failed
-                except Exception:
-                    if self.concept and self.concept not in self._errors:
-                        self._errors[self.concept] = None
-                        log.warning(u'Multi-value formatter error',
-                                    exc_info=True)
-                    preferred_formats.pop(0)
+        # The implicit behavior when handling multiple values is to process
+        # them independently since, in most cases, they are not dependent
+        # on one another, but rather should be represented together since
+        # the data is related. A formatter method can be flagged to process
+        # all values together by setting the attribute
+        # `process_multiple=True`. These are attempted first and if none
+        # succeed, each value is processed independently with the remaining
+        # formats.
+        if multiple:
+            output = self._format_multiple(multiple, values, **context)
+            if output is not None:
+                return output
 
         # The output is independent of the input. Formatters may output more
         # or less values than what was entered.
         output = OrderedDict()
 
-        # Attempt to process each
-        for i, (key, value) in enumerate(values.iteritems()):
-            for f in preferred_formats:
-                method = getattr(self, u'to_{0}'.format(f))
-                field = self.fields[key] if self.fields else None
+        for key, value in values.iteritems():
+            field = self.fields[key] if self.fields else None
+            self._format_value(single, output, key, value, field, **context)
+
+        return output
+
+    def _compile_columns(self, methods, **context):
+        """Returns the key, field, keyword arguments and a cache of methods
+        by value type for each column, and a function that resolves the
+        methods for a value from the cache.
+        """
+        columns = []
+
+        for key in self.keys:
+            field = self.fields[key] if self.fields else None
+            kwargs = dict(context, field=field, concept=self.concept,
+                          process_multiple=False)
+            columns.append((key, field, kwargs, {}))
+
+        def get_methods(cache, value):
+            kind = type(value)
+
+            if kind not in cache:
+                cache[kind] = [m for m in methods
+                               if not hasattr(m, 'accepts')
+                               or issubclass(kind, m.accepts)]
+
+            return cache[kind]
+
+        return columns, get_methods
+
+    def _overrides_call(self, name):
+        """Returns true if `__call__` is overridden by a subclass that does not
+        also override the method `name`, in which case the method cannot
+        assume the behavior of `Formatter.__call__`.
+        """
+        for klass in type(self).__mro__:
+            if name in klass.__dict__:
+                return False
+
+            if '__call__' in klass.__dict__:
+                return True
+
+        return False
+
+    def compile(self, preferred_formats=None, **context):
+        """Returns a function that takes a sequence of values and formats them
+        equivalently to calling the formatter with the preferred formats and
+        context. This is intended for formatting many rows, e.g. an export.
+
+        The methods, fields and keyword arguments are resolved once rather
+        than for each set of values. For each column, the methods marked with
+        `accepts` that cannot format the type of a value are skipped, which
+        is determined once per type. Formatters with multi-value methods or
+        that override `__call__` fall back to calling the formatter.
+        """
+        multiple, single = self._get_methods(preferred_formats)
+
+        if multiple or self._overrides_call('compile'):
+            def format_multiple(values):
+                return self(values, preferred_formats, **context)
+            return format_multiple
+
+        columns, get_methods = self._compile_columns(single, **context)
+
+        format_value = self._format_value
+
+        def format_values(values):
+            if isinstance(values, OrderedDict):
+                return self(values, preferred_formats, **context)
+
+            if not isinstance(values, (list, tuple)):
+                values = [values]
+
+            output = OrderedDict()
+
+            for (key, field, kwargs, methods), value in zip(columns, values):
+                methods = methods.get(type(value)) or \
+                    get_methods(methods, value)
+
+                # Inline the common case of the first method succeeding
                 try:
-                    fvalue = method(value, field=field, concept=self.concept,
-                                    process_multiple=False, **context)
-                    if isinstance(fvalue, dict):
-                        output.update(fvalue)
-                    else:
-                        output[key] = fvalue
-                    break
+                    fvalue = methods[0](value, **kwargs)
                 except Exception:
-                    if field and field not in self._errors:
-                        self._errors[field] = None
-                        log.warning(u'Single-value formatter error',
-                                    exc_info=True)
-        return output
+                    self._value_error(field)
+                    format_value(methods[1:], output, key, value, field,
+                                 **context)
+                    continue
+
+                if isinstance(fvalue, dict):
+                    output.update(fvalue)
+                else:
+                    output[key] = fvalue
+
+            return output
+
+        return format_values
+
+    def is_flat(self, preferred_formats=None):
+        """Returns true if each value is formatted to exactly one value, so
+        the output can be represented as a sequence in the order of `keys`.
+        This is only known for the single-value methods defined here, since
+        multi-value methods, the methods of subclasses and subclasses that
+        override `__call__` may output more or less values than what was
+        entered.
+        """
+        if self._overrides_call('is_flat'):
+            return False
+
+        multiple, single = self._get_methods(preferred_formats)
+
+        if multiple:
+            return False
+
+        for method in single:
+            base = getattr(Formatter, method.__name__, None)
+
+            if getattr(base, '__func__', None) is not method.__func__:
+                return False
+
+        return True
+
+    def compile_flat(self, preferred_formats=None, offset=0, **context):
+        """Returns a function that takes a row and a list, and appends the
+        formatted values of the `len(keys)` columns of the row starting at
+        `offset` to the list. The row is not sliced and no dict is built per
+        row. The output is equivalent to the values of calling the formatter
+        and its header is `keys`.
+
+        This requires the formatter to be flat for the preferred formats,
+        otherwise a `ValueError` is raised.
+        """
+        if not self.is_flat(preferred_formats):
+            raise ValueError('{0} is not flat for the formats {1}'.format(
+                self.__class__.__name__, preferred_formats))
+
+        multiple, single = self._get_methods(preferred_formats)
+        columns, get_methods = self._compile_columns(single, **context)
+
+        columns = [(offset + i, field, kwargs, methods)
+                   for i, (key, field, kwargs, methods)
+                   in enumerate(columns)]
+
+        def format_values(row, output):
+            for index, field, kwargs, methods in columns:
+                value = row[index]
+                methods = methods.get(type(value)) or \
+                    get_methods(methods, value)
+
+                for method in methods:
+                    try:
+                        output.append(method(value, **kwargs))
+                        break
+                    except Exception:
+                        self._value_error(field)
+                else:
+                    # Keep the values aligned with the header
+                    output.append(None)
+
+        return format_values
 
     def __contains__(self, choice):
         return hasattr(self, u'to_{0}'.format(choice))
@@ -207,6 +398,7 @@ class Formatter(object):
             return u''
         return force_unicode(value, strings_only=False)
 
+    @accepts(bool)
     def to_boolean(self, value, **context):
         # If value is native True or False value, return it
         if type(value) is bool:
@@ -214,6 +406,7 @@ class Formatter(object):
         raise FormatterException(u'Cannot convert {0} to boolean'.format(
             value))
 
+    @accepts(int, float, Decimal, basestring)
     def to_number(self, value, **context):
         # Attempts to convert a number. Starting with ints and floats
         # Eventually create to_decimal using the decimal library.
@@ -248,6 +441,15 @@ class RawFormatter(Formatter):
         preferred_formats = ['raw']
         return super(RawFormatter, self).__call__(values, preferred_formats)
 
+    def compile(self, *args, **kwargs):
+        return super(RawFormatter, self).compile(['raw'])
+
+    def is_flat(self, *args, **kwargs):
+        return super(RawFormatter, self).is_flat(['raw'])
+
+    def compile_flat(self, preferred_formats=None, offset=0, **context):
+        return super(RawFormatter, self).compile_flat(['raw'], offset)
+
 
 registry = loader.Registry(default=Formatter, register_instance=False)
 loader.autodiscover('formatters')
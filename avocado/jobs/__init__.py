@@ -0,0 +1,250 @@
+"""Runs counts and exports outside of the request.
+
+Jobs are persisted in the `Job` model and executed by the executor defined
+by the `JOBS_EXECUTOR` setting, a pool of threads by default. Export jobs
+stream the output of the exporter to a file in the file store while
+periodically recording the number of rows read and bytes written. A job
+can be cancelled while it is pending or running and the output of a
+finished export can be downloaded with `get_response`.
+"""
+import logging
+from datetime import datetime
+from django.db import transaction
+from avocado.conf import settings
+from .models import Job, PENDING, RUNNING, DONE, FAILED, CANCELLED, COUNT, \
+    EXPORT
+from .storage import file_store
+from .executors import get_executor
+
+log = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _update(job, **kwargs):
+    "Updates the job without touching the other columns."
+    for key, value in kwargs.items():
+        setattr(job, key, value)
+    Job.objects.filter(pk=job.pk).update(**kwargs)
+
+
+class ProgressIterator(object):
+    """Wraps the iterable read by the exporter to record the number of rows
+    read and the bytes written every `JOBS_PROGRESS_INTERVAL` rows. The job
+    is stopped if cancellation was requested.
+    """
+    def __init__(self, job, iterable, buff=None, interval=None):
+        self.job = job
+        self.iterable = iterable
+        self.buff = buff
+        self.interval = interval or settings.JOBS_PROGRESS_INTERVAL
+        self.rows = 0
+
+        # Rows are read in the order of the iterable
+        if hasattr(iterable, 'run_key_length'):
+            self.run_key_length = iterable.run_key_length
+
+    def __iter__(self):
+        for row in self.iterable:
+            self.rows += 1
+
+            if self.rows % self.interval == 0:
+                self.update()
+
+            yield row
+
+        self.update()
+
+    def update(self):
+        values = {'rows': self.rows}
+
+        if self.buff is not None:
+            values['bytes'] = self.buff.tell()
+
+        updated = Job.objects.filter(pk=self.job.pk, cancel_requested=False)\
+            .update(**values)
+
+        if not updated:
+            raise JobCancelled
+
+        for key, value in values.items():
+            setattr(self.job, key, value)
+
+
+def get_processor(job):
+    "Returns the query processor for the job's query."
+    from avocado.models import DataContext, DataView
+    from avocado.query.pipeline import query_processors
+
+    context = view = None
+
+    if job.context_json is not None:
+        context = DataContext(json=job.context_json)
+
+    if job.view_json is not None:
+        view = DataView(json=job.view_json)
+
+    return query_processors[job.processor](context=context, view=view,
+                                           tree=job.tree)
+
+
+def _run_count(job, processor):
+    count = processor.get_queryset().count()
+    _update(job, status=DONE, count=count, finished=datetime.now())
+
+
+def _run_export(job, processor):
+    from avocado.export import registry as exporters
+
+    queryset = processor.get_queryset()
+    _update(job, total=queryset.count())
+
+    exporter = processor.get_exporter(exporters[job.exporter])
+    filename = u'{0}.{1}'.format(job.pk, exporter.file_extension)
+
+    buff = file_store.open(filename, 'wb')
+
+    try:
+        iterable = ProgressIterator(job,
+                                    processor.get_iterable(stream=True), buff)
+        exporter.write(iterable, buff=buff)
+        buff.close()
+    except Exception:
+        # The partial output of cancelled and failed jobs is not kept
+        buff.close()
+        file_store.delete(filename)
+        raise
+
+    _update(job, status=DONE, filename=filename, rows=iterable.rows,
+            bytes=file_store.size(filename), finished=datetime.now())
+
+
+def run(pk):
+    "Runs the job. This is called by the executors."
+    try:
+        job = Job.objects.get(pk=pk)
+    except Job.DoesNotExist:
+        log.error(u'Job {0} does not exist'.format(pk))
+
+        # Fails the job in case it was committed after it was read, rather
+        # than leaving it pending
+        Job.objects.filter(pk=pk).update(
+            status=FAILED, error=u'The job does not exist',
+            finished=datetime.now())
+        return
+
+    if job.status != PENDING:
+        return
+
+    if job.cancel_requested:
+        _update(job, status=CANCELLED, finished=datetime.now())
+        return
+
+    _update(job, status=RUNNING, started=datetime.now())
+
+    try:
+        processor = get_processor(job)
+
+        if job.kind == COUNT:
+            _run_count(job, processor)
+        else:
+            _run_export(job, processor)
+    except JobCancelled:
+        _update(job, status=CANCELLED, finished=datetime.now())
+    except Exception, e:
+        log.exception(u'Error running job {0}'.format(pk))
+        _update(job, status=FAILED, error=unicode(e), finished=datetime.now())
+
+    return job
+
+
+def _submit(executor=None, **kwargs):
+    """Saves the job and submits it to the executor.
+
+    Workers of other threads and processes use their own connection, so the
+    job must be committed before it is read. Outside of a managed
+    transaction the save is committed, otherwise committing is left to the
+    caller, who should submit jobs after committing or use the `sync`
+    executor.
+    """
+    job = Job(**kwargs)
+    job.save()
+
+    # Only commits if the transaction is not managed by the caller
+    transaction.commit_unless_managed()
+
+    get_executor(executor).submit(job.pk)
+    return job
+
+
+def submit_count(context_json=None, view_json=None, tree=None,
+                 processor='default', user=None, session_key=None,
+                 executor=None):
+    "Submits a job counting the records of the query. Returns the job."
+    return _submit(kind=COUNT, context_json=context_json,
+                   view_json=view_json, tree=tree, processor=processor,
+                   user=user, session_key=session_key, executor=executor)
+
+
+def submit_export(exporter, context_json=None, view_json=None, tree=None,
+                  processor='default', user=None, session_key=None,
+                  executor=None):
+    """Submits a job exporting the query with the exporter registered under
+    the `exporter` key. Returns the job.
+    """
+    return _submit(kind=EXPORT, exporter=exporter,
+                   context_json=context_json, view_json=view_json, tree=tree,
+                   processor=processor, user=user, session_key=session_key,
+                   executor=executor)
+
+
+def cancel(job):
+    """Requests the job to be cancelled. Pending jobs are cancelled
+    immediately, running jobs stop the next time progress is recorded.
+    """
+    Job.objects.filter(pk=job.pk, status__in=(PENDING, RUNNING))\
+        .update(cancel_requested=True)
+
+    if job.status == PENDING:
+        Job.objects.filter(pk=job.pk, status=PENDING)\
+            .update(status=CANCELLED, finished=datetime.now())
+
+    job.cancel_requested = True
+
+
+def open_result(job):
+    "Returns the file object of the output of a finished export job."
+    if job.kind != EXPORT or job.status != DONE:
+        raise ValueError('The job has no result')
+    return file_store.open(job.filename)
+
+
+def get_response(job):
+    "Returns a response streaming the output of a finished export job."
+    from django.core.servers.basehttp import FileWrapper
+
+    try:
+        from django.http import StreamingHttpResponse
+    except ImportError:
+        # Django 1.4 streams the iterator of a regular response
+        from django.http import HttpResponse as StreamingHttpResponse
+    from avocado.export import registry as exporters
+
+    klass = exporters[job.exporter]
+
+    response = StreamingHttpResponse(FileWrapper(open_result(job)),
+                                     content_type=klass.content_type)
+    response['Content-Disposition'] = \
+        'attachment; filename="{0}"'.format(job.filename)
+    response['Content-Length'] = job.bytes
+
+    return response
+
+
+def delete(job):
+    "Deletes the job and the output of the export, if any."
+    if job.filename:
+        file_store.delete(job.filename)
+    job.delete()
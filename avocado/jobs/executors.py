@@ -0,0 +1,81 @@
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from avocado.conf import settings
+from avocado.core.utils import close_connections
+
+
+def _run(pk):
+    # Imported here to prevent a circular import
+    from avocado.jobs import run
+
+    try:
+        run(pk)
+    finally:
+        close_connections()
+
+
+class SyncExecutor(object):
+    "Runs jobs immediately in the calling thread, mainly for testing."
+    def submit(self, pk):
+        from avocado.jobs import run
+        run(pk)
+
+    def shutdown(self):
+        pass
+
+
+class ThreadExecutor(object):
+    "Runs jobs in a pool of threads within the current process."
+    pool_class = ThreadPool
+
+    def __init__(self, workers=None):
+        self.workers = workers or settings.JOBS_WORKERS
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = self.pool_class(self.workers)
+        return self._pool
+
+    def submit(self, pk):
+        self.pool.apply_async(_run, (pk,))
+
+    def shutdown(self):
+        "Waits for the submitted jobs to finish."
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+class ProcessExecutor(ThreadExecutor):
+    """Runs jobs in a pool of processes. The database connections of the
+    current process are closed before the pool is created so the workers
+    do not share them.
+    """
+    @property
+    def pool(self):
+        if self._pool is None:
+            close_connections()
+            self._pool = Pool(self.workers, initializer=close_connections)
+        return self._pool
+
+
+EXECUTORS = {
+    'sync': SyncExecutor,
+    'thread': ThreadExecutor,
+    'process': ProcessExecutor,
+}
+
+_executors = {}
+
+
+def get_executor(name=None):
+    "Returns the shared executor defined by the `JOBS_EXECUTOR` setting."
+    name = name or settings.JOBS_EXECUTOR
+
+    if name not in _executors:
+        _executors[name] = EXECUTORS[name]()
+
+    return _executors[name]
@@ -0,0 +1,98 @@
+import time
+import jsonfield
+from datetime import datetime
+from django.db import models
+from django.contrib.auth.models import User
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+STATUS_CHOICES = (
+    (PENDING, 'Pending'),
+    (RUNNING, 'Running'),
+    (DONE, 'Done'),
+    (FAILED, 'Failed'),
+    (CANCELLED, 'Cancelled'),
+)
+
+COUNT = 'count'
+EXPORT = 'export'
+
+KIND_CHOICES = (
+    (COUNT, 'Count'),
+    (EXPORT, 'Export'),
+)
+
+
+class Job(models.Model):
+    "Persistent state of a count or export run outside of the request."
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES,
+                              default=PENDING, db_index=True)
+
+    # The query to run
+    context_json = jsonfield.JSONField(null=True, blank=True)
+    view_json = jsonfield.JSONField(null=True, blank=True)
+    tree = models.CharField(max_length=100, null=True, blank=True)
+    processor = models.CharField(max_length=100, default='default')
+
+    # The key of the exporter in `avocado.export.registry`
+    exporter = models.CharField(max_length=100, null=True, blank=True)
+
+    # The user and/or session that submitted the job
+    user = models.ForeignKey(User, null=True, blank=True, related_name='+')
+    session_key = models.CharField(max_length=40, null=True, blank=True)
+
+    # Progress. `total` is the number of rows to be read which is used to
+    # estimate the time remaining.
+    total = models.BigIntegerField(null=True, blank=True)
+    rows = models.BigIntegerField(default=0)
+    bytes = models.BigIntegerField(default=0)
+
+    # The result of a count job or the name of the file in the file store
+    # for an export job
+    count = models.IntegerField(null=True, blank=True)
+    filename = models.CharField(max_length=200, null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    # Set to request a running job to stop
+    cancel_requested = models.BooleanField(default=False)
+
+    created = models.DateTimeField(default=datetime.now)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta(object):
+        app_label = 'avocado'
+        ordering = ('-created',)
+
+    def __unicode__(self):
+        return u'{0} job #{1} ({2})'.format(self.kind, self.pk, self.status)
+
+    @property
+    def finished_running(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def progress(self):
+        "Returns the fraction of rows read or None if unknown."
+        if self.status == DONE:
+            return 1.0
+
+        if self.total:
+            return min(self.rows / float(self.total), 1.0)
+
+    @property
+    def eta(self):
+        "Returns the estimated number of seconds remaining or None."
+        if self.status != RUNNING or not self.started or not self.rows or \
+                not self.total:
+            return
+
+        elapsed = time.mktime(datetime.now().timetuple()) - \
+            time.mktime(self.started.timetuple())
+
+        return max(elapsed / self.rows * (self.total - self.rows), 0)
@@ -0,0 +1,43 @@
+import os
+import tempfile
+from avocado.conf import settings
+
+
+class FileStore(object):
+    """Stores the output of export jobs as files in a directory. The
+    directory defaults to the `JOBS_FILE_ROOT` setting or a directory in
+    the system's temporary directory.
+    """
+    def __init__(self, location=None):
+        self._location = location
+
+    @property
+    def location(self):
+        location = self._location or settings.JOBS_FILE_ROOT
+
+        if not location:
+            location = os.path.join(tempfile.gettempdir(), 'avocado-jobs')
+
+        if not os.path.exists(location):
+            os.makedirs(location)
+
+        return location
+
+    def path(self, name):
+        return os.path.join(self.location, name)
+
+    def open(self, name, mode='rb'):
+        return open(self.path(name), mode)
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def size(self, name):
+        return os.path.getsize(self.path(name))
+
+    def delete(self, name):
+        if self.exists(name):
+            os.remove(self.path(name))
+
+
+file_store = FileStore()
@@ -1,9 +1,12 @@
 import sys
 import time
 import logging
+from multiprocessing import Pool
+from collections import defaultdict
 from optparse import make_option
 from django.core.management.base import BaseCommand, CommandError
 from avocado.models import DataField
+from avocado.core.utils import close_connections
 from avocado.management.base import DataFieldCommand
 
 log = logging.getLogger(__name__)
@@ -22,12 +25,98 @@ for attr_name in dir(DataField):
 CACHED_METHODS = tuple(CACHED_METHODS)
 
 
+def _numeric(field):
+    return field.simple_type == 'number'
+
+
+# Methods that only return data for some fields, keyed by the method name.
+# They return None for other fields which is never cached, so they are
+# skipped rather than always being computed and considered stale.
+METHOD_CONDITIONS = {
+    'codes': lambda field: field.lexicon,
+    'avg': _numeric,
+    'sum': _numeric,
+    'stddev': _numeric,
+    'variance': _numeric,
+}
+
+# Upper bounds in seconds of the buckets used for the timing histograms.
+HISTOGRAM_BUCKETS = (0.01, 0.1, 1, 10, 60)
+
+
 __doc__ = """\
 Pre-caches data produced by various DataField methods that are data dependent.
+Methods whose data is already cached for the current data version are skipped.
 Pass `--flush` to explicitly flush any existing cache for each method.
+Pass `--workers` to compute the cache across multiple processes.
 """
 
 
+def get_methods(field, methods):
+    "Returns the methods that apply to the field."
+    return [m for m in methods
+            if m not in METHOD_CONDITIONS or METHOD_CONDITIONS[m](field)]
+
+
+def is_stale(field, methods):
+    "Returns true if any of the methods is not cached for the field."
+    for method in get_methods(field, methods):
+        if not getattr(DataField, method).cached(field):
+            return True
+    return False
+
+
+def cache_field(pk, methods, flush=False):
+    """Computes the cache for each method that applies to the field. Returns
+    a list of `(method, seconds)` pairs where the seconds is `None` if the
+    method was already cached.
+    """
+    field = DataField.objects.get(pk=pk)
+    timings = []
+
+    for method in get_methods(field, methods):
+        func = getattr(field, method)
+
+        if flush:
+            func.flush(field)
+        elif func.cached(field):
+            timings.append((method, None))
+            continue
+
+        t0 = time.time()
+        func()
+        timings.append((method, time.time() - t0))
+
+    return timings
+
+
+def _cache_field(args):
+    # Wrapper for `Pool.imap_unordered` which passes a single argument.
+    try:
+        return cache_field(*args)
+    except Exception:
+        log.exception('Error caching field {0}'.format(args[0]))
+        raise
+
+
+def histogram(timings):
+    "Returns a list of `(label, count)` pairs bucketing the timings."
+    counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    for seconds in timings:
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if seconds < bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+
+    labels = ['< {0}s'.format(b) for b in HISTOGRAM_BUCKETS]
+    labels.append('>= {0}s'.format(HISTOGRAM_BUCKETS[-1]))
+
+    return zip(labels, counts)
+
+
 class Command(DataFieldCommand):
     help = __doc__
 
@@ -36,18 +125,43 @@ class Command(DataFieldCommand):
                     'cache for each cached property.'),
 
         make_option('--method', action='append', dest='methods',
-                    default=CACHED_METHODS, help='Select which methods to '
-                    'pre-cache. Choices: {0}'.format(
-                        ', '.join(CACHED_METHODS))),
+                    help='Select which methods to pre-cache. Choices: {0}'
+                    .format(', '.join(CACHED_METHODS))),
+
+        make_option('--workers', type='int', dest='workers', default=1,
+                    help='Number of processes used to compute the cache.'),
+
+        make_option('--only-stale', action='store_true', dest='only_stale',
+                    default=False, help='Only process fields that have '
+                    'methods without cache for their current data version.'),
     )
 
-    def _progress(self):
-        sys.stdout.write('.')
+    def _progress(self, count, total, elapsed):
+        if count:
+            eta = int(elapsed / count * (total - count))
+        else:
+            eta = '?'
+
+        sys.stdout.write('\r{0}/{1} fields, ETA {2} s '.format(
+            count, total, eta))
         sys.stdout.flush()
 
+    def _report(self, timings, skipped):
+        for method in sorted(set(timings) | set(skipped)):
+            values = timings[method]
+
+            print(u'\n{0}: {1} computed ({2} s), {3} skipped'.format(
+                method, len(values), round(sum(values), 2), skipped[method]))
+
+            if values:
+                for label, count in histogram(values):
+                    print(u'  {0:>8} {1}'.format(label, count))
+
     def handle_fields(self, fields, **options):
         flush = options.get('flush')
-        methods = options.get('methods')
+        methods = options.get('methods') or CACHED_METHODS
+        workers = options.get('workers') or 1
+        only_stale = options.get('only_stale')
 
         # Validate methods
         for method in methods:
@@ -55,19 +169,49 @@ class Command(DataFieldCommand):
                 raise CommandError('Invalid method {0}. Choices are {1}'
                                    .format(method, ', '.join(CACHED_METHODS)))
 
-        count = 0
+        if workers < 1:
+            raise CommandError('The number of workers must be at least 1')
+
         t0 = time.time()
 
-        for f in fields:
-            for method in methods:
-                func = getattr(f, method)
-                if flush:
-                    func.flush(f)
-                func()
-            count += 1
-            self._progress()
-            log.debug('{0} cache set took {1} seconds'.format(
-                f, time.time() - t0))
+        if only_stale and not flush:
+            pks = [f.pk for f in fields if is_stale(f, methods)]
+        else:
+            pks = list(fields.values_list('pk', flat=True))
+
+        tasks = [(pk, methods, flush) for pk in pks]
+        total = len(tasks)
+
+        timings = defaultdict(list)
+        skipped = defaultdict(int)
+
+        if workers > 1:
+            # Connections must not be shared with the forked workers
+            close_connections()
+            pool = Pool(workers, initializer=close_connections)
+            results = pool.imap_unordered(_cache_field, tasks)
+        else:
+            pool = None
+            results = (cache_field(*args) for args in tasks)
+
+        count = 0
+
+        try:
+            for result in results:
+                for method, seconds in result:
+                    if seconds is None:
+                        skipped[method] += 1
+                    else:
+                        timings[method].append(seconds)
+
+                count += 1
+                self._progress(count, total, time.time() - t0)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self._report(timings, skipped)
 
         print(u'\n{0} fields have been updated ({1} s)'.format(
             count, round(time.time() - t0, 2)))
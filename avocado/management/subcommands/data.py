@@ -1,6 +1,7 @@
 import logging
 from django.db.models import F
 from optparse import make_option
+from avocado import metadata
 from avocado.management.base import DataFieldCommand
 
 log = logging.getLogger(__name__)
@@ -33,6 +34,9 @@ class Command(DataFieldCommand):
         # Increments each field's data version
         updated = fields.update(data_version=F('data_version') + 1)
 
+        # Bulk updates do not send signals
+        metadata.increment_data_version()
+
         print(u'{0} fields have been updated. Cached methods will '
               'lazily refresh their cache the next time they are '
               'accessed.'.format(updated))
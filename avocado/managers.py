@@ -46,6 +46,9 @@ class DataSearchMixin(models.Manager):
 
 
 class DataFieldQuerySet(PublishedQuerySet):
+    # Natural key lookups, i.e. `get_by_natural_key`, are cached
+    cache_indexes = (('app_name', 'model_name', 'field_name'),)
+
     def published(self, user=None, perm='avocado.view_datafield'):
         """Fields can be restricted to one or more sites, so the published
         method is extended to support filtering by site.
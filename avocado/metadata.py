@@ -0,0 +1,406 @@
+"""Process-wide snapshot of the metadata.
+
+The snapshot holds all `DataField`, `DataConcept`, `DataConceptField` and
+`DataCategory` instances with their relations resolved, indexed for the
+lookups performed by the query parsers, validators and formatters. It is
+stamped with a global metadata version which is stored in the cache and
+incremented whenever the metadata is saved or deleted. When the version
+changes, the snapshot is rebuilt and swapped in as a whole.
+
+Changes to the data only increment the `data_version` of the affected
+fields, followed by a separate global data version. When only the data
+version changes, the `data_version` of the fields in the snapshot are
+reloaded in place rather than rebuilding the snapshot.
+
+The instances in the snapshot are shared and must not be modified, other
+than their `data_version` by the snapshot itself.
+
+The module-level functions fall back to querying the database if the
+snapshot is disabled or the cache is not available.
+"""
+import time
+import threading
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+from django.core.cache import cache
+from avocado.conf import settings
+from avocado.core import utils
+from avocado.core.cache.model import NEVER_EXPIRE
+
+VERSION_CACHE_KEY = 'avocado:metadata:version'
+DATA_VERSION_CACHE_KEY = 'avocado:metadata:data_version'
+
+NATURAL_KEY = ('app_name', 'model_name', 'field_name')
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def _new_version():
+    # Based on the time rather than starting at 1 so a version evicted from
+    # the cache is never reused.
+    return int(time.time() * 1000)
+
+
+def _get_versions(*keys):
+    # Returns the versions for the keys in a single round trip, adding the
+    # missing ones. The versions are None if the cache is unusable.
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if versions.get(key) is None:
+            cache.add(key, _new_version(), NEVER_EXPIRE)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), NEVER_EXPIRE)
+
+
+def get_version():
+    "Returns the current metadata version or None if the cache is unusable."
+    return _get_versions(VERSION_CACHE_KEY)[0]
+
+
+def get_data_version():
+    "Returns the current data version or None if the cache is unusable."
+    return _get_versions(DATA_VERSION_CACHE_KEY)[0]
+
+
+def _recheck():
+    # The versions are checked on the next access rather than waiting for
+    # the check interval since the change was made in this process.
+    snapshot = _snapshot
+
+    if snapshot is not None:
+        snapshot.checked = None
+
+
+def increment_version():
+    "Increments the metadata version causing all snapshots to be rebuilt."
+    _increment(VERSION_CACHE_KEY)
+    _recheck()
+
+
+def increment_data_version():
+    """Increments the data version causing the `data_version` of the fields
+    in all snapshots to be reloaded. This must be called after the
+    `data_version` of fields are updated in bulk.
+    """
+    _increment(DATA_VERSION_CACHE_KEY)
+    _recheck()
+
+
+def metadata_changed(sender, **kwargs):
+    "Receiver for the signals of the metadata models."
+    increment_version()
+
+
+def _set_related(instance, name, value):
+    # Populates the cache of a foreign key so accessing it does not
+    # result in a query.
+    field = instance._meta.get_field(name)
+    setattr(instance, field.get_cache_name(), value)
+
+
+class MetadataSnapshot(object):
+    "Immutable, indexed view of the metadata at a particular version."
+    def __init__(self, version, data_version=None):
+        from avocado.models import DataField, DataConcept, \
+            DataConceptField, DataCategory
+
+        self.version = version
+        self.data_version = data_version
+        self.created = time.time()
+        # Time the versions were last checked against the cache
+        self.checked = self.created
+
+        categories = dict((c.pk, c) for c in DataCategory.objects.all())
+
+        for c in categories.values():
+            _set_related(c, 'parent', categories.get(c.parent_id))
+
+        fields = dict((f.pk, f) for f in DataField.objects.all())
+
+        for f in fields.values():
+            _set_related(f, 'category', categories.get(f.category_id))
+
+        concepts = dict((c.pk, c) for c in DataConcept.objects.all())
+
+        for c in concepts.values():
+            _set_related(c, 'category', categories.get(c.category_id))
+
+        concept_fields = {}
+
+        for cf in DataConceptField.objects.all():
+            _set_related(cf, 'field', fields[cf.field_id])
+            _set_related(cf, 'concept', concepts[cf.concept_id])
+            concept_fields.setdefault(cf.concept_id, []).append(cf)
+
+        for pk, cfields in concept_fields.items():
+            cfields.sort(key=lambda cf: (cf.order, cf.pk))
+            concept_fields[pk] = tuple(cfields)
+
+        natural_keys = {}
+        model_fields = {}
+
+        for f in fields.values():
+            natural_keys[f.natural_key()] = f
+            model_fields.setdefault((f.app_name, f.model_name), []).append(f)
+
+        # Concepts with an ambiguous `ident` are not indexed
+        idents = {}
+        ambiguous = set()
+
+        for c in concepts.values():
+            if c.ident is None:
+                continue
+
+            if c.ident in idents:
+                ambiguous.add(c.ident)
+
+            idents[c.ident] = c
+
+        for ident in ambiguous:
+            del idents[ident]
+
+        self.categories = categories
+        self.fields = fields
+        self.concepts = concepts
+        self.concept_fields = concept_fields
+        self._natural_keys = natural_keys
+        self._model_fields = model_fields
+        self._idents = idents
+        self._ambiguous_idents = ambiguous
+
+    def update_data_versions(self, data_version):
+        "Reloads the `data_version` of the fields in a single query."
+        from avocado.models import DataField
+
+        versions = DataField.objects.values_list('pk', 'data_version')
+
+        for pk, version in versions:
+            field = self.fields.get(pk)
+
+            if field is not None:
+                field.data_version = version
+
+        self.data_version = data_version
+
+    def get_concept(self, pk=None, ident=None):
+        """Returns the concept by primary key or `ident`. Returns None if it
+        does not exist. Raises `ValueError` if the ident is ambiguous.
+        """
+        if ident is not None:
+            if ident in self._ambiguous_idents:
+                raise ValueError('Ambiguous concept ident')
+            return self._idents.get(ident)
+
+        try:
+            return self.concepts.get(int(pk))
+        except (TypeError, ValueError):
+            pass
+
+    def get_fields_for_concept(self, pk):
+        "Returns the ordered list of fields for the concept."
+        return [cf.field for cf in self.concept_fields.get(pk, ())]
+
+    def get_fields_for_model(self, model):
+        "Returns the list of fields of the model class."
+        opts = model._meta
+        return list(self._model_fields.get((opts.app_label,
+                                            opts.module_name), ()))
+
+    def find_fields(self, key, concept=None):
+        """Returns a list of the fields matching the key which is in any of
+        the formats supported by `parse_field_key`. If a concept is passed,
+        only its fields are considered.
+        """
+        lookup = utils.parse_field_key(key)
+
+        if concept is not None:
+            candidates = self.get_fields_for_concept(concept.pk)
+        elif 'pk' in lookup:
+            field = self.fields.get(lookup['pk'])
+            return [field] if field is not None else []
+        elif len(lookup) == len(NATURAL_KEY):
+            field = self._natural_keys.get(
+                tuple(lookup[k] for k in NATURAL_KEY))
+            return [field] if field is not None else []
+        else:
+            candidates = self.fields.values()
+
+        return [f for f in candidates if all(
+            getattr(f, k) == v for k, v in lookup.items())]
+
+
+def get_snapshot():
+    """Returns the snapshot for the current metadata version, building it if
+    necessary. Returns None if snapshots are disabled or the cache is not
+    available to share the version.
+
+    The versions are checked against the cache at most once every
+    `METADATA_SNAPSHOT_CHECK_INTERVAL` seconds, so changes made by other
+    processes may take up to that long to be seen.
+    """
+    global _snapshot
+
+    if not settings.METADATA_SNAPSHOT_ENABLED:
+        return
+
+    snapshot = _snapshot
+    now = time.time()
+
+    if snapshot is not None and snapshot.checked is not None and \
+            now - snapshot.checked < settings.METADATA_SNAPSHOT_CHECK_INTERVAL:
+        return snapshot
+
+    version, data_version = _get_versions(VERSION_CACHE_KEY,
+                                          DATA_VERSION_CACHE_KEY)
+
+    if version is None:
+        return
+
+    def valid(snapshot):
+        return snapshot is not None and snapshot.version == version and \
+            now - snapshot.created < settings.METADATA_SNAPSHOT_TIMEOUT
+
+    if not valid(snapshot):
+        with _lock:
+            snapshot = _snapshot
+
+            if not valid(snapshot):
+                snapshot = MetadataSnapshot(version, data_version)
+                _snapshot = snapshot
+
+    if snapshot.data_version != data_version:
+        with _lock:
+            if snapshot.data_version != data_version:
+                snapshot.update_data_versions(data_version)
+
+    snapshot.checked = now
+
+    return snapshot
+
+
+def clear():
+    "Discards the snapshot of the current process."
+    global _snapshot
+    _snapshot = None
+
+
+def get_concept(pk=None, ident=None):
+    """Returns the concept by primary key or `ident`. Raises
+    `DataConcept.DoesNotExist` or `DataConcept.MultipleObjectsReturned`
+    consistent with `QuerySet.get`.
+    """
+    from avocado.models import DataConcept
+
+    snapshot = get_snapshot()
+
+    if snapshot is None:
+        if ident is not None:
+            return DataConcept.objects.get(ident=ident)
+        return DataConcept.objects.get(pk=pk)
+
+    try:
+        concept = snapshot.get_concept(pk=pk, ident=ident)
+    except ValueError:
+        raise DataConcept.MultipleObjectsReturned(
+            'get() returned more than one DataConcept')
+
+    if concept is None:
+        raise DataConcept.DoesNotExist(
+            'DataConcept matching query does not exist.')
+
+    return concept
+
+
+def get_field(key, concept=None):
+    """Returns the field for a key in any of the formats supported by
+    `parse_field_key`. If a concept is passed, the field must be one of its
+    fields. Raises `DataField.DoesNotExist` or
+    `DataField.MultipleObjectsReturned` consistent with `QuerySet.get`.
+    """
+    from avocado.models import DataField
+
+    snapshot = get_snapshot()
+
+    if snapshot is None or (concept is not None and concept.pk is None):
+        if concept is not None:
+            queryset = concept.fields.all()
+        else:
+            queryset = DataField.objects.all()
+
+        return queryset.get(**utils.parse_field_key(key))
+
+    fields = snapshot.find_fields(key, concept=concept)
+
+    if not fields:
+        raise DataField.DoesNotExist(
+            'DataField matching query does not exist.')
+
+    if len(fields) > 1:
+        raise DataField.MultipleObjectsReturned(
+            'get() returned more than one DataField -- it returned {0}!'
+            .format(len(fields)))
+
+    return fields[0]
+
+
+def get_concepts(ids):
+    "Returns the list of concepts in the order of `ids`."
+    from avocado.models import DataConcept
+
+    snapshot = get_snapshot()
+
+    if snapshot is not None:
+        concepts = snapshot.concepts
+    else:
+        concepts = DataConcept.objects.in_bulk(ids)
+
+    return [concepts[pk] for pk in ids if pk in concepts]
+
+
+def get_fields_for_concepts(ids):
+    """Returns an ordered dict of the ordered list of fields keyed by the
+    concepts `ids`. Concepts without fields are not included.
+    """
+    from avocado.models import DataConceptField
+
+    groups = OrderedDict()
+
+    if not ids:
+        return groups
+
+    snapshot = get_snapshot()
+
+    if snapshot is not None:
+        for pk in ids:
+            fields = snapshot.get_fields_for_concept(pk)
+
+            if fields and pk not in groups:
+                groups[pk] = fields
+
+        return groups
+
+    # Concept fields that are sorted by concept then order, but are not
+    # in the original order defined in `ids`
+    cfields = list(DataConceptField.objects.filter(concept__pk__in=ids)
+                   .select_related()
+                   .order_by('concept', 'order'))
+
+    # Order concept fields relative to `ids`
+    cfields.sort(key=lambda o: ids.index(o.concept.pk))
+
+    for cf in cfields:
+        groups.setdefault(cf.concept.pk, []).append(cf.field)
+
+    return groups
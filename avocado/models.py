@@ -6,7 +6,7 @@ from django.contrib.auth.models import User, Group
 from django.utils.encoding import smart_unicode
 from django.utils.translation import ugettext_lazy as _
 from django.db.models.fields import FieldDoesNotExist
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_save, pre_delete, post_delete
 from django.core.validators import RegexValidator
 from avocado.core import utils
 from avocado.core.models import Base, BasePlural, PublishArchiveMixin
@@ -20,7 +20,8 @@ from avocado.query.translators import registry as translators
 from avocado.query.operators import registry as operators
 from avocado.lexicon.models import Lexicon
 from avocado.stats.agg import Aggregator
-from avocado import formatters
+from avocado import formatters, metadata
+from avocado.jobs.models import Job  # noqa
 
 
 __all__ = ('DataCategory', 'DataConcept', 'DataField',
@@ -329,40 +330,40 @@ class DataField(BasePlural, PublishArchiveMixin):
     def groupby(self, *args):
         return Aggregator(self.field).groupby(*args)
 
-    @cached_method(version='data_version')
+    @cached_method(version='data_version', cache_args=True)
     def count(self, *args, **kwargs):
         "Returns an the aggregated counts."
         return Aggregator(self.field).count(*args, **kwargs)
 
-    @cached_method(version='data_version')
+    @cached_method(version='data_version', cache_args=True)
     def max(self, *args):
         "Returns the maximum value."
         return Aggregator(self.field).max(*args)
 
-    @cached_method(version='data_version')
+    @cached_method(version='data_version', cache_args=True)
     def min(self, *args):
         "Returns the minimum value."
         return Aggregator(self.field).min(*args)
 
-    @cached_method(version='data_version')
+    @cached_method(version='data_version', cache_args=True)
     def avg(self, *args):
         "Returns the average value. Only applies to quantitative data."
         if self.simple_type == 'number':
             return Aggregator(self.field).avg(*args)
 
-    @cached_method(version='data_version')
+    @cached_method(version='data_version', cache_args=True)
     def sum(self, *args):
         "Returns the sum of values. Only applies to quantitative data."
         if self.simple_type == 'number':
             return Aggregator(self.field).sum(*args)
 
-    @cached_method(version='data_version')
+    @cached_method(version='data_version', cache_args=True)
     def stddev(self, *args):
         "Returns the standard deviation. Only applies to quantitative data."
         if self.simple_type == 'number':
             return Aggregator(self.field).stddev(*args)
 
-    @cached_method(version='data_version')
+    @cached_method(version='data_version', cache_args=True)
     def variance(self, *args):
         "Returns the variance. Only applies to quantitative data."
         if self.simple_type == 'number':
@@ -456,11 +457,10 @@ class DataConcept(BasePlural, PublishArchiveMixin):
 
     objects = managers.DataConceptManager()
 
-    def format(self, *args, **kwargs):
-        """Convenience method for formatting data relative to this concept's
-        associated formatter. To prevent redundant initializations (say, in
-        a tight loop) the formatter instance is cached until the formatter
-        name changes.
+    def get_formatter(self):
+        """Returns the formatter instance for this concept. To prevent
+        redundant initializations (say, in a tight loop) the formatter
+        instance is cached until the formatter name changes.
         """
         name = self.formatter_name
         cache = getattr(self, '_formatter_cache', None)
@@ -469,7 +469,13 @@ class DataConcept(BasePlural, PublishArchiveMixin):
             self._formatter_cache = (name, formatter)
         else:
             formatter = cache[1]
-        return formatter(*args, **kwargs)
+        return formatter
+
+    def format(self, *args, **kwargs):
+        """Convenience method for formatting data relative to this concept's
+        associated formatter.
+        """
+        return self.get_formatter()(*args, **kwargs)
 
     class Meta(object):
         app_label = 'avocado'
@@ -744,6 +750,17 @@ pre_delete.connect(pre_delete_uncache, sender=DataField)
 pre_delete.connect(pre_delete_uncache, sender=DataConcept)
 pre_delete.connect(pre_delete_uncache, sender=DataCategory)
 
+# Rebuild the metadata snapshots when any of the metadata changes
+post_save.connect(metadata.metadata_changed, sender=DataField)
+post_save.connect(metadata.metadata_changed, sender=DataConcept)
+post_save.connect(metadata.metadata_changed, sender=DataConceptField)
+post_save.connect(metadata.metadata_changed, sender=DataCategory)
+
+post_delete.connect(metadata.metadata_changed, sender=DataField)
+post_delete.connect(metadata.metadata_changed, sender=DataConcept)
+post_delete.connect(metadata.metadata_changed, sender=DataConceptField)
+post_delete.connect(metadata.metadata_changed, sender=DataCategory)
+
 # Register with history API
 if settings.HISTORY_ENABLED:
     history.register(DataContext, fields=('name', 'description', 'json'))
@@ -0,0 +1,309 @@
+"""Read-ahead buffers of query rows for paging through results.
+
+Each buffer holds a sliding window of contiguous rows for a query and
+session. When a page is requested, the window is moved to cover it and
+only the rows that do not overlap the current window are fetched, as
+computed by `BufferedPaginator.get_overlap`. Once a page is served, the
+next `QUERY_BUFFER_PREFETCH_PAGES` pages are fetched in a background
+thread while the current one is being read.
+
+The total number of rows held by all buffers in the process is bounded by
+`QUERY_BUFFER_MAX_ROWS`. The least recently used buffers are evicted
+first when the bound is exceeded.
+"""
+import logging
+import threading
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+from avocado.conf import settings
+from avocado.core.paginator import BufferedPaginator
+from avocado.core.utils import close_connections
+from . import counts, plans
+
+log = logging.getLogger(__name__)
+
+
+def buffer_key(context_json=None, view_json=None, tree=None,
+               session_key=None, **context):
+    """Returns the key of the buffer for a query and session. The key
+    includes the data versions of the referenced fields and the root model
+    so buffers of changed data are not reused. Returns None if the versions
+    cannot be determined, in which case the rows must not be buffered.
+    """
+    user = context.pop('user', None)
+    versions = counts.get_versions(context_json, view_json, tree=tree)
+
+    if not versions:
+        return
+
+    return plans._hash(context_json, view_json, tree, session_key,
+                       getattr(user, 'pk', None), versions, context)
+
+
+class RowBuffer(object):
+    """A window of contiguous rows starting at `offset`. `fetch` takes an
+    offset and limit and returns a list of rows.
+
+    The offset and rows are replaced together as the `window` tuple so the
+    buffer can be read without the lock while it is being slid.
+    """
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self.window = (0, [])
+        # Set once the last row of the results has been fetched
+        self.total = None
+        self.lock = threading.RLock()
+        self.prefetching = False
+
+    @property
+    def offset(self):
+        return self.window[0]
+
+    @property
+    def rows(self):
+        return self.window[1]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _clip(self, offset, limit):
+        end = offset + limit
+
+        if self.total is not None:
+            end = min(end, self.total)
+
+        return max(end, offset)
+
+    def contains(self, offset, limit):
+        "Returns true if the rows of the range are all in the buffer."
+        return self.read(offset, limit) is not None
+
+    def get(self, offset, limit):
+        "Returns the rows of the range that are in the buffer."
+        start, rows = self.window
+        start = offset - start
+        return rows[start:start + limit]
+
+    def read(self, offset, limit):
+        """Returns the rows of the range if they are all in the buffer,
+        otherwise None.
+        """
+        start, rows = self.window
+        end = self._clip(offset, limit)
+
+        if start <= offset and end <= start + len(rows):
+            return rows[offset - start:offset - start + limit]
+
+    def _fetch(self, offset, limit, end=True):
+        rows = list(self.fetch(offset, limit))
+
+        # A short fetch means the end of the results was reached
+        if end and len(rows) < limit:
+            self.total = offset + len(rows)
+
+        return rows
+
+    def slide(self, offset, size):
+        """Moves the window to start at `offset` and hold `size` rows,
+        fetching only the rows not already in the buffer.
+        """
+        with self.lock:
+            size = self._clip(offset, size) - offset
+
+            if self.offset == offset and len(self.rows) == size:
+                return
+
+            if not self.rows:
+                rows = self._fetch(offset, size) if size else []
+                start = offset
+            else:
+                paginator = BufferedPaginator(
+                    count=self.offset + len(self.rows), offset=self.offset,
+                    buf_size=len(self.rows), per_page=size)
+
+                overlap, (start_offset, start_limit), (end_offset, end_limit) \
+                    = paginator.get_overlap(offset, size)
+
+                if not overlap:
+                    rows = self._fetch(offset, size) if size else []
+                    start = offset
+                else:
+                    rows = self.rows
+                    start = self.offset
+
+                    if start_offset is not None and start_limit > 0:
+                        rows = self._fetch(start_offset, start_limit,
+                                           end=False) + rows
+                        start = start_offset
+
+                    # The end rows are fetched from the end of the current
+                    # window, since the end offset is one-based.
+                    if end_offset is not None and end_limit > 0:
+                        rows = rows + self._fetch(
+                            self.offset + len(self.rows), end_limit)
+
+            start = offset - start
+            self.window = (offset, rows[start:start + size])
+
+
+class BufferManager(object):
+    "Manages the read-ahead buffers of the process."
+    def __init__(self, max_rows=None, prefetch_pages=None,
+                 prefetch_async=None):
+        self._max_rows = max_rows
+        self._prefetch_pages = prefetch_pages
+        self._prefetch_async = prefetch_async
+        self._lock = threading.RLock()
+        self.clear()
+
+    @property
+    def max_rows(self):
+        if self._max_rows is not None:
+            return self._max_rows
+        return settings.QUERY_BUFFER_MAX_ROWS
+
+    @property
+    def prefetch_pages(self):
+        if self._prefetch_pages is not None:
+            return self._prefetch_pages
+        return settings.QUERY_BUFFER_PREFETCH_PAGES
+
+    @property
+    def prefetch_async(self):
+        if self._prefetch_async is not None:
+            return self._prefetch_async
+        return settings.QUERY_BUFFER_PREFETCH_ASYNC
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def __contains__(self, key):
+        return key in self._buffers
+
+    def rows(self):
+        "Returns the total number of buffered rows."
+        return sum(len(b) for b in self._buffers.values())
+
+    def get_buffer(self, key, fetch):
+        "Returns the buffer for the key, marking it as most recently used."
+        with self._lock:
+            buff = self._buffers.pop(key, None)
+
+            if buff is None:
+                buff = RowBuffer(fetch)
+            else:
+                buff.fetch = fetch
+
+            self._buffers[key] = buff
+
+            return buff
+
+    def evict(self, keep=None):
+        """Evicts the least recently used buffers until the total rows are
+        within `max_rows`. The buffer for the `keep` key is never evicted.
+        """
+        with self._lock:
+            rows = self.rows()
+
+            for key in list(self._buffers):
+                if rows <= self.max_rows:
+                    break
+
+                if key == keep:
+                    continue
+
+                rows -= len(self._buffers.pop(key))
+                self.evictions += 1
+
+    def discard(self, key):
+        "Removes the buffer for the key."
+        with self._lock:
+            self._buffers.pop(key, None)
+
+    def clear(self):
+        "Removes all buffers and resets the counters."
+        with self._lock:
+            self._buffers = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def _window(self, offset, per_page):
+        # The previous page is kept for paging backwards
+        start = max(offset - per_page, 0)
+        return start, offset + per_page * (self.prefetch_pages + 1) - start
+
+    def prefetch(self, key, buff, offset, per_page):
+        "Slides the buffer to cover the pages following `offset`."
+        start, size = self._window(offset, per_page)
+
+        if buff.contains(start, size):
+            return
+
+        def run():
+            try:
+                buff.slide(start, size)
+                self.evict(keep=key)
+            except Exception:
+                log.exception(u'Error prefetching buffer "{0}"'.format(key))
+            finally:
+                buff.prefetching = False
+
+        if not self.prefetch_async:
+            return run()
+
+        with self._lock:
+            if buff.prefetching:
+                return
+            buff.prefetching = True
+
+        def target():
+            try:
+                run()
+            finally:
+                # Threads open their own connections which must be closed
+                close_connections()
+
+        thread = threading.Thread(target=target)
+        thread.daemon = True
+        thread.start()
+
+    def get_rows(self, key, fetch, offset, limit):
+        """Returns `limit` rows starting at `offset` from the buffer for the
+        key, fetching the missing rows with `fetch` if necessary. The rows
+        following the range are prefetched.
+        """
+        buff = self.get_buffer(key, fetch)
+
+        # The window is read once, a prefetch may be sliding the buffer
+        rows = buff.read(offset, limit)
+
+        if rows is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+            with buff.lock:
+                # A prefetch may have completed while waiting on the lock
+                rows = buff.read(offset, limit)
+
+                if rows is None:
+                    start, size = self._window(offset, limit)
+                    buff.slide(start, offset + limit - start)
+                    rows = buff.get(offset, limit)
+
+            self.evict(keep=key)
+
+        self.prefetch(key, buff, offset, limit)
+
+        return rows
+
+    def get_page(self, key, fetch, page, per_page):
+        "Returns the rows of the page from the buffer for the key."
+        return self.get_rows(key, fetch, (page - 1) * per_page, per_page)
+
+
+# Process-wide instance
+buffer_manager = BufferManager()
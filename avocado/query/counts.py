@@ -0,0 +1,202 @@
+"""Count service for contexts and queries.
+
+Counting the distinct objects matching a context requires a
+`COUNT(DISTINCT ...)` over the full join which is expensive to run each
+time a client refreshes. Counts are stored in the cache together with the
+`data_version` of the fields referenced by the context and view, and of
+the fields of the tree's root model since the count depends on its rows
+regardless of the conditions. While the versions are unchanged, the stored
+count is served. When they change, the previous count is served while it
+is recomputed in a background thread, unless `QUERY_COUNT_REFRESH_ASYNC`
+is disabled in which case it is recomputed immediately.
+
+Counts are also written to the `count`, `distinct_count` and
+`record_count` columns of saved instances.
+"""
+import logging
+import threading
+from django.core.cache import cache
+from modeltree.tree import trees
+from avocado import metadata
+from avocado.conf import settings
+from avocado.core.cache.model import NEVER_EXPIRE
+from avocado.core.utils import close_connections
+from . import plans
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = set()
+
+
+def _view_fields(attrs, snapshot):
+    "Returns the fields of the concepts referenced by the view."
+    if isinstance(attrs, dict):
+        attrs = attrs.get('columns', []) + \
+            [c for c, d in attrs.get('ordering', [])]
+        attrs = [{'concept': pk} for pk in attrs]
+
+    fields = []
+
+    for facet in attrs or ():
+        if facet.get('enabled') is False:
+            continue
+        fields.extend(snapshot.get_fields_for_concept(facet['concept']))
+
+    return fields
+
+
+def get_versions(context_json, view_json=None, tree=None):
+    """Returns a sorted list of the `(pk, data_version)` pairs of the fields
+    referenced by the context and view and the fields of the root model of
+    the tree. If the root model has no fields, the global data version is
+    included instead. Returns None if the fields cannot be determined
+    without querying the database, e.g. for composite contexts.
+    """
+    snapshot = metadata.get_snapshot()
+
+    if snapshot is None:
+        return
+
+    try:
+        fields = plans._context_fields(context_json, snapshot)
+
+        if fields is not None and view_json:
+            fields.extend(_view_fields(view_json, snapshot))
+
+        root_fields = snapshot.get_fields_for_model(trees[tree].root_model)
+    except Exception:
+        return
+
+    if fields is None:
+        return
+
+    versions = sorted(set((f.pk, f.data_version)
+                          for f in fields + root_fields))
+
+    # Changes to the rows of a model without fields are only reflected by
+    # the global data version.
+    if not root_fields:
+        versions.append(('data', snapshot.data_version))
+
+    return versions
+
+
+def count_cache_key(kind, context_json, view_json=None, tree=None,
+                    **context):
+    "Returns the cache key of the stored count, independent of versions."
+    user = context.get('user')
+    return u'avocado:count:{0}:{1}'.format(kind, plans._hash(
+        context_json, view_json, tree, getattr(user, 'pk', None)))
+
+
+def refresh(key, versions, func):
+    "Computes the count and stores it along with the versions."
+    count = func()
+    cache.set(key, {'count': count, 'versions': versions}, NEVER_EXPIRE)
+    return count
+
+
+def refresh_async(key, versions, func, callback=None):
+    """Refreshes the count in a background thread. Only one refresh per key
+    runs at a time in a process.
+    """
+    with _lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+
+    def run():
+        try:
+            count = refresh(key, versions, func)
+
+            if callback is not None:
+                callback(count)
+        except Exception:
+            log.exception(u'Error refreshing count "{0}"'.format(key))
+        finally:
+            # Threads open their own connections which must be closed
+            close_connections()
+
+            with _lock:
+                _pending.discard(key)
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+
+
+def get_count(kind, func, context_json, view_json=None, tree=None,
+              callback=None, **context):
+    """Returns the count computed by `func`, serving the stored count if the
+    versions of the referenced fields are unchanged. `callback` is called
+    with the count whenever it is computed.
+    """
+    versions = get_versions(context_json, view_json, tree=tree)
+
+    # Counts are only stored if they can be invalidated
+    if not settings.DATA_CACHE_ENABLED or not versions:
+        count = func()
+
+        if callback is not None:
+            callback(count)
+
+        return count
+
+    key = count_cache_key(kind, context_json, view_json, tree=tree,
+                          **context)
+    stored = cache.get(key)
+
+    if stored is not None and stored['versions'] == versions:
+        return stored['count']
+
+    if stored is not None and settings.QUERY_COUNT_REFRESH_ASYNC:
+        log.debug(u'Serve stale count "{0}"'.format(key))
+        refresh_async(key, versions, func, callback=callback)
+        return stored['count']
+
+    count = refresh(key, versions, func)
+
+    if callback is not None:
+        callback(count)
+
+    return count
+
+
+def _store(instance, field_name):
+    "Returns a callback storing the count in the column of the instance."
+    def callback(count):
+        setattr(instance, field_name, count)
+
+        if instance.pk:
+            instance.__class__._default_manager.filter(pk=instance.pk)\
+                .update(**{field_name: count})
+    return callback
+
+
+def context_count(cxt, tree=None, **context):
+    "Returns the number of distinct objects matching the context."
+    def func():
+        return cxt.apply(tree=tree, **context).count()
+
+    return get_count('context', func, cxt.json, tree=tree,
+                     callback=_store(cxt, 'count'), **context)
+
+
+def query_distinct_count(query, tree=None, **context):
+    "Returns the number of distinct objects matching the query's context."
+    def func():
+        return query.context.apply(tree=tree, **context).count()
+
+    return get_count('context', func, query.context_json, tree=tree,
+                     callback=_store(query, 'distinct_count'), **context)
+
+
+def query_record_count(query, tree=None, **context):
+    "Returns the number of records produced by the query."
+    def func():
+        return query.apply(tree=tree, **context).count()
+
+    return get_count('query', func, query.context_json, query.view_json,
+                     tree=tree, callback=_store(query, 'record_count'),
+                     **context)
@@ -0,0 +1,139 @@
+"""Streaming of query results with server-side cursors.
+
+By default, the PostgreSQL and MySQL drivers buffer the entire result set
+on the client when a query is executed, so exporting a large query holds
+every row in memory before the first one is written. `results_iter`
+executes the query with a server-side cursor instead, a named cursor for
+psycopg2 and an `SSCursor` for MySQLdb, and fetches the rows in chunks of
+`chunk_size`. Other backends, such as SQLite, already fetch rows lazily
+and use a regular cursor.
+
+PostgreSQL named cursors only exist within a transaction. If the
+connection uses autocommit, the cursor is declared `WITH HOLD`.
+
+MySQL does not allow any other statement on a connection until all the
+rows of an `SSCursor` have been read, so the cursor is opened on a
+dedicated connection which is closed with the cursor. Other queries, such
+as the progress updates of jobs, can then run while the rows are read.
+Since the dedicated connection has its own transaction, the rows do not
+include uncommitted changes made on the connection of the queryset.
+"""
+import uuid
+from django.db.models.sql.compiler import MULTI
+from django.db.models.sql.datastructures import EmptyResultSet
+from avocado.conf import settings
+
+_compilers = {}
+
+
+def server_cursor(connection, chunk_size):
+    "Returns a cursor that does not buffer the result set on the client."
+    # Ensure the connection is open
+    connection.cursor()
+
+    if connection.vendor == 'postgresql':
+        uses_autocommit = getattr(connection.features, 'uses_autocommit',
+                                  False)
+        name = 'avocado_{0}'.format(uuid.uuid4().hex)
+
+        if uses_autocommit:
+            cursor = connection.connection.cursor(name=name, withhold=True)
+        else:
+            cursor = connection.connection.cursor(name=name)
+
+        cursor.itersize = chunk_size
+        return cursor
+
+    if connection.vendor == 'mysql':
+        from MySQLdb.cursors import SSCursor
+
+        dedicated = connection.__class__(connection.settings_dict,
+                                         connection.alias)
+        dedicated.cursor()
+
+        return DedicatedCursor(dedicated.connection.cursor(SSCursor),
+                               dedicated)
+
+    return connection.cursor()
+
+
+class DedicatedCursor(object):
+    "Wraps a cursor of a dedicated connection which is closed with it."
+    def __init__(self, cursor, connection):
+        self.cursor = cursor
+        self.connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def close(self):
+        try:
+            self.cursor.close()
+        finally:
+            self.connection.close()
+
+
+def fetch_chunks(cursor, chunk_size, trim=0):
+    """Yields chunks of rows from the cursor and closes it when exhausted
+    or the generator is closed. The last `trim` columns of each row are
+    removed, e.g. ordering aliases.
+    """
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+
+            if not rows:
+                break
+
+            if trim:
+                rows = [r[:-trim] for r in rows]
+
+            yield rows
+    finally:
+        cursor.close()
+
+
+class StreamingCompilerMixin(object):
+    "Executes `MULTI` queries with a server-side cursor."
+    chunk_size = None
+
+    def execute_sql(self, result_type=MULTI):
+        if result_type != MULTI:
+            return super(StreamingCompilerMixin, self)\
+                .execute_sql(result_type)
+
+        try:
+            sql, params = self.as_sql()
+            if not sql:
+                raise EmptyResultSet
+        except EmptyResultSet:
+            return iter([])
+
+        cursor = server_cursor(self.connection, self.chunk_size)
+        cursor.execute(sql, params)
+
+        return fetch_chunks(cursor, self.chunk_size,
+                            len(self.query.ordering_aliases))
+
+
+def get_streaming_compiler(compiler, chunk_size=None):
+    """Returns a copy of the compiler that streams its results. The backend's
+    compiler class is extended to preserve its row conversions.
+    """
+    klass = compiler.__class__
+
+    if klass not in _compilers:
+        _compilers[klass] = type('Streaming{0}'.format(klass.__name__),
+                                 (StreamingCompilerMixin, klass), {})
+
+    streaming = _compilers[klass](compiler.query, compiler.connection,
+                                  compiler.using)
+    streaming.chunk_size = chunk_size or settings.QUERY_STREAM_CHUNK_SIZE
+
+    return streaming
+
+
+def results_iter(queryset, chunk_size=None):
+    "Returns an iterator over the rows of the queryset using a stream."
+    compiler = queryset.query.get_compiler(queryset.db)
+    return get_streaming_compiler(compiler, chunk_size).results_iter()
@@ -0,0 +1,238 @@
+"""Keyset (seek) pagination of query results.
+
+Slicing a queryset results in an `OFFSET` which requires the database to
+produce and discard every preceding row, so pages get slower the deeper
+they are. Keyset pagination instead filters on the ordering of the query,
+i.e. the rows whose ordering values come after those of the last row of the
+previous page, which uses the same index regardless of the depth.
+
+The ordering of the queryset is extended with the primary key of the root
+model to make the keys unique. The ordering columns are appended to the
+`SELECT` using the same joins as the `ORDER BY` and removed from the rows
+before they are returned.
+
+The key of the last row is exposed as an opaque, URL-safe `cursor` token
+that can be passed back to `seek` to fetch the next page. Orderings that
+span a reverse foreign key or many-to-many relationship produce multiple
+rows per object and are not supported.
+"""
+import json
+import base64
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models.sql.constants import ORDER_PATTERN
+from . import cursors
+
+# Backends that sort NULLs after all other values in ascending order
+NULLS_LARGEST = ('postgresql', 'oracle')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    "Returns an opaque token for a key."
+    data = json.dumps(list(key), cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(data)
+
+
+def decode_cursor(token):
+    "Returns the key for a token produced by `encode_cursor`."
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(str(token))))
+    except (TypeError, ValueError):
+        raise InvalidCursor('Invalid cursor "{0}"'.format(token))
+
+
+def is_multivalued(opts, lookup):
+    """Returns true if the lookup spans a reverse foreign key or many-to-many
+    relationship relative to the model options.
+    """
+    for name in lookup.split('__'):
+        if name == 'pk':
+            return False
+
+        field, model, direct, m2m = opts.get_field_by_name(name)
+
+        if m2m:
+            return True
+
+        if not direct:
+            # Reverse one-to-one relationships are single-valued
+            if not field.field.unique:
+                return True
+            opts = field.model._meta
+        elif field.rel:
+            opts = field.rel.to._meta
+
+    return False
+
+
+def get_ordering(queryset):
+    """Returns a list of `(lookup, descending)` pairs for the ordering of the
+    queryset, ending with the primary key of the root model.
+    """
+    query = queryset.query
+    opts = query.get_meta()
+
+    if query.order_by:
+        order_by = query.order_by
+    elif query.default_ordering:
+        order_by = opts.ordering
+    else:
+        order_by = ()
+
+    ordering = []
+
+    for lookup in order_by:
+        if lookup == '?' or not ORDER_PATTERN.match(lookup):
+            raise ValueError('Keyset pagination does not support the '
+                             'ordering "{0}"'.format(lookup))
+
+        if lookup.startswith('-'):
+            ordering.append((lookup[1:], True))
+        else:
+            ordering.append((lookup, False))
+
+    if not any(l in ('pk', opts.pk.name) for l, d in ordering):
+        ordering.append((opts.pk.name, False))
+
+    return ordering
+
+
+class KeysetIterator(object):
+    """Iterates over the rows of `queryset` ordered after `key`, up to
+    `limit` rows. Once iterated, `key` and `cursor` refer to the last row.
+    """
+    def __init__(self, queryset, key=None, limit=None, stream=False,
+                 chunk_size=None):
+        if isinstance(key, basestring):
+            key = decode_cursor(key)
+
+        self.queryset = queryset
+        self.ordering = get_ordering(queryset)
+        self.after = key
+        self.limit = limit
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.key = key
+        self.rows = 0
+
+        if key is not None and len(key) != len(self.ordering):
+            raise InvalidCursor('The cursor does not match the ordering')
+
+    @property
+    def cursor(self):
+        "Returns the token of the last row, if any."
+        if self.key is not None:
+            return encode_cursor(self.key)
+
+    def _get_where(self, connection, columns, key):
+        qn = connection.ops.quote_name
+        nulls_largest = connection.vendor in NULLS_LARGEST
+
+        terms = []
+        params = []
+
+        for i, (alias, column) in enumerate(columns):
+            desc = self.ordering[i][1]
+            nulls_first = nulls_largest == desc
+            value = key[i]
+            col = '{0}.{1}'.format(qn(alias), qn(column))
+            op = '<' if desc else '>'
+
+            if value is None:
+                # Nothing comes after NULL when NULLs sort last
+                if not nulls_first:
+                    continue
+                term = ['{0} IS NOT NULL'.format(col)]
+                term_params = []
+            elif nulls_first:
+                term = ['{0} {1} %s'.format(col, op)]
+                term_params = [value]
+            else:
+                term = ['({0} {1} %s OR {0} IS NULL)'.format(col, op)]
+                term_params = [value]
+
+            # All preceding columns are equal
+            for j in xrange(i - 1, -1, -1):
+                prev = '{0}.{1}'.format(qn(columns[j][0]), qn(columns[j][1]))
+
+                if key[j] is None:
+                    term.insert(0, '{0} IS NULL'.format(prev))
+                else:
+                    term.insert(0, '{0} = %s'.format(prev))
+                    term_params.insert(0, key[j])
+
+            terms.append('({0})'.format(' AND '.join(term)))
+            params.extend(term_params)
+
+        return '({0})'.format(' OR '.join(terms)), params
+
+    def _prep_key(self, connection, fields):
+        "Converts the values of a decoded cursor for the database."
+        key = []
+
+        for field, value in zip(fields, self.after):
+            if value is not None:
+                value = field.get_db_prep_value(field.to_python(value),
+                                                connection)
+            key.append(value)
+
+        return key
+
+    def get_compiler(self):
+        "Returns the compiler of the seek query."
+        query = self.queryset.query.clone()
+        connection = connections[self.queryset.db]
+
+        # The ordering columns are appended to the select using the joins
+        # of the order by.
+        order_by = [('-' if d else '') + l for l, d in self.ordering]
+        query.clear_ordering(force_empty=True)
+        query.add_ordering(*order_by)
+
+        # Select the model's columns explicitly since they are otherwise
+        # only implied by an empty select.
+        if not query.select:
+            query.add_fields([f.attname for f in query.get_meta().fields])
+            query.select_fields = []
+
+        start = len(query.select)
+        select_fields = list(query.select_fields)
+        query.add_fields([l for l, d in self.ordering])
+        columns = query.select[start:]
+        fields = query.select_fields[len(select_fields):]
+        query.select_fields = select_fields
+
+        if self.after is not None:
+            key = self._prep_key(connection, fields)
+            where, params = self._get_where(connection, columns, key)
+            query.add_extra(None, None, [where], params, None, None)
+
+        if self.limit is not None:
+            query.set_limits(high=self.limit)
+
+        compiler = query.get_compiler(connection=connection)
+
+        if self.stream:
+            compiler = cursors.get_streaming_compiler(compiler,
+                                                      self.chunk_size)
+
+        return compiler
+
+    def __iter__(self):
+        size = len(self.ordering)
+
+        for row in self.get_compiler().results_iter():
+            self.key = tuple(row[-size:])
+            self.rows += 1
+            yield tuple(row[:-size])
+
+
+def seek(queryset, key=None, limit=None, **kwargs):
+    """Returns an iterator over up to `limit` rows of the queryset after the
+    key or cursor token.
+    """
+    return KeysetIterator(queryset, key=key, limit=limit, **kwargs)
@@ -2,6 +2,7 @@ import jsonfield
 from django.db import models
 from modeltree.tree import trees
 from . import oldparsers as parsers
+from . import plans, counts
 
 
 def _sql_string(queryset):
@@ -78,10 +79,18 @@ class AbstractDataContext(models.Model):
         "Applies this context to a QuerySet."
         if tree is None and queryset is not None:
             tree = queryset.model
-        return self.parse(tree=tree, **context).apply(queryset=queryset)
+        return plans.compile_context(self.json, tree=tree, **context) \
+            .apply(queryset=queryset)
 
     def language(self, tree=None, **context):
-        return self.parse(tree=tree, **context).language
+        return plans.compile_context(self.json, tree=tree, **context) \
+            .language
+
+    def get_count(self, tree=None, **context):
+        """Returns the number of distinct objects matching this context. The
+        count is stored and reused until the data changes.
+        """
+        return counts.context_count(self, tree=tree, **context)
 
     def sql(self, *args, **kwargs):
         """Returns the SQL query string representative of this context.
@@ -126,7 +135,7 @@ class AbstractDataView(models.Model):
         "Applies this context to a QuerySet."
         if tree is None and queryset is not None:
             tree = queryset.model
-        return self.parse(tree=tree, **context) \
+        return plans.compile_view(self.json, tree=tree, **context) \
             .apply(queryset=queryset, include_pk=include_pk)
 
     def sql(self, *args, **kwargs):
@@ -171,8 +180,10 @@ class AbstractDataQuery(models.Model):
                                 "keyword argument 'view_json'"
                                 .format(self.__class__.__name__))
 
-            kwargs['context_json'] = args[0].get('context', None)
-            kwargs['view_json'] = args[0].get('view', None)
+            args = list(args)
+            attrs = args.pop(0)
+            kwargs['context_json'] = attrs.get('context', None)
+            kwargs['view_json'] = attrs.get('view', None)
 
         super(AbstractDataQuery, self).__init__(*args, **kwargs)
 
@@ -220,8 +231,23 @@ class AbstractDataQuery(models.Model):
         "Applies this context to a QuerySet."
         if tree is None and queryset is not None:
             tree = queryset.model
-        return self.parse(tree=tree, **context) \
-            .apply(queryset=queryset, distinct=distinct, include_pk=include_pk)
+        queryset = plans.compile_context(self.context_json, tree=tree,
+                                         **context) \
+            .apply(queryset=queryset, distinct=distinct)
+        return plans.compile_view(self.view_json, tree=tree, **context) \
+            .apply(queryset=queryset, include_pk=include_pk)
+
+    def get_distinct_count(self, tree=None, **context):
+        """Returns the number of distinct objects matching the context of
+        this query. The count is stored and reused until the data changes.
+        """
+        return counts.query_distinct_count(self, tree=tree, **context)
+
+    def get_record_count(self, tree=None, **context):
+        """Returns the number of records produced by this query. The count
+        is stored and reused until the data changes.
+        """
+        return counts.query_record_count(self, tree=tree, **context)
 
     def sql(self, *args, **kwargs):
         """Returns the SQL query string representative of this query.
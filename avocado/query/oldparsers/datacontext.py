@@ -1,7 +1,7 @@
 from warnings import warn
 from modeltree.tree import trees
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from avocado.core import utils
+from avocado import metadata
 
 AND = 'AND'
 OR = 'OR'
@@ -91,8 +91,7 @@ class Condition(Node):
     def concept(self):
         if not hasattr(self, '_concept'):
             if self.concept_key:
-                from avocado.models import DataConcept
-                self._concept = DataConcept.objects.get(id=self.concept_key)
+                self._concept = metadata.get_concept(pk=self.concept_key)
             else:
                 self._concept = None
         return self._concept
@@ -100,14 +99,8 @@ class Condition(Node):
     @property
     def field(self):
         if not hasattr(self, '_field'):
-            from avocado.models import DataField
-            # Parse to get into a consistent format
-            field_key = utils.parse_field_key(self.field_key)
-
-            if self.concept:
-                self._field = self.concept.fields.get(**field_key)
-            else:
-                self._field = DataField.objects.get(**field_key)
+            self._field = metadata.get_field(self.field_key,
+                                             concept=self.concept)
         return self._field
 
     @property
@@ -223,17 +216,14 @@ def validate(attrs, **context):
                           .format(attrs['id']))
 
     elif is_condition(attrs):
-        from avocado.models import DataField, DataConcept
         field_key = attrs.get('field', attrs.get('id'))
-        # Parse to get into a consistent format
-        field_key = utils.parse_field_key(field_key)
 
         try:
             if 'concept' in attrs:
-                concept = DataConcept.objects.get(id=attrs['concept'])
-                field = concept.fields.get(**field_key)
+                concept = metadata.get_concept(pk=attrs['concept'])
             else:
-                field = DataField.objects.get(**field_key)
+                concept = None
+            field = metadata.get_field(field_key, concept=concept)
             field.validate(operator=attrs['operator'], value=attrs['value'])
             node = parse(attrs, **context)
             attrs['language'] = node.language['language']
@@ -1,10 +1,7 @@
 from warnings import warn
-try:
-    from collections import OrderedDict
-except ImportError:
-    from ordereddict import OrderedDict
 from modeltree.tree import trees
 from modeltree.query import ModelTreeQuerySet
+from avocado import metadata
 
 
 SORT_DIRECTIONS = ('asc', 'desc')
@@ -50,35 +47,11 @@ class Node(object):
         "Returns an ordered list of concepts based on `ids`."
         if not ids:
             return []
-
-        from avocado.models import DataConcept
-
-        concepts = list(DataConcept.objects.filter(pk__in=ids))
-        concepts.sort(key=lambda o: ids.index(o.pk))
-        return concepts
+        return metadata.get_concepts(ids)
 
     def _get_fields_for_concepts(self, ids):
         "Returns an ordered list of fields for concept `ids`."
-        from avocado.models import DataConceptField
-        if not ids:
-            return OrderedDict()
-        # Concept fields that are sorted by concept then order, but are not
-        # in the original order defined in `ids`
-        cfields = list(DataConceptField.objects.filter(concept__pk__in=ids)
-                       .select_related()
-                       .order_by('concept', 'order'))
-
-        # Order concept fields relative to `ids`
-        cfields.sort(key=lambda o: ids.index(o.concept.pk))
-
-        # Construct an ordered dict of fields by their concept
-        groups = OrderedDict()
-        for cf in cfields:
-            pk = cf.concept.pk
-            if pk not in groups:
-                groups[pk] = []
-            groups[pk].append(cf.field)
-        return groups
+        return metadata.get_fields_for_concepts(ids)
 
     def _get_select(self, distinct):
         # Apply all fields to the query to ensure ordering get applied.
@@ -234,7 +207,7 @@ def validate(facets, **context):
             errors.append('Concept is required')
         else:
             try:
-                concept = DataConcept.objects.get(pk=attrs.get('concept'))
+                concept = metadata.get_concept(pk=attrs.get('concept'))
             except DataConcept.DoesNotExist:
                 enabled = False
                 errors.append('Concept does not exist')
@@ -2,10 +2,31 @@ from django.utils.importlib import import_module
 from modeltree.tree import trees
 from avocado.formatters import RawFormatter
 from avocado.conf import settings
+from . import buffers, cursors, keysets
 
 QUERY_PROCESSOR_DEFAULT_ALIAS = 'default'
 
 
+class RunIterator(object):
+    """Iterates over rows whose first `run_key_length` columns identify
+    runs of contiguous rows, see `BaseExporter.filter_rows`. Iterating
+    over it returns the underlying iterator directly.
+    """
+    def __init__(self, iterable, run_key_length):
+        self.iterator = iter(iterable)
+        self.run_key_length = run_key_length
+
+    def __iter__(self):
+        return self.iterator
+
+    def next(self):
+        return next(self.iterator)
+
+    def close(self):
+        if hasattr(self.iterator, 'close'):
+            self.iterator.close()
+
+
 class QueryProcessor(object):
     """Prepares and builds a QuerySet for export.
 
@@ -33,6 +54,28 @@ class QueryProcessor(object):
 
         return queryset
 
+    def get_distinct_ordering(self, queryset):
+        """Returns the ordering of the queryset followed by the primary key
+        if the rows of each object are contiguous when ordered by it. This
+        is not the case if the ordering spans a multi-valued relationship
+        since the rows of an object are then spread across the ordering.
+        """
+        if not self.include_pk:
+            return
+
+        try:
+            ordering = keysets.get_ordering(queryset)
+        except ValueError:
+            return
+
+        opts = queryset.model._meta
+
+        for lookup, descending in ordering:
+            if keysets.is_multivalued(opts, lookup):
+                return
+
+        return [('-' if d else '') + l for l, d in ordering]
+
     def get_exporter(self, klass, **kwargs):
         "Returns an exporter prepared for the queryset."
         exporter = klass(self.view)
@@ -43,10 +86,41 @@ class QueryProcessor(object):
 
         return exporter
 
-    def get_iterable(self, offset=None, limit=None, **kwargs):
-        "Returns an iterable that can be used by an exporter."
+    def get_iterable(self, offset=None, limit=None, stream=None,
+                     chunk_size=None, keyset=False, after=None, **kwargs):
+        """Returns an iterable that can be used by an exporter.
+
+        If `stream` is true, the rows are fetched in chunks of `chunk_size`
+        using a server-side cursor rather than being loaded into memory
+        by the database driver. It defaults to `QUERY_STREAM_ENABLED`.
+
+        If `keyset` is true or an `after` key or cursor token is passed,
+        the rows are paged by seeking past the key rather than by `offset`.
+        The `cursor` of the returned iterator refers to the last row once
+        iterated, see `avocado.query.keysets`.
+
+        Otherwise, if the rows of each object can be ordered contiguously,
+        a `RunIterator` keyed by the primary key is returned so exporters
+        only compare duplicate rows within the rows of an object.
+        """
+        if stream is None:
+            stream = settings.QUERY_STREAM_ENABLED
+
         queryset = self.get_queryset(**kwargs)
 
+        if keyset or after is not None:
+            if offset is not None:
+                raise ValueError('An offset cannot be used with keyset '
+                                 'pagination')
+
+            return keysets.seek(queryset, key=after, limit=limit,
+                                stream=stream, chunk_size=chunk_size)
+
+        # Order the rows of each object contiguously
+        ordering = self.get_distinct_ordering(queryset)
+        if ordering is not None:
+            queryset = queryset.order_by(*ordering)
+
         if offset is not None and limit is not None:
             queryset = queryset[offset:offset + limit]
         elif offset is not None:
@@ -54,16 +128,41 @@ class QueryProcessor(object):
         elif limit is not None:
             queryset = queryset[:limit]
 
+        if stream:
+            iterable = cursors.results_iter(queryset, chunk_size=chunk_size)
+
         # ModelTreeQuerySet has a raw method defined, but fallback
         # to the creating a results iter if not present.
-        if hasattr(queryset, 'raw'):
+        elif hasattr(queryset, 'raw'):
             iterable = queryset.raw()
         else:
             compiler = queryset.query.get_compiler(queryset.db)
             iterable = compiler.results_iter()
 
+        if ordering is not None:
+            iterable = RunIterator(iterable, 1)
+
         return iterable
 
+    def get_page(self, page, per_page, session_key=None, **kwargs):
+        """Returns the rows of a page using the read-ahead buffer of the
+        session, see `avocado.query.buffers`.
+        """
+        key = buffers.buffer_key(
+            getattr(self.context, 'json', None),
+            getattr(self.view, 'json', None), tree=self.tree,
+            session_key=session_key, include_pk=self.include_pk, **kwargs)
+
+        def fetch(offset, limit):
+            return list(self.get_iterable(offset=offset, limit=limit,
+                                          **kwargs))
+
+        # Rows of queries whose data versions are unknown are not buffered
+        if key is None:
+            return fetch((page - 1) * per_page, per_page)
+
+        return buffers.buffer_manager.get_page(key, fetch, page, per_page)
+
 
 class QueryProcessors(object):
     def __init__(self, processors):
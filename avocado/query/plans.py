@@ -0,0 +1,234 @@
+"""Memoized query plans for contexts and views.
+
+Parsing a context requires resolving each field and translating each
+condition, including cleaning the value with the field's form field. The
+result of this, the `Q` condition, annotations, extra and language, only
+depends on the JSON, the tree, the user and the metadata, so it is compiled
+once and kept in a process-wide LRU cache. The key includes the version of
+the metadata snapshot and the `data_version` of the fields referenced by
+the conditions, so any change to the metadata results in a new plan.
+
+Views are compiled likewise, memoizing the select and order by lookups.
+
+Contexts referencing other contexts (composites) and contexts parsed with
+context other than the user are not memoized.
+"""
+import copy
+import json
+import hashlib
+from threading import RLock
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+from avocado import metadata
+from avocado.conf import settings
+from .oldparsers import datacontext, dataview
+
+
+class PlanCache(object):
+    "Thread-safe LRU cache of compiled plans."
+    def __init__(self, max_entries=None):
+        self._max_entries = max_entries
+        self._lock = RLock()
+        self.clear()
+
+    @property
+    def max_entries(self):
+        if self._max_entries is not None:
+            return self._max_entries
+        return settings.QUERY_PLAN_CACHE_MAX_ENTRIES
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            plan = self._entries.pop(key, None)
+
+            if plan is None:
+                self.misses += 1
+                return
+
+            # Reinsert to mark it as most recently used
+            self._entries[key] = plan
+            self.hits += 1
+
+            return plan
+
+    def set(self, key, plan):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = plan
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        "Removes all plans and resets the counters."
+        with self._lock:
+            self._entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+
+
+plan_cache = PlanCache()
+
+
+def _hash(*args):
+    # Trees may be model classes which are represented by their `repr`
+    data = json.dumps(args, sort_keys=True, default=repr)
+    return hashlib.md5(data).hexdigest()
+
+
+def _context_fields(attrs, snapshot):
+    """Returns the fields referenced by the conditions of the context or
+    None if they cannot be determined without querying the database.
+    """
+    if not attrs or attrs.get('enabled') is False:
+        return []
+
+    if datacontext.is_composite(attrs):
+        return
+
+    if datacontext.is_condition(attrs):
+        fields = snapshot.find_fields(attrs.get('field') or attrs.get('id'))
+
+        if len(fields) != 1:
+            return
+
+        return fields
+
+    fields = []
+
+    for child in attrs.get('children', ()):
+        child_fields = _context_fields(child, snapshot)
+
+        if child_fields is None:
+            return
+
+        fields.extend(child_fields)
+
+    return fields
+
+
+def context_key(attrs, tree=None, **context):
+    "Returns the plan cache key for a context or None if not memoizable."
+    if not settings.QUERY_PLAN_CACHE_ENABLED:
+        return
+
+    if set(context) - set(['user']):
+        return
+
+    snapshot = metadata.get_snapshot()
+
+    if snapshot is None:
+        return
+
+    try:
+        fields = _context_fields(attrs, snapshot)
+    except Exception:
+        # Malformed JSON is left to the parser to report
+        return
+
+    if fields is None:
+        return
+
+    user = context.get('user')
+    versions = sorted((f.pk, f.data_version) for f in fields)
+
+    return _hash('context', attrs, tree, getattr(user, 'pk', None),
+                 snapshot.version, versions)
+
+
+def view_key(attrs, tree=None, **context):
+    "Returns the plan cache key for a view or None if not memoizable."
+    if not settings.QUERY_PLAN_CACHE_ENABLED:
+        return
+
+    snapshot = metadata.get_snapshot()
+
+    if snapshot is None:
+        return
+
+    return _hash('view', attrs, tree, snapshot.version)
+
+
+class ContextPlan(datacontext.Node):
+    """Compiled context node holding the output of a parsed node. The
+    condition, annotations and extra are shared and must not be modified.
+    """
+    def __init__(self, node):
+        self.tree = node.tree
+        self.context = {}
+        self.condition = node.condition
+        self.annotations = node.annotations
+        self.extra = node.extra
+        self._language = node.language
+
+    @property
+    def language(self):
+        return copy.deepcopy(self._language)
+
+
+class ViewPlan(dataview.Node):
+    "View node which memoizes the select and order by lookups."
+    def __init__(self, *args, **kwargs):
+        super(ViewPlan, self).__init__(*args, **kwargs)
+        self._select = {}
+        self._order_by = None
+
+    def _get_select(self, distinct):
+        distinct = bool(distinct)
+
+        if distinct not in self._select:
+            self._select[distinct] = \
+                super(ViewPlan, self)._get_select(distinct)
+
+        return list(self._select[distinct])
+
+    def _get_order_by(self):
+        if self._order_by is None:
+            self._order_by = super(ViewPlan, self)._get_order_by()
+
+        return list(self._order_by)
+
+
+def compile_context(attrs, tree=None, **context):
+    """Returns the compiled plan for the context JSON. The plan supports the
+    `apply` method and the `condition`, `annotations`, `extra` and
+    `language` attributes of a parsed node.
+    """
+    key = context_key(attrs, tree=tree, **context)
+
+    if key is not None:
+        plan = plan_cache.get(key)
+
+        if plan is not None:
+            return plan
+
+    plan = ContextPlan(datacontext.parse(attrs, tree=tree, **context))
+
+    if key is not None:
+        plan_cache.set(key, plan)
+
+    return plan
+
+
+def compile_view(attrs, tree=None, **context):
+    "Returns the compiled plan for the view JSON. The plan supports `apply`."
+    key = view_key(attrs, tree=tree, **context)
+
+    if key is not None:
+        plan = plan_cache.get(key)
+
+        if plan is not None:
+            return plan
+
+    node = dataview.parse(attrs, tree=tree, **context)
+    plan = ViewPlan(node.facets, tree=node.tree, **node.context)
+
+    if key is not None:
+        plan_cache.set(key, plan)
+
+    return plan
@@ -2,6 +2,7 @@ import logging
 from django.core.exceptions import ValidationError
 from avocado.core import utils
 from avocado.conf import settings
+from avocado import metadata
 from avocado.models import DataConcept, DataField
 
 log = logging.getLogger(__name__)
@@ -152,13 +153,11 @@ class FieldValidator(Validator):
         else:
             kwargs = {'pk': concept}
 
-        if 'user' in self.context:
-            queryset = DataConcept.objects.published(user=self.context['user'])
-        else:
-            queryset = DataConcept.objects.all()
-
         try:
-            return queryset.get(**kwargs)
+            if 'user' in self.context:
+                return DataConcept.objects.published(
+                    user=self.context['user']).get(**kwargs)
+            return metadata.get_concept(**kwargs)
         except DataConcept.DoesNotExist:
             self.error('concept_does_not_exist')
 
@@ -180,19 +179,14 @@ class FieldValidator(Validator):
         if self.data.get('concept') and not concept:
             return
 
-        kwargs = utils.parse_field_key(field)
-
         # If the concept is defined, restrict to the concept, otherwise
         # get from the entire set.
-        if concept:
-            queryset = concept.fields.all()
-        elif 'user' in self.context:
-            queryset = DataField.objects.published(user=self.context['user'])
-        else:
-            queryset = DataField.objects.all()
-
         try:
-            return queryset.get(**kwargs)
+            if not concept and 'user' in self.context:
+                queryset = DataField.objects.published(
+                    user=self.context['user'])
+                return queryset.get(**utils.parse_field_key(field))
+            return metadata.get_field(field, concept=concept)
         except DataField.DoesNotExist:
             if concept:
                 self.error('field_does_not_exist_for_concept')
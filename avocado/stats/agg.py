@@ -36,6 +36,30 @@ class Aggregator(object):
     def __deepcopy__(self):
         return self._clone()
 
+    def __getstate__(self):
+        # Evaluate the aggregation prior to pickling so the results are
+        # pickled rather than requiring another database hit. Similar to
+        # Django's QuerySet, but only the query of the base queryset is
+        # pickled to prevent evaluating it.
+        if not hasattr(self, '_result_cache'):
+            list(self._result_iter())
+
+        state = self.__dict__.copy()
+
+        if self._queryset is not None:
+            state['_queryset'] = (self._queryset.model, self._queryset.query)
+
+        return state
+
+    def __setstate__(self, state):
+        if state['_queryset'] is not None:
+            model, query = state['_queryset']
+            queryset = model._default_manager.all()
+            queryset.query = query
+            state['_queryset'] = queryset
+
+        self.__dict__.update(state)
+
     def __len__(self):
         # If the result cache is filled, use the length otherwise
         # performa databse hit
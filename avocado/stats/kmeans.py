@@ -1,6 +1,20 @@
 import math
 import random
+from array import array
 from collections import defaultdict
+from itertools import islice
+from multiprocessing import Pool
+from avocado.conf import dep_supported
+
+if dep_supported('numpy'):
+    import numpy
+else:
+    numpy = None
+
+# Upper bound on the number of elements in the intermediate difference array
+# built while computing point-to-centroid distances. Points are processed in
+# chunks so memory stays bounded regardless of the number of points.
+DISTANCE_CHUNK_SIZE = 2 ** 20
 
 
 def std_dev(values):
@@ -117,6 +131,16 @@ def normalize(points):
         The values in 'points' scaled by the standard deviation along each
         dimension.
     """
+    if numpy is not None and len(points) > 0:
+        arr, flat = _as_array(points)
+
+        # Preserve the integer zeros returned for constant single dimension
+        # lists.
+        if flat and not _array_std_dev(arr)[0]:
+            return [0] * len(points)
+
+        return _from_array(_array_normalize(arr), flat)
+
     # Check for a single dimension list. This check assumes that if the first
     # element is not a list then all elements are non-list and the list is
     # single dimension. If the list is single dimension just divide all the
@@ -310,6 +334,18 @@ def compute_clusters(points, centroids):
     if len(centroids) < 1:
         raise ValueError("cluster requires at least one centroid.")
 
+    if numpy is not None:
+        arr, _ = _as_array(points)
+        centroids_arr, _ = _as_array(centroids)
+
+        if arr.shape[1] != centroids_arr.shape[1]:
+            raise ValueError('Points and centroids must have the same '
+                             'dimension(found {0} and {1} respectively)'
+                             .format(arr.shape[1], centroids_arr.shape[1]))
+
+        clusters, distances = _array_compute_clusters(arr, centroids_arr)
+        return clusters.tolist(), distances.tolist()
+
     d = get_dimension(points)
     n = len(points)
     cluster_indexes = range(len(centroids))
@@ -373,7 +409,95 @@ def dimension_mean(points):
     return [sum(d) / float(len(d)) for d in dimensions]
 
 
-def kmeans(points, k_or_centroids, threshold=1e-5):
+def kmeans_plus_plus(points, k, random_state=None):
+    """
+    Chooses 'k' initial centroids from 'points' using k-means++ seeding.
+
+    The first centroid is a point chosen uniformly at random. Each following
+    centroid is chosen from the remaining points with a probability
+    proportional to the squared distance between the point and the closest
+    centroid chosen so far. This spreads the initial centroids out across the
+    population which reduces the number of iterations needed to converge.
+    Fewer than 'k' centroids are returned if 'points' has fewer than 'k'
+    distinct points.
+
+    Reference:
+        http://ilpubs.stanford.edu:8090/778/1/2006-13.pdf
+
+    Arguments:
+        points: list of n-dimensional points
+        k: int
+            The number of centroids to choose.
+        random_state: random.Random or None
+            The random number generator to use. The random module is used if
+            this is not supplied.
+
+    Returns:
+        A list of the chosen centroids.
+    """
+    if len(points) < 1:
+        raise ValueError("points must contain at least 1 point.")
+    if k < 1:
+        raise ValueError("k must be >= 1.")
+
+    rng = random_state or random
+    n = len(points)
+
+    if numpy is not None:
+        arr, flat = _as_array(points)
+
+        chosen = [rng.randrange(n)]
+        min_distances = numpy.power(arr - arr[chosen[0]], 2.0).sum(axis=1)
+
+        for _ in xrange(1, min(k, n)):
+            cumulative = numpy.cumsum(min_distances)
+
+            # All remaining points coincide with a chosen centroid.
+            if cumulative[-1] <= 0:
+                break
+
+            i = int(numpy.searchsorted(
+                cumulative, rng.random() * cumulative[-1], side='right'))
+            chosen.append(min(i, n - 1))
+
+            min_distances = numpy.minimum(
+                min_distances,
+                numpy.power(arr - arr[chosen[-1]], 2.0).sum(axis=1))
+
+        return _from_array(arr[chosen], flat)
+
+    nested = is_nested(points)
+
+    def sqr_distance(point, centroid):
+        if nested:
+            return sum(sqr_euclidean_dist(point, centroid))
+        return sqr_euclidean_dist(point, centroid)
+
+    centroids = [points[rng.randrange(n)]]
+    min_distances = [sqr_distance(p, centroids[0]) for p in points]
+
+    for _ in xrange(1, min(k, n)):
+        total = sum(min_distances)
+
+        # All remaining points coincide with a chosen centroid.
+        if total <= 0:
+            break
+
+        target = rng.random() * total
+        cumulative = 0
+        for i, distance in enumerate(min_distances):
+            cumulative += distance
+            if cumulative > target:
+                break
+
+        centroids.append(points[i])
+        min_distances = [min(d, sqr_distance(p, points[i]))
+                         for d, p in zip(min_distances, points)]
+
+    return [list(c) if nested else c for c in centroids]
+
+
+def kmeans(points, k_or_centroids, threshold=1e-5, init='random', seed=None):
     """
     Runs the k-means algorithm on the points for k clusters.
 
@@ -382,11 +506,14 @@ def kmeans(points, k_or_centroids, threshold=1e-5):
     provided in 'k_or_centroids'. If 'k_or_centroids' is a list, then the
     contents are used as the centroids and k is the length of that list. If
     'k_or_centroids' is not a list of centroids it is assumed to be an integer
-    to be used as k and the initial centroids are then k random points chosen
-    from 'points'.
+    to be used as k and the initial centroids are chosen from 'points'
+    according to 'init'. Use 'random' to choose k random points or
+    'k-means++' to use kmeans_plus_plus(). Passing a 'seed' makes the choice
+    of initial centroids reproducible.
 
     See:
         computer_clusters()
+        kmeans_plus_plus()
 
     Returns:
         centroids: list of centroids of the clusters found during execution
@@ -403,11 +530,30 @@ def kmeans(points, k_or_centroids, threshold=1e-5):
         initial_centroids = k_or_centroids
     else:
         k = k_or_centroids
-        initial_centroids = [p for p in random.sample(points, k)]
+
+        if seed is not None:
+            rng = random.Random(seed)
+        else:
+            rng = random
+
+        if k < 1:
+            initial_centroids = []
+        elif init == 'k-means++':
+            initial_centroids = kmeans_plus_plus(points, k, rng)
+        elif init == 'random':
+            initial_centroids = [p for p in rng.sample(points, k)]
+        else:
+            raise ValueError("init must be 'random' or 'k-means++'.")
 
     if k < 1:
         raise ValueError("k must be >= 1.")
 
+    if numpy is not None:
+        arr, flat = _as_array(points)
+        centroids, distance = _array_kmeans(
+            arr, _as_array(initial_centroids)[0], flat, threshold)
+        return _from_array(centroids, flat), float(distance)
+
     centroids = list(initial_centroids)
     mean_difference = float('Inf')
     previous_mean_distance = None
@@ -483,6 +629,14 @@ def find_outliers(points, outlier_threshold=3, normalized=True):
     Returns:
         The indexes of the outliers in 'points'.
     """
+    if numpy is not None:
+        arr, flat = _as_array(points)
+
+        if not normalized:
+            arr = _array_normalize(arr)
+
+        return _array_find_outliers(arr, flat, outlier_threshold).tolist()
+
     if not normalized:
         points = normalize(points)
 
@@ -512,7 +666,8 @@ def find_outliers(points, outlier_threshold=3, normalized=True):
                 (distance / mean_distance) >= outlier_threshold)]
 
 
-def kmeans_optm(points, k=None, outlier_threshold=3):
+def kmeans_optm(points, k=None, outlier_threshold=3, restarts=1,
+                processes=None, seed=None):
     """
     Execute k-means clustering(for finding centroid) on, compute the clusters
     for, and run outlier detection on the 'points' population.
@@ -537,6 +692,14 @@ def kmeans_optm(points, k=None, outlier_threshold=3):
     points. This ultimately reduces the number of iterations required during
     clustering due to increased likelihood of convergence.
 
+    If 'restarts' is greater than 1, that many independent runs of k-means
+    are performed, each seeded with kmeans_plus_plus(), and the run with the
+    lowest inertia(the sum of the squared distances between each point and
+    its centroid) is kept. The runs are distributed across a pool of
+    'processes' worker processes if more than one is requested. Supplying a
+    'seed' makes the result reproducible regardless of the number of
+    processes.
+
     Referenes:
         Number of clusters - http://en.wikipedia.org/wiki/Determining_the_number_of_clusters_in_a_data_set#Rule_of_thumb # noqa
         Improved k-means initial centroids - http://www.ijcsit.com/docs/vol1issue2/ijcsit2010010214.pdf # noqa
@@ -552,12 +715,23 @@ def kmeans_optm(points, k=None, outlier_threshold=3):
         outlier_threshold: float
             Used to define outliers. Outliers are points with normalized
             distances greater than this threshold.
+        restarts: int
+            The number of k-means++ seeded runs to choose the best result
+            from. When 1, the sorted mid-point initialization is used.
+        processes: int or None
+            The number of worker processes used to execute the restarts.
+        seed: int or None
+            Seed for the random number generator used for the restarts.
     Returns:
         A dictionary containing the centroids, indexes of each point's
         centroid, distances from each point to its centroid and optionally a
         list of indexes of the outliers in 'points'. More detailed info on
         the return values are included above.
     """
+    if numpy is not None:
+        return _array_kmeans_optm(points, k, outlier_threshold, restarts,
+                                  processes, seed)
+
     # If an outlier threshold is defined, remove outliers relative to the
     # population before running k-means clustering.
     if outlier_threshold:
@@ -607,7 +781,11 @@ def kmeans_optm(points, k=None, outlier_threshold=3):
     # associated with and the distance between each point and its centroid.
     # Centroids returned here are based on the normalized(see normalize())
     # points.
-    centroids, _ = kmeans(norm_points, initial_centroids)
+    if restarts > 1:
+        centroids = kmeans_restarts(norm_points, k, restarts, processes, seed)
+    else:
+        centroids, _ = kmeans(norm_points, initial_centroids)
+
     indexes, distances = compute_clusters(norm_points, centroids)
 
     # Denormalize the centroids for downstream use. Do this by multiplying
@@ -627,6 +805,48 @@ def kmeans_optm(points, k=None, outlier_threshold=3):
     }
 
 
+def _kmeans_restart(args):
+    """
+    Runs a single k-means++ seeded clustering for kmeans_restarts(). This is
+    a module level function so it can be sent to worker processes.
+    """
+    points, k, seed = args
+
+    centroids, _ = kmeans(points, k, init='k-means++', seed=seed)
+    _, distances = compute_clusters(points, centroids)
+
+    return centroids, sum(d ** 2 for d in distances)
+
+
+def kmeans_restarts(points, k, restarts, processes=None, seed=None):
+    """
+    Runs k-means 'restarts' times and returns the centroids of the run with
+    the lowest inertia.
+
+    Each run is seeded with kmeans_plus_plus(). If 'processes' is greater
+    than 1 the runs are executed in a multiprocessing pool. The seeds of the
+    individual runs are derived from 'seed' up front so the result does not
+    depend on the number of processes.
+    """
+    rng = random.Random(seed)
+    tasks = [(points, k, rng.getrandbits(32)) for _ in xrange(restarts)]
+
+    if processes and processes > 1:
+        pool = Pool(processes)
+
+        try:
+            results = pool.map(_kmeans_restart, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(_kmeans_restart, tasks)
+
+    centroids, _ = min(results, key=lambda result: result[1])
+
+    return centroids
+
+
 def weighted_counts(points, counts, k):
     """
     Calculate and return the weighted count of each centroid.
@@ -690,3 +910,499 @@ def weighted_counts(points, counts, k):
         })
 
     return centroid_counts, outliers
+
+
+def iter_batches(points, batch_size):
+    """
+    Yields lists of at most 'batch_size' points from the iterable 'points'.
+
+    QuerySets are read using their iterator() method so the results are not
+    cached on the QuerySet and only one batch is held in memory at a time.
+    """
+    if hasattr(points, 'iterator'):
+        iterator = points.iterator()
+    else:
+        iterator = iter(points)
+
+    while True:
+        batch = list(islice(iterator, batch_size))
+
+        if not batch:
+            break
+
+        yield batch
+
+
+def minibatch_update(points, centroids, counts):
+    """
+    Runs a single mini-batch step of the k-means algorithm.
+
+    Each point in 'points' is assigned to its nearest centroid and each
+    centroid is moved to the mean of all the points that have been assigned
+    to it so far, including those from previous batches. This is equivalent
+    to the per-point learning rate of 1 / count described in:
+
+        http://www.eecs.tufts.edu/~dsculley/papers/fastkmeans.pdf
+
+    Arguments:
+        points: nested list of points(dimensions N x M)
+        centroids: nested list of centroids(dimensions K x M)
+        counts: list of the number of points assigned to each centroid in
+                previous batches
+
+    Returns:
+        The updated centroids and counts.
+    """
+    if numpy is not None:
+        arr = numpy.asarray(points, dtype=float)
+        centroids = numpy.array(centroids, dtype=float)
+        counts = numpy.asarray(counts)
+        k = len(centroids)
+
+        clusters, _ = _array_compute_clusters(arr, centroids)
+        batch_counts = numpy.bincount(clusters, minlength=k)
+        sums = numpy.column_stack([
+            numpy.bincount(clusters, weights=arr[:, i], minlength=k)
+            for i in xrange(arr.shape[1])
+        ])
+
+        totals = counts + batch_counts
+        hit = batch_counts > 0
+        centroids[hit] = (centroids[hit] * counts[hit, numpy.newaxis] +
+                          sums[hit]) / totals[hit, numpy.newaxis]
+
+        return centroids.tolist(), totals.tolist()
+
+    clusters, _ = compute_clusters(points, centroids)
+
+    sums = [[0.0] * len(c) for c in centroids]
+    batch_counts = [0] * len(centroids)
+
+    for c, point in zip(clusters, points):
+        batch_counts[c] += 1
+        sums[c] = [s + p for s, p in zip(sums[c], point)]
+
+    totals = []
+    updated = []
+    for centroid, count, batch_count, total in \
+            zip(centroids, counts, batch_counts, sums):
+        totals.append(count + batch_count)
+
+        if batch_count:
+            updated.append([(c * count + s) / float(count + batch_count)
+                            for c, s in zip(centroid, total)])
+        else:
+            updated.append(list(centroid))
+
+    return updated, totals
+
+
+def sample_stream(batches, size, random_state=None):
+    """
+    Draws a uniform random sample of at most 'size' points from an iterable
+    of batches of points and computes the standard deviation of each
+    dimension of all the points, in a single pass.
+
+    The sample is drawn by reservoir sampling so every point is equally
+    likely to be chosen regardless of the order of the points, e.g. points
+    sorted by value. The standard deviations are accumulated batch by batch
+    by combining the mean and sum of squared differences of each batch.
+
+    Reference:
+        http://www.cs.umd.edu/~samir/498/vitter.pdf
+        http://i.stanford.edu/pub/cstr/reports/cs/tr/79/773/CS-TR-79-773.pdf
+
+    Arguments:
+        batches: iterable of lists of n-dimensional points
+        size: int
+            The maximum number of points in the sample.
+        random_state: random.Random or None
+            The random number generator to use. The random module is used if
+            this is not supplied.
+
+    Returns:
+        The sample, the list of the standard deviation of each dimension and
+        whether the points are flat(single dimension values).
+    """
+    rng = random_state or random
+
+    sample = []
+    flat = None
+    n = 0
+    means = squares = None
+
+    for batch in batches:
+        if flat is None:
+            flat = not is_nested(batch)
+
+        if numpy is not None:
+            arr = numpy.asarray(batch, dtype=float)
+            if flat:
+                arr = arr.reshape(-1, 1)
+            batch_means = arr.mean(axis=0).tolist()
+            batch_squares = \
+                numpy.power(arr - batch_means, 2.0).sum(axis=0).tolist()
+        else:
+            dimensions = [batch] if flat else zip(*batch)
+            batch_means = [sum(d) / float(len(d)) for d in dimensions]
+            batch_squares = [sum((v - m) ** 2 for v in d)
+                             for d, m in zip(dimensions, batch_means)]
+
+        batch_n = len(batch)
+
+        if means is None:
+            means, squares = batch_means, batch_squares
+        else:
+            total = n + batch_n
+            for i, (m, sq) in enumerate(zip(batch_means, batch_squares)):
+                delta = m - means[i]
+                means[i] += delta * batch_n / total
+                squares[i] += sq + delta ** 2 * n * batch_n / total
+
+        for point in batch:
+            n += 1
+
+            if len(sample) < size:
+                sample.append(point)
+            else:
+                j = rng.randrange(n)
+                if j < size:
+                    sample[j] = point
+
+    if not n:
+        raise ValueError("points must contain at least 1 point.")
+
+    std = [math.sqrt(sq / n) for sq in squares]
+
+    return sample, std, flat
+
+
+def kmeans_stream(points, k, batch_size=10000, outlier_threshold=3,
+                  seed=None):
+    """
+    Runs mini-batch k-means clustering on an iterable of points.
+
+    Unlike kmeans_optm(), 'points' does not need to be a list. It can be any
+    iterable such as a generator, `DataField.values_list()` or a QuerySet
+    using a server-side cursor. Points are consumed 'batch_size' at a time so
+    only a single batch and the sample are held in memory while the
+    centroids are computed.
+
+    The initial centroids are chosen by k-means++ seeding from a uniform
+    random sample of 'batch_size' points drawn from all the points, so the
+    centroids are spread across the whole population even if the points are
+    sorted. Each dimension is scaled by its standard deviation over all the
+    points, the same way kmeans_optm() normalizes the points, and the
+    returned centroids are scaled back to the original dimensions.
+    Dimensions that are constant are left unscaled.
+
+    If 'points' can be iterated over more than once(a list or a QuerySet but
+    not a generator), the sample is drawn in a first pass and the centroids
+    are updated with every point in a second pass. Otherwise, the centroids
+    are updated with the sample drawn in the only pass.
+
+    If 'points' can be iterated over more than once, a final pass is made to
+    assign each point to its closest centroid. 'indexes' and 'distances' are
+    stored in compact arrays rather than lists. Outliers are the points whose
+    distance to their centroid divided by the mean distance of all points to
+    their centroids is at least 'outlier_threshold'. Unlike kmeans_optm(),
+    outliers are not removed before clustering since that would require an
+    extra pass.
+
+    See:
+        kmeans_optm()
+        kmeans_plus_plus()
+        minibatch_update()
+        sample_stream()
+
+    Arguments:
+        points: iterable of n-dimensional points
+        k: int
+            The number of clusters to calculate.
+        batch_size: int
+            The number of points read and clustered at a time.
+        outlier_threshold: float
+            Used to define outliers. Set to None to skip outlier detection.
+        seed: int or None
+            Seed for choosing the initial centroids.
+
+    Returns:
+        A dictionary with the same keys as kmeans_optm(). If 'points' can
+        only be iterated over once, 'indexes' and 'distances' are None and
+        'outliers' is empty.
+    """
+    if k < 1:
+        raise ValueError("k must be >= 1.")
+
+    # An iterator returns itself and is exhausted after the first pass.
+    # QuerySets are checked first since iter() would prepare the result cache.
+    reiterable = hasattr(points, 'iterator') or iter(points) is not points
+
+    if seed is not None:
+        rng = random.Random(seed)
+    else:
+        rng = random
+
+    sample, std, flat = sample_stream(iter_batches(points, batch_size),
+                                      batch_size, rng)
+
+    std = [float(s) or 1.0 for s in std]
+
+    def scale(batch):
+        if flat:
+            return [[float(p) / std[0]] for p in batch]
+        return [[float(v) / s for v, s in zip(p, std)] for p in batch]
+
+    sample = scale(sample)
+    centroids = kmeans_plus_plus(sample, k, rng)
+    counts = [0] * len(centroids)
+
+    if reiterable:
+        batches = (scale(b) for b in iter_batches(points, batch_size))
+    else:
+        # The sample is the only representative of the points left. The
+        # reservoir is not in random order, the points are shuffled so the
+        # updates are not biased towards the first points.
+        rng.shuffle(sample)
+        batches = [sample]
+
+    for batch in batches:
+        centroids, counts = minibatch_update(batch, centroids, counts)
+
+    # Remove centroids that no point was ever assigned to.
+    centroids = [c for c, n in zip(centroids, counts) if n]
+
+    indexes = distances = None
+    outliers = []
+
+    if reiterable:
+        indexes = array('l')
+        distances = array('d')
+
+        for batch in iter_batches(points, batch_size):
+            batch_indexes, batch_distances = \
+                compute_clusters(scale(batch), centroids)
+            indexes.extend(batch_indexes)
+            distances.extend(batch_distances)
+
+        mean_distance = sum(distances) / float(len(distances))
+
+        if outlier_threshold and mean_distance > 0:
+            if numpy is not None:
+                outliers = numpy.flatnonzero(
+                    numpy.frombuffer(distances) / mean_distance >=
+                    outlier_threshold).tolist()
+            else:
+                outliers = [i for i, distance in enumerate(distances)
+                            if (distance / mean_distance) >= outlier_threshold]
+
+    if flat:
+        denorm_centroids = [c[0] * std[0] for c in centroids]
+    else:
+        denorm_centroids = \
+            [[dim * s for dim, s in zip(c, std)] for c in centroids]
+
+    return {
+        'centroids': denorm_centroids,
+        'indexes': indexes,
+        'distances': distances,
+        'outliers': outliers,
+    }
+
+
+# The functions below are the array-backed counterparts of the functions
+# above and are used when NumPy is installed. Points are always represented
+# as a 2-D float array with one row per point, single dimension lists of
+# numbers are tracked with a 'flat' flag so the results can be returned in
+# the same shape they were received in.
+#
+# Sums are accumulated left to right rather than with NumPy's pairwise
+# summation and squares are computed with power() rather than multiplication
+# so the results are identical to the pure Python implementation.
+
+def _as_array(points):
+    """
+    Returns a tuple of 'points' as a 2-D float array and whether 'points' was
+    a flat, single dimension, list of numbers.
+    """
+    try:
+        arr = numpy.asarray(points, dtype=float)
+    except ValueError:
+        raise ValueError("Points must have the same number of dimensions.")
+
+    if arr.ndim == 1:
+        return arr.reshape(-1, 1), True
+
+    if arr.ndim != 2:
+        raise ValueError("Points must have the same number of dimensions.")
+
+    return arr, False
+
+
+def _from_array(arr, flat):
+    "Converts a 2-D array of points back to the list form of the input."
+    if flat:
+        return arr[:, 0].tolist()
+
+    return arr.tolist()
+
+
+def _sequential_sum(arr):
+    "Sums the rows of 'arr' in order, the same as the builtin sum()."
+    if len(arr) == 0:
+        return numpy.zeros(arr.shape[1:])
+
+    return numpy.add.accumulate(arr, axis=0)[-1]
+
+
+def _array_std_dev(arr):
+    "Computes the standard deviation of each column of 'arr'."
+    n = float(len(arr))
+    mean = _sequential_sum(arr) / n
+    return numpy.sqrt(_sequential_sum(numpy.power(arr - mean, 2.0)) / n)
+
+
+def _array_normalize(arr, std=None):
+    """
+    Divides each column of 'arr' by its standard deviation. Columns with a
+    standard deviation of 0 are set to 0.
+    """
+    if std is None:
+        std = _array_std_dev(arr)
+
+    zero = std == 0
+    norm = arr / numpy.where(zero, 1, std)
+    norm[:, zero] = 0.0
+
+    return norm
+
+
+def _array_compute_clusters(arr, centroids):
+    """
+    Returns arrays of the nearest centroid index for each point and the
+    Euclidean distance between each point and that centroid.
+    """
+    n = len(arr)
+    clusters = numpy.empty(n, dtype=int)
+    min_distances = numpy.empty(n)
+
+    # Build the (points x centroids x dimensions) difference array in chunks
+    # to bound memory usage.
+    chunk = max(1, DISTANCE_CHUNK_SIZE // centroids.size)
+
+    for start in xrange(0, n, chunk):
+        diff = arr[start:start + chunk, numpy.newaxis, :] - centroids
+        distances = numpy.power(diff, 2.0).sum(axis=2)
+        nearest = distances.argmin(axis=1)
+
+        clusters[start:start + chunk] = nearest
+        min_distances[start:start + chunk] = \
+            distances[numpy.arange(len(nearest)), nearest]
+
+    return clusters, numpy.sqrt(min_distances)
+
+
+def _array_update_centroids(arr, clusters, k, flat):
+    """
+    Returns the mean of the members of each cluster. Empty clusters are
+    dropped.
+    """
+    counts = numpy.bincount(clusters, minlength=k)
+
+    # bincount accumulates the weights in point order which matches summing
+    # the members of each cluster individually.
+    sums = numpy.column_stack([
+        numpy.bincount(clusters, weights=arr[:, i], minlength=k)
+        for i in xrange(arr.shape[1])
+    ])
+
+    keep = counts > 0
+    centroids = sums[keep] / counts[keep, numpy.newaxis]
+
+    # Single dimension centroids are plain numbers in the pure Python
+    # implementation and are dropped when they evaluate to False.
+    if flat:
+        centroids = centroids[centroids[:, 0] != 0]
+
+    return centroids
+
+
+def _array_kmeans(arr, centroids, flat, threshold=1e-5):
+    "Array-backed implementation of kmeans()."
+    mean_difference = float('Inf')
+    previous_mean_distance = None
+
+    while mean_difference > threshold:
+        clusters, distances = _array_compute_clusters(arr, centroids)
+
+        mean_distance = _sequential_sum(distances) / float(len(distances))
+
+        if previous_mean_distance is not None:
+            mean_difference = previous_mean_distance - mean_distance
+
+        if mean_difference > threshold:
+            centroids = _array_update_centroids(
+                arr, clusters, len(centroids), flat)
+
+        previous_mean_distance = mean_distance
+
+    return centroids, previous_mean_distance
+
+
+def _array_find_outliers(arr, flat, outlier_threshold=3):
+    "Array-backed implementation of find_outliers() on normalized points."
+    midpoint_index = (len(arr) - 1) / 2
+    centroids = numpy.sort(arr, axis=0)[midpoint_index:midpoint_index + 1]
+
+    centroids, _ = _array_kmeans(arr, centroids, flat)
+    _, distances = _array_compute_clusters(arr, centroids)
+
+    mean_distance = _sequential_sum(distances) / float(len(distances))
+
+    if not mean_distance > 0:
+        return numpy.array([], dtype=int)
+
+    return numpy.flatnonzero(distances / mean_distance >= outlier_threshold)
+
+
+def _array_kmeans_optm(points, k=None, outlier_threshold=3, restarts=1,
+                       processes=None, seed=None):
+    "Array-backed implementation of kmeans_optm()."
+    arr, flat = _as_array(points)
+
+    if outlier_threshold:
+        outliers = _array_find_outliers(
+            _array_normalize(arr), flat, outlier_threshold)
+
+        mask = numpy.ones(len(arr), dtype=bool)
+        mask[outliers] = False
+        arr = arr[mask]
+        outliers = outliers.tolist()
+    else:
+        outliers = []
+
+    n = len(arr)
+    k = k or int(math.sqrt(n / 2))
+
+    std = _array_std_dev(arr)
+    norm_arr = _array_normalize(arr, std)
+
+    # Pick the initial centroids from the points sorted along each dimension.
+    step = n / k
+    offset = step / 2
+    initial_centroids = numpy.sort(norm_arr, axis=0)[offset::step]
+
+    if restarts > 1:
+        centroids = numpy.asarray(
+            kmeans_restarts(norm_arr, k, restarts, processes, seed))
+    else:
+        centroids, _ = _array_kmeans(norm_arr, initial_centroids, flat)
+
+    indexes, distances = _array_compute_clusters(norm_arr, centroids)
+
+    return {
+        'centroids': _from_array(centroids * std, flat),
+        'indexes': indexes.tolist(),
+        'distances': distances.tolist(),
+        'outliers': outliers,
+    }
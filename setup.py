@@ -9,8 +9,20 @@ install_requires = [
     'jsonfield==0.9.4',
 ]
 
+tests_require = [
+    'django-guardian==1.0.4',
+    'django-haystack==2.0.0',
+    'whoosh==2.4.1',
+    'openpyxl>=1.6,<1.7',
+    'python-memcached>=1.48',
+    'django-objectset>=0.2.2',
+]
+
 if sys.version_info < (2, 7):
     install_requires.append('ordereddict>=1.1')
+else:
+    # The last release of pyarrow for Python 2 is 0.16
+    tests_require.append('pyarrow<0.17')
 
 
 kwargs = {
@@ -25,14 +37,7 @@ kwargs = {
     'test_suite': 'test_suite',
 
     # Test dependencies
-    'tests_require': [
-        'django-guardian==1.0.4',
-        'django-haystack==2.0.0',
-        'whoosh==2.4.1',
-        'openpyxl>=1.6,<1.7',
-        'python-memcached>=1.48',
-        'django-objectset>=0.2.2',
-    ],
+    'tests_require': tests_require,
 
     # Optional dependencies
     'extras_require': {
@@ -44,6 +49,10 @@ kwargs = {
         'extras': ['openpyxl>=1.6,<1.7'],
         # Pretty printing of SQL in the admin and for debugging
         'sql': ['sqlparse'],
+        # Array-backed statistics such as k-means clustering
+        'stats': ['numpy'],
+        # Parquet exporter
+        'parquet': ['pyarrow'],
     },
 
     # Metadata
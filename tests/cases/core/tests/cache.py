@@ -2,7 +2,12 @@ import time
 from django.db import models
 from django.test import TestCase
 from django.test.utils import override_settings
-from avocado.core.cache import CacheProxy, instance_cache_key
+from django.core import management
+from django.core.cache import cache
+from avocado.core.cache import CacheProxy, LocalCache, local_cache, \
+    instance_cache_key, prefetch_cached, serializers, invalidation
+from avocado.models import DataField
+from tests.models import Title, Employee
 from ..models import Foo
 
 
@@ -47,6 +52,290 @@ class CacheProxyTestCase(TestCase):
         self.assertIsNone(self.cp.get(c))
         self.assertFalse(self.cp.cached(c))
 
+    def test_args(self):
+        c = ComplexNumber()
+        title = Title.objects.create(name='Analyst')
+
+        self.assertEqual(self.cp.cache_key(c, 'a', [1, 2], b=True),
+                         self.cp.cache_key(c, 'a', [1, 2], b=True))
+
+        # Model instances are represented by their primary key
+        self.assertEqual(self.cp.cache_key(c, title),
+                         self.cp.cache_key(c, Title.objects.get(pk=title.pk)))
+
+        # Objects without a stable representation are rejected
+        self.assertRaises(TypeError, self.cp.cache_key, c, object())
+        self.assertRaises(TypeError, self.cp.cache_key, c, Title())
+
+
+class LocalCacheTestCase(TestCase):
+    def test_entries(self):
+        c = LocalCache(max_entries=2, max_bytes=1024)
+
+        c.set('a', 1)
+        c.set('b', 2)
+
+        # Mark 'a' as recently used so 'b' is evicted
+        self.assertEqual(c.get('a'), 1)
+        c.set('c', 3)
+
+        self.assertTrue('a' in c)
+        self.assertFalse('b' in c)
+        self.assertTrue('c' in c)
+        self.assertEqual(c.get('b'), None)
+
+        stats = c.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['entries'], 2)
+
+        c.delete('a')
+        self.assertFalse('a' in c)
+
+        c.clear()
+        self.assertEqual(len(c), 0)
+        self.assertEqual(c.stats()['bytes'], 0)
+
+    def test_bytes(self):
+        c = LocalCache(max_entries=100, max_bytes=200)
+
+        c.set('a', 'x' * 100)
+        c.set('b', 'x' * 100)
+
+        self.assertFalse('a' in c)
+        self.assertTrue('b' in c)
+        self.assertTrue(c.stats()['bytes'] <= 200)
+
+        # Larger than the budget, never stored
+        c.set('c', 'x' * 500)
+        self.assertFalse('c' in c)
+
+    def test_copies(self):
+        c = LocalCache(max_entries=10, max_bytes=1024)
+
+        # Mutable values are copied so callers cannot modify the entry
+        c.set('a', [1, 2])
+        c.get('a').append(3)
+        self.assertEqual(c.get('a'), [1, 2])
+
+        c.set('b', ({'x': 1},))
+        c.get('b')[0]['x'] = 2
+        self.assertEqual(c.get('b'), ({'x': 1},))
+
+        # Immutable values are shared
+        value = (1, u'a', None)
+        c.set('c', value)
+        self.assertTrue(c.get('c') is value)
+
+    def test_timeout(self):
+        c = LocalCache(max_entries=10, max_bytes=1024)
+        c.set('a', 1, timeout=1)
+        self.assertTrue('a' in c)
+        time.sleep(1)
+        self.assertFalse('a' in c)
+
+
+class LocalCacheProxyTestCase(TestCase):
+    def setUp(self):
+        self.cp = CacheProxy(ComplexNumber.as_string,
+                             version='get_version',
+                             timeout=10,
+                             key_func=instance_cache_key)
+        local_cache.clear()
+
+    def tearDown(self):
+        local_cache.clear()
+
+    @override_settings(AVOCADO_DATA_CACHE_ENABLED=True,
+                       AVOCADO_DATA_CACHE_LOCAL_ENABLED=True)
+    def test(self):
+        c = ComplexNumber()
+        self.cp.flush(c)
+
+        self.assertEqual(self.cp.get_or_set(c), '2+3i')
+        self.assertTrue(self.cp.cache_key(c) in local_cache)
+
+        self.assertEqual(self.cp.get_or_set(c), '2+3i')
+        self.assertEqual(local_cache.stats()['hits'], 1)
+
+        self.cp.flush(c)
+        self.assertFalse(self.cp.cached(c))
+        self.assertFalse(self.cp.cache_key(c) in local_cache)
+
+    @override_settings(AVOCADO_DATA_CACHE_ENABLED=True,
+                       AVOCADO_DATA_CACHE_LOCAL_ENABLED=False)
+    def test_disabled(self):
+        c = ComplexNumber()
+        self.cp.flush(c)
+
+        self.assertEqual(self.cp.get_or_set(c), '2+3i')
+        self.assertFalse(self.cp.cache_key(c) in local_cache)
+
+
+@override_settings(AVOCADO_DATA_CACHE_ENABLED=True,
+                   AVOCADO_DATA_CACHE_SINGLE_FLIGHT=True,
+                   AVOCADO_DATA_CACHE_SERVE_STALE=True,
+                   AVOCADO_DATA_CACHE_LOCK_WAIT=0.3,
+                   AVOCADO_DATA_CACHE_LOCK_TIMEOUT=10)
+class SingleFlightTestCase(TestCase):
+    def setUp(self):
+        self.calls = 0
+
+        def as_string(instance):
+            self.calls += 1
+            return '2+3i'
+
+        self.cp = CacheProxy(as_string,
+                             version='get_version',
+                             timeout=10,
+                             key_func=instance_cache_key)
+        self.c = ComplexNumber()
+        self.cp.flush(self.c)
+        self.lock_key = self.cp.cache_key(self.c) + ':lock'
+        self.stale_key = self.cp.stale_cache_key(self.c)
+        cache.delete(self.lock_key)
+        cache.delete(self.stale_key)
+
+    def test(self):
+        self.assertEqual(self.cp.get_or_set(self.c), '2+3i')
+        self.assertEqual(self.calls, 1)
+
+        # Lock is released and the stale copy is set
+        self.assertFalse(self.lock_key in cache)
+        self.assertEqual(serializers.get(self.stale_key), '2+3i')
+
+    def test_stale(self):
+        cache.add(self.lock_key, 1)
+        serializers.set_one(self.stale_key, '1+1i', timeout=10)
+
+        self.assertEqual(self.cp.get_or_set(self.c), '1+1i')
+        self.assertEqual(self.calls, 0)
+
+    def test_wait(self):
+        cache.add(self.lock_key, 1)
+
+        # No stale data, waits for the lock and computes it itself
+        self.assertEqual(self.cp.get_or_set(self.c), '2+3i')
+        self.assertEqual(self.calls, 1)
+
+
+class SerializerTestCase(TestCase):
+    def test_zlib(self):
+        s = serializers.ZlibSerializer()
+        data = tuple(u'value {0}'.format(i) for i in range(1000))
+
+        payload = s.dumps(data)
+        self.assertTrue(isinstance(payload, str))
+        self.assertEqual(s.loads(payload), data)
+
+        stats = s.stats()
+        self.assertEqual(stats['count'], 1)
+        self.assertTrue(stats['ratio'] > 1)
+
+    def test_array(self):
+        s = serializers.ArraySerializer()
+
+        for data in [tuple(range(1000)), [i / 3.0 for i in range(1000)],
+                     (True, False), (1, 2.0, 'a'), {'a': 1}, ()]:
+            self.assertEqual(s.loads(s.dumps(data)), data)
+            self.assertEqual(type(s.loads(s.dumps(data))), type(data))
+
+    @override_settings(AVOCADO_DATA_CACHE_SERIALIZER='avocado.core.cache.'
+                       'serializers.ZlibSerializer',
+                       AVOCADO_DATA_CACHE_CHUNK_SIZE=100)
+    def test_chunked(self):
+        data = tuple(u'value {0}'.format(i) for i in range(1000))
+
+        serializers.set_one('chunked', data, timeout=10)
+        manifest = cache.get('chunked')
+        self.assertTrue(isinstance(manifest, serializers.ChunkManifest))
+        self.assertTrue(manifest.count > 1)
+
+        self.assertEqual(serializers.get('chunked'), data)
+        self.assertEqual(serializers.get_many(['chunked', 'missing']),
+                         {'chunked': data})
+
+        # Missing chunk
+        cache.delete(serializers.chunk_key('chunked', 0))
+        self.assertEqual(serializers.get('chunked'), None)
+
+        serializers.delete('chunked')
+        self.assertFalse('chunked' in cache)
+        self.assertFalse(serializers.chunk_key('chunked', 1) in cache)
+
+    def test_format(self):
+        data = tuple(range(100))
+
+        with self.settings(AVOCADO_DATA_CACHE_SERIALIZER='avocado.core.'
+                           'cache.serializers.ArraySerializer'):
+            serializers.set_one('data', data, timeout=10)
+            self.assertEqual(serializers.get('data'), data)
+
+        # Data of another serializer is a miss
+        with self.settings(AVOCADO_DATA_CACHE_SERIALIZER='avocado.core.'
+                           'cache.serializers.ZlibSerializer'):
+            self.assertEqual(serializers.get('data'), None)
+            self.assertEqual(serializers.get_many(['data']), {})
+
+        self.assertEqual(serializers.get('data'), None)
+
+        # As is data not stored by a serializer
+        cache.set('data', data)
+        self.assertEqual(serializers.get('data'), None)
+
+
+class InvalidationTestCase(TestCase):
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        invalidation.register(Title)
+
+    def tearDown(self):
+        invalidation.unregister(Title)
+
+    def versions(self, model_name):
+        return list(DataField.objects.filter(model_name=model_name)
+                    .values_list('data_version', flat=True))
+
+    def test_signals(self):
+        from avocado import metadata
+        self.assertEqual(self.versions('title'), [1, 1, 1])
+        version = metadata.get_version()
+        data_version = metadata.get_data_version()
+
+        title = Title(name='Engineer')
+        title.save()
+        self.assertEqual(self.versions('title'), [2, 2, 2])
+
+        title.delete()
+        self.assertEqual(self.versions('title'), [3, 3, 3])
+
+        # Unrelated fields are untouched
+        self.assertTrue(all(v == 1 for v in self.versions('employee')))
+
+        # Only the data version is incremented, not the metadata version
+        self.assertEqual(metadata.get_version(), version)
+        self.assertNotEqual(metadata.get_data_version(), data_version)
+
+    def test_batch(self):
+        with invalidation.batch():
+            for i in range(5):
+                Title(name=str(i)).save()
+
+            # Nested blocks are flushed by the outermost one
+            with invalidation.batch():
+                invalidation.touch(Employee)
+
+            self.assertEqual(self.versions('title'), [1, 1, 1])
+
+        self.assertEqual(self.versions('title'), [2, 2, 2])
+        self.assertTrue(all(v == 2 for v in self.versions('employee')))
+
+    def test_register(self):
+        from avocado.core.loader import AlreadyRegistered, NotRegistered
+        self.assertRaises(AlreadyRegistered, invalidation.register, Title)
+        self.assertRaises(NotRegistered, invalidation.unregister, Employee)
+
 
 class CacheManagerTestCase(TestCase):
     @override_settings(AVOCADO_DATA_CACHE_ENABLED=True)
@@ -111,6 +400,44 @@ class CachedMethodTestCase(TestCase):
         self.assertFalse(f.unversioned.cached(f))
 
 
+class PrefetchCachedTestCase(TestCase):
+    def setUp(self):
+        self.foos = [Foo(value=i) for i in range(3)]
+        for f in self.foos:
+            f.save()
+            f.default_versioned.flush(f)
+            f.unversioned.flush(f)
+
+    @override_settings(AVOCADO_DATA_CACHE_ENABLED=True)
+    def test(self):
+        # One is already cached
+        self.foos[0].default_versioned()
+
+        prefetch_cached(self.foos, ('default_versioned', 'unversioned'))
+
+        for f in self.foos:
+            self.assertTrue(f.default_versioned.cached(f))
+            self.assertTrue(f.unversioned.cached(f))
+
+            # Remove from the cache, the bound data is used instead
+            cache.delete(f.default_versioned.cache_key(f))
+            self.assertEqual(f.default_versioned(), [f.value])
+            self.assertFalse(f.default_versioned.cached(f))
+
+        # Flushing removes the bound data
+        f = self.foos[0]
+        f.unversioned.flush(f)
+        self.assertEqual(f.unversioned.cache_proxy.bound(
+            f, f.unversioned.cache_key(f)), None)
+
+    @override_settings(AVOCADO_DATA_CACHE_ENABLED=False)
+    def test_disabled(self):
+        prefetch_cached(self.foos, ('default_versioned',))
+
+        for f in self.foos:
+            self.assertFalse(f.default_versioned.cached(f))
+
+
 class TestIssue136(TestCase):
     def setUp(self):
         self.f1 = Foo(value=1)
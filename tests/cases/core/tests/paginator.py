@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.core.paginator import PageNotAnInteger
 from avocado.core.paginator import BufferedPaginator
 
 class BufferedPaginatorTestCase(TestCase):
@@ -105,3 +106,21 @@ class BufferedPaginatorTestCase(TestCase):
         self.assertEqual(bp.get_overlap(55, 12), (True, (None, None), (61, 7)))
         self.assertEqual(bp.get_overlap(20, 8), (False, (20, 8), (None, None)))
         self.assertEqual(bp.get_overlap(70, 3), (False, (70, 3), (None, None)))
+
+    def test_cursors(self):
+        bp = BufferedPaginator(count=100, per_page=10, cursors={2: 'abc'})
+
+        self.assertEqual(bp.page('abc').number, 2)
+        self.assertEqual(bp.page(2).cursor, 'abc')
+        self.assertEqual(bp.page(1).next_cursor(), 'abc')
+        self.assertEqual(bp.page(1).cursor, None)
+
+        self.assertTrue(bp.page(1).can_seek())
+        self.assertTrue(bp.page(2).can_seek())
+        self.assertFalse(bp.page(3).can_seek())
+
+        bp.page(2).set_next_cursor('def')
+        self.assertEqual(bp.page('def').number, 3)
+        self.assertTrue(bp.page(3).can_seek())
+
+        self.assertRaises(PageNotAnInteger, bp.page, 'ghi')
@@ -1,15 +1,28 @@
 import os
-from django.test import TestCase
-from django.http import HttpResponse
+import time
+from multiprocessing.pool import ThreadPool
+from django.test import TestCase, TransactionTestCase
+from django.utils.unittest import skipUnless
+from django.db import connection, connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template import Template
 from django.core import management
-from avocado import export
-from avocado.formatters import RawFormatter
+from zipfile import ZipFile
+from cStringIO import StringIO
+from avocado import export, jobs
+from avocado.jobs import executors
+from avocado.conf import OPTIONAL_DEPS
+from avocado.export import parallel
+from avocado.formatters import Formatter, RawFormatter
+from avocado.query import cursors, pipeline
 from avocado.models import DataField, DataConcept, DataConceptField, DataView
 from ... import models
 
 __all__ = ['FileExportTestCase', 'ResponseExportTestCase',
-           'ForceDistinctRegressionTestCase']
+           'ForceDistinctRegressionTestCase', 'JobTestCase',
+           'JobExecutorTestCase',
+           'StreamingTestCase', 'ParallelExportTestCase',
+           'ParallelWorkersTestCase', 'ParquetExportTestCase']
 
 
 class ExportTestCase(TestCase):
@@ -81,6 +94,38 @@ class FileExportTestCase(TestCase):
         buff.seek(0)
         self.assertEqual(len(buff.read()), 246)
 
+    def test_read_rows(self):
+        class NameFormatter(Formatter):
+            def to_csv(self, values, **context):
+                return u'{0} {1}'.format(*values.values())
+            to_csv.process_multiple = True
+
+        name_concept = DataConcept.objects.create(name='Name')
+        for i, name in enumerate(['first_name', 'last_name']):
+            field = DataField.objects.get_by_natural_key('tests', 'employee',
+                                                         name)
+            DataConceptField(concept=name_concept, field=field,
+                             order=i).save()
+
+        exporter = export.CSVExporter(self.concepts)
+        exporter.add_formatter(NameFormatter(name_concept))
+        query = models.Employee.objects.values_list(
+            'first_name', 'last_name', 'is_manager', 'title__name',
+            'title__salary', 'first_name', 'last_name')
+
+        rows = list(exporter.read_rows(query))
+        self.assertEqual(rows[0], ['first_name', 'last_name', 'is_manager',
+                                   'name', 'salary', 'Name'])
+
+        # The flat rows are equivalent to the formatted dicts
+        for row, row_gen in zip(rows[1:], exporter.read(query)):
+            values = []
+            for data in row_gen:
+                values.extend(data.values())
+            self.assertEqual(row, values)
+
+        self.assertEqual(list(exporter.read_rows([])), [])
+
     def test_excel(self):
         fname = 'excel_export.xlsx'
         exporter = export.ExcelExporter(self.concepts)
@@ -96,7 +141,7 @@ class FileExportTestCase(TestCase):
         exporter = export.SASExporter(self.concepts)
         exporter.write(self.query, fname)
         self.assertTrue(os.path.exists(fname))
-        self.assertEqual(len(open(fname).read()), 1335)
+        self.assertEqual(len(open(fname).read()), 1379)
         os.remove(fname)
 
     def test_r(self):
@@ -104,9 +149,26 @@ class FileExportTestCase(TestCase):
         exporter = export.RExporter(self.concepts)
         exporter.write(self.query, fname)
         self.assertTrue(os.path.exists(fname))
-        self.assertEqual(len(open(fname).read()), 754)
+        self.assertEqual(len(open(fname).read()), 798)
         os.remove(fname)
 
+    def test_archive_data(self):
+        data = export.CSVExporter(self.concepts).write(self.query).getvalue()
+
+        for klass in (export.SASExporter, export.RExporter):
+            stored = StringIO()
+            klass(self.concepts).write(self.query, stored)
+            self.assertEqual(ZipFile(stored).read('data.csv'), data)
+
+            deflated = StringIO()
+            klass(self.concepts).write(self.query, deflated,
+                                       compress_level=9)
+            zip_file = ZipFile(deflated)
+            self.assertEqual(zip_file.testzip(), None)
+            self.assertEqual(zip_file.read('data.csv'), data)
+            self.assertTrue(len(deflated.getvalue()) <
+                            len(stored.getvalue()))
+
     def test_json(self):
         exporter = export.JSONExporter(self.concepts)
         buff = exporter.write(self.query)
@@ -144,17 +206,34 @@ class ResponseExportTestCase(FileExportTestCase):
         l = len(response.content)
         self.assertTrue(6220 <= l <= 6250)
 
+    def test_excel_streaming(self):
+        exporter = export.ExcelExporter(self.concepts)
+        response = StreamingHttpResponse()
+        exporter.write(self.query, response)
+        l = len(''.join(response.streaming_content))
+        self.assertTrue(6220 <= l <= 6250)
+
+    def test_excel_data_dictionary(self):
+        exporter = export.ExcelExporter(self.concepts * 3)
+        with self.assertNumQueries(1):
+            concept_fields = exporter._get_concept_fields()
+            for concept, cfields in concept_fields:
+                self.assertEqual([f.field.field_name for f in cfields],
+                                 ['first_name', 'last_name', 'is_manager',
+                                  'name', 'salary'])
+        self.assertEqual(len(concept_fields), 3)
+
     def test_sas(self):
         exporter = export.SASExporter(self.concepts)
         response = HttpResponse()
         exporter.write(self.query, response)
-        self.assertEqual(len(response.content), 1335)
+        self.assertEqual(len(response.content), 1379)
 
     def test_r(self):
         exporter = export.RExporter(self.concepts)
         response = HttpResponse()
         exporter.write(self.query, response)
-        self.assertEqual(len(response.content), 754)
+        self.assertEqual(len(response.content), 798)
 
     def test_json(self):
         exporter = export.JSONExporter(self.concepts)
@@ -252,3 +331,533 @@ class ForceDistinctRegressionTestCase(TestCase):
             (1, u'Eric', u'Smith'),
             (2, u'Erin', u'Jones')
         ])
+
+    def test_run_key(self):
+        "Duplicates are only compared within the rows of an object."
+        def processor(concept):
+            view = DataView(json=[
+                {'concept': self.first_name.pk},
+                {'concept': concept.pk, 'sort': 'asc', 'visible': False},
+            ])
+            return pipeline.QueryProcessor(view=view, tree=models.Employee)
+
+        flat = processor(self.title_name)
+        exporter = flat.get_exporter(export.BaseExporter)
+        iterable = flat.get_iterable()
+        self.assertEqual(iterable.run_key_length, 1)
+
+        rows = list(iterable)
+        self.assertEqual([r[0] for r in rows], [2, 4, 6, 1, 3, 5])
+        self.assertEqual(len(list(exporter.write(rows))), 6)
+
+        # Rows that are not ordered by the processor are compared to all
+        # rows
+        self.assertEqual(exporter.run_key_length, None)
+        self.assertEqual(len(list(exporter.write(rows + rows[:1]))), 6)
+
+        # The rows of an object are spread across the ordering
+        related = processor(self.project_name)
+        exporter = related.get_exporter(export.BaseExporter)
+        iterable = related.get_iterable()
+        self.assertFalse(hasattr(iterable, 'run_key_length'))
+        self.assertEqual(len(list(exporter.write(iterable))), 6)
+
+    def test_filter_rows(self):
+        exporter = export.BaseExporter()
+        exporter.add_formatter(RawFormatter(keys=['pk', 'value']))
+
+        # -1 and -2 have the same hash
+        rows = [(1, -1), (1, -2), (1, -1), (2, -1), (1, -1)]
+        self.assertEqual(list(exporter.filter_rows(rows)),
+                         [(1, -1), (1, -2), (2, -1)])
+
+        exporter.run_key_length = 1
+        self.assertEqual(list(exporter.filter_rows(rows)),
+                         [(1, -1), (1, -2), (2, -1), (1, -1)])
+
+        self.assertEqual(len(list(exporter.filter_rows(rows, False))), 5)
+
+
+class JobTestCase(TestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        concept = DataConcept.objects.get(fields__field_name='first_name')
+        self.view_json = [{'concept': concept.pk}]
+
+    def test_count(self):
+        job = jobs.submit_count(view_json=self.view_json, executor='sync')
+        job = jobs.Job.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, jobs.DONE)
+        self.assertEqual(job.count, 6)
+
+    def test_export(self):
+        job = jobs.submit_export('csv', view_json=self.view_json,
+                                 executor='sync')
+        job = jobs.Job.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, jobs.DONE)
+        self.assertEqual(job.rows, 6)
+        self.assertEqual(job.total, 6)
+        self.assertEqual(job.progress, 1.0)
+
+        lines = jobs.open_result(job).read().splitlines()
+        self.assertEqual(lines[0], 'id,first_name')
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(job.bytes, len('\r\n'.join(lines)) + 2)
+
+        response = jobs.get_response(job)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(''.join(response.streaming_content).splitlines(),
+                         lines)
+
+        jobs.delete(job)
+        self.assertFalse(jobs.file_store.exists(job.filename))
+
+    def test_cancel(self):
+        job = jobs.Job(kind=jobs.EXPORT, exporter='csv',
+                       view_json=self.view_json)
+        job.save()
+
+        # Cancelled while running
+        jobs.Job.objects.filter(pk=job.pk).update(cancel_requested=True)
+        processor = jobs.get_processor(job)
+        iterable = jobs.ProgressIterator(job, processor.get_iterable(),
+                                         interval=2)
+        self.assertRaises(jobs.JobCancelled, list, iterable)
+        self.assertEqual(iterable.rows, 2)
+
+        # Cancelled before running
+        job = jobs.submit_export('csv', view_json=self.view_json,
+                                 executor='sync')
+        job.status = jobs.PENDING
+        jobs.Job.objects.filter(pk=job.pk).update(status=jobs.PENDING)
+        jobs.cancel(job)
+
+        job = jobs.Job.objects.get(pk=job.pk)
+        self.assertEqual(job.status, jobs.CANCELLED)
+        jobs.run(job.pk)
+        self.assertEqual(jobs.Job.objects.get(pk=job.pk).status,
+                         jobs.CANCELLED)
+
+    def test_failed(self):
+        job = jobs.submit_export('foo', view_json=self.view_json,
+                                 executor='sync')
+        job = jobs.Job.objects.get(pk=job.pk)
+        self.assertEqual(job.status, jobs.FAILED)
+        self.assertTrue(job.error)
+
+    def test_failed_output(self):
+        export.registry.register(FailingExporter)
+
+        try:
+            job = jobs.submit_export('FailingExporter',
+                                     view_json=self.view_json,
+                                     executor='sync')
+        finally:
+            export.registry.unregister(FailingExporter)
+
+        job = jobs.Job.objects.get(pk=job.pk)
+        self.assertEqual(job.status, jobs.FAILED)
+        self.assertEqual(job.filename, None)
+
+        # The partial output is deleted
+        self.assertFalse(jobs.file_store.exists('{0}.csv'.format(job.pk)))
+
+    def test_missing(self):
+        self.assertEqual(jobs.run(0), None)
+
+
+class JobExecutorTestCase(TransactionTestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        concept = DataConcept.objects.get(fields__field_name='first_name')
+        self.view_json = [{'concept': concept.pk}]
+
+    def test_thread_executor(self):
+        executor = executors.ThreadExecutor(workers=1)
+
+        # A database in memory only exists for the connection of the test,
+        # which is shared with the worker as in LiveServerTestCase
+        shared = connections['default']
+
+        if shared.settings_dict['NAME'] == ':memory:':
+            def share_connection():
+                connections['default'] = shared
+
+            shared.allow_thread_sharing = True
+            executor._pool = ThreadPool(1, initializer=share_connection)
+
+        try:
+            job = jobs.Job(kind=jobs.EXPORT, exporter='csv',
+                           view_json=self.view_json)
+            job.save()
+            executor.submit(job.pk)
+            executor.shutdown()
+        finally:
+            shared.allow_thread_sharing = False
+
+        job = jobs.Job.objects.get(pk=job.pk)
+        self.assertEqual(job.status, jobs.DONE)
+        self.assertEqual(job.rows, 6)
+
+        jobs.delete(job)
+
+    def test_submit_managed(self):
+        # The transaction of the caller is not committed
+        with transaction.commit_manually():
+            job = jobs.submit_count(view_json=self.view_json,
+                                    executor='sync')
+            transaction.rollback()
+
+        self.assertFalse(jobs.Job.objects.filter(pk=job.pk).exists())
+
+        job = jobs.submit_count(view_json=self.view_json, executor='sync')
+        transaction.rollback()
+        self.assertTrue(jobs.Job.objects.filter(pk=job.pk).exists())
+
+
+class FailingExporter(export.CSVExporter):
+    def write(self, iterable, buff=None, *args, **kwargs):
+        buff.write('partial')
+        raise ValueError('failed')
+
+
+class StreamingTestCase(TestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        self.first_name = DataField.objects.get(field_name='first_name')\
+            .concepts.all()[0]
+        self.salary = DataField.objects.get(field_name='salary')\
+            .concepts.all()[0]
+
+    def test_stream(self):
+        view = DataView(json=[
+            {'concept': self.first_name.pk},
+            {'concept': self.salary.pk, 'sort': 'desc', 'visible': False},
+        ])
+        processor = pipeline.QueryProcessor(view=view, tree=models.Employee)
+
+        rows = list(processor.get_iterable())
+        streamed = list(processor.get_iterable(stream=True, chunk_size=4))
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(streamed, rows)
+
+        # Offset and limit
+        self.assertEqual(list(processor.get_iterable(
+            offset=1, limit=3, stream=True, chunk_size=2)), rows[1:4])
+
+    def test_empty(self):
+        processor = pipeline.QueryProcessor(tree=models.Employee)
+        queryset = processor.get_queryset().filter(pk__in=[])
+
+        self.assertEqual(list(cursors.results_iter(queryset)), [])
+
+    def test_close(self):
+        processor = pipeline.QueryProcessor(tree=models.Employee)
+        iterable = processor.get_iterable(stream=True, chunk_size=2)
+
+        self.assertEqual(next(iterable), (1,))
+        iterable.close()
+        self.assertRaises(StopIteration, next, iterable)
+
+    def test_dedicated_cursor(self):
+        class Connection(object):
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        connection = Connection()
+        cursor = cursors.DedicatedCursor(connections['default'].cursor(),
+                                         connection)
+        cursor.execute('SELECT 1')
+
+        # The connection is closed with the cursor
+        self.assertEqual(list(cursors.fetch_chunks(cursor, 10)), [[(1,)]])
+        self.assertTrue(connection.closed)
+
+
+class ParallelExportTestCase(TestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        self.first_name = DataField.objects.get(field_name='first_name')\
+            .concepts.all()[0]
+        self.last_name = DataField.objects.get(field_name='last_name')\
+            .concepts.all()[0]
+        self.salary = DataField.objects.get(field_name='salary')\
+            .concepts.all()[0]
+
+        self.view_json = [
+            {'concept': self.last_name.pk},
+            {'concept': self.salary.pk, 'sort': 'desc', 'visible': False},
+        ]
+
+    def _export(self):
+        processor = pipeline.QueryProcessor(
+            view=DataView(json=self.view_json), tree=models.Employee,
+            include_pk=False)
+        exporter = processor.get_exporter(export.CSVExporter)
+        return exporter.write(processor.get_iterable()).getvalue()
+
+    def test_concat(self):
+        buff = StringIO()
+        count = parallel.export('csv', buff, view_json=self.view_json,
+                                tree=models.Employee, include_pk=False,
+                                workers=1, chunk_size=2)
+
+        # Smith appears twice and is only exported once
+        self.assertEqual(count, 3)
+        self.assertEqual(buff.getvalue(), self._export())
+        self.assertEqual(len(buff.getvalue().splitlines()), 6)
+
+    def test_archive(self):
+        buff = StringIO()
+        count = parallel.export('csv', buff, view_json=self.view_json,
+                                tree=models.Employee, include_pk=False,
+                                workers=1, chunk_size=2, archive=True)
+
+        self.assertEqual(count, 3)
+
+        zip_file = ZipFile(buff)
+        names = zip_file.namelist()
+        self.assertEqual(names, ['part-00001.csv', 'part-00002.csv',
+                                 'part-00003.csv'])
+
+        # Each part has a header
+        lines = self._export().splitlines()
+        parts = [zip_file.read(n).splitlines() for n in names]
+        self.assertEqual([p[0] for p in parts], [lines[0]] * 3)
+        self.assertEqual([l for p in parts for l in p[1:]], lines[1:])
+
+    def test_merge_chunks(self):
+        consumed = []
+        written = []
+
+        def fetch(n):
+            # Later chunks finish first
+            time.sleep((5 - n) * 0.01)
+            return n * 2
+
+        def tasks():
+            for index in range(6):
+                # At most two tasks are pending
+                self.assertTrue(len(consumed) - len(written) < 2)
+                consumed.append(index)
+                yield index, index
+
+        def write(index, output):
+            written.append((index, output))
+
+        pool = ThreadPool(2)
+
+        try:
+            count = parallel.merge_chunks(pool, fetch, tasks(), write, 2)
+        finally:
+            pool.close()
+            pool.join()
+
+        self.assertEqual(count, 6)
+        self.assertEqual(written, [(i, i * 2) for i in range(6)])
+
+    def test_chunk_run_key(self):
+        exporter = export.CSVExporter([self.first_name, self.last_name])
+        exporter.run_key_length = 1
+
+        rows = [('Eric', 'Smith'), ('Eric', 'Smith'), ('Eric', 'Jones'),
+                ('Eric', 'Smith'), ('Erin', 'Smith')]
+
+        # Duplicates of a run are removed across the chunks
+        chunks = parallel.chunk_rows(exporter.filter_rows(rows), 1)
+        self.assertEqual(list(chunks), [[('Eric', 'Smith')],
+                                        [('Eric', 'Jones')],
+                                        [('Erin', 'Smith')]])
+
+    def test_init_worker(self):
+        from avocado.core import utils
+
+        calls = []
+        close_connections = utils.close_connections
+        utils.close_connections = lambda: calls.append(True)
+
+        try:
+            parallel.init_worker('csv', self.view_json)
+        finally:
+            utils.close_connections = close_connections
+
+        # The connections inherited by the worker are closed
+        self.assertEqual(calls, [True])
+        self.assertEqual(parallel._worker, {'args': ('csv', self.view_json)})
+
+
+class ParallelWorkersTestCase(TransactionTestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        # The workers open their own connections which only share the data
+        # of the test with a database on disk
+        if connection.settings_dict['NAME'] == ':memory:':
+            self.skipTest('The test database is in memory')
+
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        last_name = DataField.objects.get(field_name='last_name')\
+            .concepts.all()[0]
+        salary = DataField.objects.get(field_name='salary')\
+            .concepts.all()[0]
+
+        self.view_json = [
+            {'concept': last_name.pk},
+            {'concept': salary.pk, 'sort': 'desc', 'visible': False},
+        ]
+
+    def _export(self, workers, archive=False):
+        buff = StringIO()
+        count = parallel.export('csv', buff, view_json=self.view_json,
+                                tree=models.Employee, include_pk=False,
+                                workers=workers, chunk_size=2,
+                                archive=archive)
+        return count, buff.getvalue()
+
+    def test_workers(self):
+        self.assertEqual(self._export(2), self._export(1))
+
+        count, output = self._export(2, archive=True)
+        zip_file = ZipFile(StringIO(output))
+        self.assertEqual(count, 3)
+        self.assertEqual(zip_file.testzip(), None)
+
+
+@skipUnless(OPTIONAL_DEPS['pyarrow'], 'pyarrow is not installed')
+class ParquetExportTestCase(TestCase):
+    fixtures = ['employee_data.json', 'month_data.json']
+
+    def setUp(self):
+        # Same concepts and query as the other file formats
+        FileExportTestCase.setUp.__func__(self)
+
+    def test_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        exporter = export.registry['parquet'](self.concepts)
+        buff = exporter.write(self.query, row_group_size=4)
+        buff.seek(0)
+
+        parquet_file = pq.ParquetFile(buff)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+
+        table = parquet_file.read()
+        self.assertEqual(table.num_rows, 6)
+        self.assertEqual(table.schema.names, ['first_name', 'last_name',
+                                              'is_manager', 'name', 'salary'])
+        self.assertEqual(table.schema.field('first_name').type, pa.string())
+        self.assertEqual(table.schema.field('is_manager').type, pa.bool_())
+        self.assertEqual(table.schema.field('salary').type, pa.int64())
+
+        rows = list(self.query)
+        self.assertEqual(table.column('first_name').to_pylist(),
+                         [r[0] for r in rows])
+        self.assertEqual(table.column('salary').to_pylist(),
+                         [r[4] for r in rows])
+
+    def test_parquet_empty(self):
+        import pyarrow.parquet as pq
+
+        exporter = export.registry['parquet'](self.concepts)
+        buff = exporter.write(self.query.none())
+        buff.seek(0)
+
+        table = pq.read_table(buff)
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(len(table.schema.names), 5)
+
+    def test_parquet_null_first_batch(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = [
+            ('Eric', 'Smith', None, None, None),
+            ('Erin', 'Jones', None, None, None),
+            ('Mel', 'White', True, 'Analyst', 10000),
+            ('Zac', 'Lee', False, 'Programmer', 20000.0),
+        ]
+
+        exporter = export.registry['parquet'](self.concepts)
+        buff = exporter.write(rows, row_group_size=2)
+        buff.seek(0)
+
+        parquet_file = pq.ParquetFile(buff)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+
+        table = parquet_file.read()
+        self.assertEqual(table.schema.field('is_manager').type, pa.bool_())
+        self.assertEqual(table.schema.field('name').type, pa.string())
+        self.assertEqual(table.schema.field('salary').type, pa.int64())
+        self.assertEqual(table.column('salary').to_pylist(),
+                         [None, None, 10000, 20000])
+
+    def test_parquet_type_drift(self):
+        import pyarrow as pa
+        from decimal import Decimal
+        from avocado.export._parquet import Column
+
+        field = DataField.objects.get_by_natural_key('tests', 'project',
+                                                     'budget')
+        column = Column('budget', field)
+        self.assertEqual(column.type, pa.decimal128(7, 2))
+
+        first = column.get_array([1, 2])
+        second = column.get_array([1.5, Decimal('2.255'), None])
+        self.assertEqual(first.type, second.type)
+        self.assertEqual(second.to_pylist(),
+                         [Decimal('1.50'), Decimal('2.26'), None])
+
+        field = DataField.objects.get_by_natural_key('tests', 'title',
+                                                     'salary')
+        column = Column('salary', field)
+        self.assertEqual(column.get_array([1, 2.0]).to_pylist(), [1, 2])
+        self.assertRaises(ValueError, column.get_array, [1.5])
+
+    def test_parquet_lexicon(self):
+        import json
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        field = DataField.objects.get_by_natural_key('tests', 'month', 'id')
+        concept = DataConcept.objects.create(name='Month')
+        DataConceptField(concept=concept, field=field, order=1).save()
+
+        view = DataView(json=[{'concept': concept.pk}])
+        processor = pipeline.QueryProcessor(view=view, tree=models.Month,
+                                            include_pk=False)
+        exporter = processor.get_exporter(export.registry['parquet'])
+
+        # No rows
+        buff = exporter.write([])
+        buff.seek(0)
+
+        table = pq.read_table(buff)
+        self.assertEqual(table.num_rows, 0)
+        self.assertTrue(pa.types.is_dictionary(table.schema.field('id').type))
+
+        buff = exporter.write(processor.get_iterable())
+        buff.seek(0)
+
+        table = pq.read_table(buff)
+        schema_field = table.schema.field('id')
+        self.assertTrue(pa.types.is_dictionary(schema_field.type))
+
+        labels = list(models.Month.objects.values_list('label', flat=True))
+        self.assertEqual(table.column('id').to_pylist(), labels)
+
+        codes = list(models.Month.objects.values_list('code', flat=True))
+        self.assertEqual(json.loads(schema_field.metadata['codes']), codes)
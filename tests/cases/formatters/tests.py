@@ -5,7 +5,7 @@ except ImportError:
 from django.test import TestCase
 from django.core import management
 from avocado.models import DataField, DataConcept, DataConceptField
-from avocado.formatters import Formatter
+from avocado.formatters import Formatter, RawFormatter
 
 
 __all__ = ['FormatterTestCase']
@@ -91,3 +91,55 @@ class FormatterTestCase(TestCase):
             ('title__name', 'one'),
             ('project__name', 'two'),
         ]), f(['one', 'two']))
+
+    def test_compile(self):
+        rows = [
+            self.values,
+            ['CTO', None, False],
+            ['Analyst', '20000', None],
+        ]
+
+        for formats in (['string'], ['number'], ['boolean'], ['coded'],
+                        ['boolean', 'number', 'string']):
+            func = self.f.compile(formats)
+            for row in rows:
+                self.assertEqual(func(row), self.f(row, formats))
+
+    def test_compile_multiple(self):
+        class HtmlFormatter(Formatter):
+            def to_html(self, values, **context):
+                fvalues = self(values, preferred_formats=['string'])
+                return '<span>{0}</span>'.format('</span><span>'.join(fvalues.values()))
+            to_html.process_multiple = True
+
+        f = HtmlFormatter(self.concept)
+        func = f.compile(['html'])
+        self.assertEqual(func(self.values), f(self.values, ['html']))
+
+        self.assertFalse(f.is_flat(['html']))
+        self.assertTrue(f.is_flat(['string']))
+
+    def test_compile_call(self):
+        class UpperFormatter(Formatter):
+            def __call__(self, values, *args, **kwargs):
+                output = super(UpperFormatter, self).__call__(
+                    values, *args, **kwargs)
+                return OrderedDict((k, unicode(v).upper())
+                                   for k, v in output.items())
+
+        f = UpperFormatter(self.concept)
+        func = f.compile(['string'])
+        self.assertEqual(func(self.values), f(self.values, ['string']))
+        self.assertFalse(f.is_flat(['string']))
+
+        # Formatters defining their own compiled functions are not affected
+        self.assertTrue(RawFormatter(self.concept).is_flat())
+
+    def test_compile_flat(self):
+        row = ['pk'] + self.values
+
+        for formats in (['string'], ['number'], ['boolean', 'string']):
+            func = self.f.compile_flat(formats, offset=1)
+            output = []
+            func(row, output)
+            self.assertEqual(output, self.f(self.values, formats).values())
@@ -4,6 +4,7 @@ try:
 except ImportError:
     from ordereddict import OrderedDict
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.core import management
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
@@ -11,6 +12,8 @@ from django.contrib.auth.models import User
 from guardian.shortcuts import assign
 from avocado.models import (DataField, DataConcept, DataConceptField,
     DataContext, DataView, DataQuery, DataCategory)
+from avocado import metadata
+from avocado.formatters import Formatter
 from ...models import Employee
 
 
@@ -38,6 +41,157 @@ class ModelInstanceCacheTestCase(TestCase):
         self.assertGreater(len(queryset), 0)
         self.assertEqual(queryset._result_cache[0].pk, pk)
 
+        with self.assertNumQueries(0):
+            self.assertEqual(DataField.objects.get(pk=pk), self.is_manager)
+
+        # Other conditions are not answered by the cache
+        with self.assertNumQueries(1):
+            DataField.objects.published().filter(pk=pk).exists()
+
+    def test_datafield_natural_key_cache(self):
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            DataField.objects.get_by_natural_key('tests', 'employee',
+                                                 'is_manager')
+
+        with self.assertNumQueries(0):
+            field = DataField.objects.get_by_natural_key('tests.employee.'
+                                                         'is_manager')
+            self.assertEqual(field, self.is_manager)
+
+        # Out of date index entries are ignored
+        DataField.objects.filter(pk=field.pk).update(field_name='foo')
+        self.assertRaises(DataField.DoesNotExist,
+                          DataField.objects.get_by_natural_key,
+                          'tests', 'employee', 'is_manager')
+
+        field = DataField.objects.get_by_natural_key('tests.employee.foo')
+        self.assertEqual(field.pk, self.is_manager.pk)
+
+        field.delete()
+        self.assertRaises(DataField.DoesNotExist,
+                          DataField.objects.get_by_natural_key,
+                          'tests', 'employee', 'foo')
+
+    def test_dataconcept_ident_cache(self):
+        concept = DataConcept(name='Manager', ident='manager')
+        concept.save()
+        self.assertEqual(DataConcept.objects.get(ident='manager'), concept)
+
+        # The `ident` is not unique so lookups are not cached
+        DataConcept(name='Manager', ident='manager').save()
+        self.assertRaises(DataConcept.MultipleObjectsReturned,
+                          DataConcept.objects.get, ident='manager')
+
+    def test_cache_modifiers(self):
+        DataField.objects.get(pk=self.is_manager.pk)
+
+        with self.assertNumQueries(1):
+            DataField.objects.select_for_update().get(pk=self.is_manager.pk)
+
+        with self.assertNumQueries(1):
+            field = DataField.objects.defer('description')\
+                .get(pk=self.is_manager.pk)
+            self.assertEqual(field.pk, self.is_manager.pk)
+
+    def test_pk_in_cache(self):
+        cache.clear()
+
+        fields = DataField.objects.all()[:3]
+        pks = [f.pk for f in reversed(fields)]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(sorted(DataField.objects.in_bulk(pks)),
+                             sorted(pks))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(sorted(DataField.objects.in_bulk(pks)),
+                             sorted(pks))
+
+            queryset = DataField.objects.order_by().filter(pk__in=pks)
+            self.assertEqual([f.pk for f in queryset], pks)
+
+
+class MetadataSnapshotTestCase(TestCase):
+    fixtures = ['models.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        self.is_manager = DataField.objects.get_by_natural_key('tests', 'employee', 'is_manager')
+        self.concept = DataConcept.objects.get(fields=self.is_manager)
+
+    def test_lookups(self):
+        snapshot = metadata.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(metadata.get_snapshot() is snapshot)
+
+            field = metadata.get_field('tests.employee.is_manager')
+            self.assertEqual(field, self.is_manager)
+            self.assertEqual(metadata.get_field(field.pk), field)
+            self.assertEqual(metadata.get_field('is_manager',
+                                                concept=self.concept), field)
+
+            self.assertRaises(DataField.DoesNotExist, metadata.get_field,
+                              'tests.employee.foo')
+            # Both employee and title have a `name` field
+            self.assertRaises(DataField.MultipleObjectsReturned,
+                              metadata.get_field, 'name')
+
+            self.assertEqual(metadata.get_concept(pk=self.concept.pk),
+                             self.concept)
+            self.assertEqual(metadata.get_concepts([self.concept.pk, 0]),
+                             [self.concept])
+
+            groups = metadata.get_fields_for_concepts([self.concept.pk])
+            self.assertEqual(groups.items(), [(self.concept.pk, [field])])
+
+            formatter = Formatter(self.concept)
+            self.assertEqual(formatter.keys, ['is_manager'])
+
+    def test_rebuild(self):
+        snapshot = metadata.get_snapshot()
+
+        self.concept.ident = 'manager'
+        self.concept.save()
+
+        self.assertFalse(metadata.get_snapshot() is snapshot)
+        self.assertEqual(metadata.get_concept(ident='manager'), self.concept)
+
+    def test_data_version(self):
+        snapshot = metadata.get_snapshot()
+        version = metadata.get_version()
+
+        DataField.objects.filter(pk=self.is_manager.pk)\
+            .update(data_version=5)
+        metadata.increment_data_version()
+
+        # The data versions are reloaded without rebuilding the snapshot
+        with self.assertNumQueries(1):
+            self.assertTrue(metadata.get_snapshot() is snapshot)
+
+        self.assertEqual(metadata.get_version(), version)
+        self.assertEqual(metadata.get_field(self.is_manager.pk).data_version,
+                         5)
+
+    @override_settings(AVOCADO_METADATA_SNAPSHOT_CHECK_INTERVAL=60)
+    def test_check_interval(self):
+        snapshot = metadata.get_snapshot()
+
+        # A change by another process is only seen once the interval passes
+        cache.incr(metadata.VERSION_CACHE_KEY)
+        self.assertTrue(metadata.get_snapshot() is snapshot)
+
+        snapshot.checked -= 60
+        self.assertFalse(metadata.get_snapshot() is snapshot)
+
+    @override_settings(AVOCADO_METADATA_SNAPSHOT_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual(metadata.get_snapshot(), None)
+        self.assertEqual(metadata.get_field('tests.employee.is_manager'),
+                         self.is_manager)
+
 
 class DataFieldTestCase(TestCase):
     fixtures = ['models.json']
@@ -1,3 +1,7 @@
 from .operators import *
 from .parsers import *
 from .translators import *
+from .plans import *
+from .counts import *
+from .keysets import *
+from .buffers import *
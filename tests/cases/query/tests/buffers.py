@@ -0,0 +1,181 @@
+import time
+from django.test import TestCase
+from django.core import management
+from avocado.models import DataContext, DataView, DataField
+from avocado.query import buffers
+from avocado.query.pipeline import QueryProcessor
+from ....models import Employee
+
+__all__ = ('RowBufferTestCase', 'BufferManagerTestCase')
+
+
+class Fetcher(object):
+    "Fetches from a list of integers and records the calls."
+    def __init__(self, count):
+        self.rows = range(count)
+        self.calls = []
+
+    def __call__(self, offset, limit):
+        self.calls.append((offset, limit))
+        return self.rows[offset:offset + limit]
+
+
+class RowBufferTestCase(TestCase):
+    def test_slide(self):
+        fetch = Fetcher(100)
+        buff = buffers.RowBuffer(fetch)
+
+        buff.slide(50, 10)
+        self.assertEqual(buff.rows, range(50, 60))
+        self.assertEqual(fetch.calls, [(50, 10)])
+
+        # Only the end segment is fetched
+        buff.slide(55, 10)
+        self.assertEqual(buff.rows, range(55, 65))
+        self.assertEqual(fetch.calls[1:], [(60, 5)])
+
+        # Only the start segment is fetched
+        buff.slide(45, 10)
+        self.assertEqual(buff.rows, range(45, 55))
+        self.assertEqual(fetch.calls[2:], [(45, 10)])
+
+        # Both segments
+        buff.slide(40, 20)
+        self.assertEqual(buff.rows, range(40, 60))
+        self.assertEqual(fetch.calls[3:], [(40, 5), (55, 5)])
+
+        # Within the window
+        buff.slide(42, 5)
+        self.assertEqual(buff.rows, range(42, 47))
+        self.assertEqual(len(fetch.calls), 5)
+
+        # No overlap
+        buff.slide(80, 10)
+        self.assertEqual(buff.rows, range(80, 90))
+        self.assertEqual(fetch.calls[5:], [(80, 10)])
+
+    def test_end(self):
+        fetch = Fetcher(25)
+        buff = buffers.RowBuffer(fetch)
+
+        buff.slide(20, 10)
+        self.assertEqual(buff.rows, range(20, 25))
+        self.assertEqual(buff.total, 25)
+
+        self.assertTrue(buff.contains(20, 10))
+        self.assertTrue(buff.contains(22, 10))
+        self.assertFalse(buff.contains(10, 10))
+
+        # The end is known so no rows are fetched past it
+        buff.slide(22, 10)
+        self.assertEqual(buff.rows, range(22, 25))
+        self.assertEqual(len(fetch.calls), 1)
+
+
+class BufferManagerTestCase(TestCase):
+    def test_prefetch(self):
+        manager = buffers.BufferManager(max_rows=100, prefetch_pages=2,
+                                        prefetch_async=False)
+        fetch = Fetcher(100)
+
+        self.assertEqual(manager.get_page('a', fetch, 1, 10), range(10))
+        self.assertEqual(manager.misses, 1)
+        self.assertEqual(fetch.calls, [(0, 10), (10, 20)])
+
+        # Served from the buffer and the next page is prefetched
+        self.assertEqual(manager.get_page('a', fetch, 2, 10), range(10, 20))
+        self.assertEqual(manager.hits, 1)
+        self.assertEqual(fetch.calls[2:], [(30, 10)])
+
+        # Going back a page is also served from the buffer
+        self.assertEqual(manager.get_page('a', fetch, 1, 10), range(10))
+        self.assertEqual(manager.hits, 2)
+
+    def test_async(self):
+        manager = buffers.BufferManager(max_rows=100, prefetch_pages=2,
+                                        prefetch_async=True)
+        fetch = Fetcher(100)
+
+        manager.get_page('a', fetch, 1, 10)
+
+        buff = manager.get_buffer('a', fetch)
+        for i in range(50):
+            if not buff.prefetching:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(buff.rows, range(30))
+        self.assertEqual(manager.get_page('a', fetch, 3, 10), range(20, 30))
+        self.assertEqual(manager.hits, 1)
+
+    def test_evict(self):
+        manager = buffers.BufferManager(max_rows=50, prefetch_pages=1,
+                                        prefetch_async=False)
+        fetch = Fetcher(100)
+
+        manager.get_page('a', fetch, 1, 10)
+        manager.get_page('b', fetch, 1, 10)
+        self.assertEqual(manager.rows(), 40)
+
+        # The least recently used buffer is evicted
+        manager.get_page('c', fetch, 1, 10)
+        self.assertFalse('a' in manager)
+        self.assertTrue('b' in manager)
+        self.assertTrue('c' in manager)
+        self.assertEqual(manager.evictions, 1)
+
+        # The buffer in use is never evicted
+        manager.get_page('c', fetch, 1, 60)
+        self.assertEqual(list(manager._buffers), ['c'])
+
+    def test_processor(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        concept = DataField.objects.get(field_name='first_name')\
+            .concepts.all()[0]
+        view = DataView(json=[{'concept': concept.pk}])
+
+        manager = buffers.buffer_manager
+        manager.clear()
+
+        processor = QueryProcessor(view=view, tree=Employee)
+        rows = list(processor.get_iterable())
+
+        prefetch_async = manager._prefetch_async
+        manager._prefetch_async = False
+
+        try:
+            self.assertEqual(processor.get_page(1, 2, session_key='a'),
+                             rows[:2])
+            self.assertEqual(processor.get_page(2, 2, session_key='a'),
+                             rows[2:4])
+            self.assertEqual(processor.get_page(3, 2, session_key='b'),
+                             rows[4:6])
+        finally:
+            manager._prefetch_async = prefetch_async
+            manager.clear()
+
+    def test_unversioned(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        concept = DataField.objects.get(field_name='first_name')\
+            .concepts.all()[0]
+        view = DataView(json=[{'concept': concept.pk}])
+
+        cxt = DataContext(json={'field': 'tests.title.salary',
+                                'operator': 'gt', 'value': 10000})
+        cxt.save()
+
+        # Composite contexts are not versioned so the rows are not buffered
+        composite = DataContext(json={'composite': cxt.pk})
+        self.assertEqual(buffers.buffer_key(composite.json, view.json,
+                                            tree=Employee), None)
+
+        manager = buffers.buffer_manager
+        manager.clear()
+
+        processor = QueryProcessor(context=composite, view=view,
+                                   tree=Employee)
+        rows = list(processor.get_iterable())
+
+        self.assertEqual(processor.get_page(1, 2, session_key='a'),
+                         rows[:2])
+        self.assertEqual(len(manager), 0)
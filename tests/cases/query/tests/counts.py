@@ -0,0 +1,109 @@
+import time
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core import management
+from django.core.cache import cache
+from avocado import metadata
+from avocado.core.cache import invalidation
+from avocado.query import counts
+from avocado.models import DataContext, DataQuery, DataField, DataConcept
+from ....models import Employee
+
+__all__ = ('CountServiceTestCase',)
+
+
+@override_settings(AVOCADO_DATA_CACHE_ENABLED=True,
+                   AVOCADO_QUERY_COUNT_REFRESH_ASYNC=False)
+class CountServiceTestCase(TestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        cache.clear()
+
+        self.context_json = {
+            'field': 'tests.title.salary',
+            'operator': 'gt',
+            'value': 10000,
+        }
+
+        concept = DataConcept.objects.get(fields__field_name='first_name')
+        self.view_json = [{'concept': concept.pk}]
+
+    def incr_version(self):
+        DataField.objects.filter(field_name='salary')\
+            .update(data_version=2)
+        metadata.increment_data_version()
+
+    def test_context(self):
+        cxt = DataContext(self.context_json)
+        cxt.save()
+
+        count = cxt.apply(tree=Employee).count()
+        self.assertEqual(cxt.get_count(tree=Employee), count)
+        self.assertEqual(DataContext.objects.get(pk=cxt.pk).count, count)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cxt.get_count(tree=Employee), count)
+
+        # Recomputed once the data version of the field changes
+        self.incr_version()
+        DataContext.objects.filter(pk=cxt.pk).update(count=None)
+
+        self.assertEqual(cxt.get_count(tree=Employee), count)
+        self.assertEqual(DataContext.objects.get(pk=cxt.pk).count, count)
+
+    def test_query(self):
+        query = DataQuery({'context': self.context_json,
+                           'view': self.view_json})
+
+        self.assertEqual(query.get_distinct_count(tree=Employee),
+                         query.context.apply(tree=Employee).count())
+        self.assertEqual(query.get_record_count(tree=Employee),
+                         query.apply(tree=Employee).count())
+        self.assertEqual(query.distinct_count, query.record_count)
+
+        with self.assertNumQueries(0):
+            query.get_distinct_count(tree=Employee)
+            query.get_record_count(tree=Employee)
+
+    def test_empty_context(self):
+        cxt = DataContext({})
+        count = Employee.objects.count()
+
+        self.assertEqual(cxt.get_count(tree=Employee), count)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cxt.get_count(tree=Employee), count)
+
+        # Rows of the root model change the count without any conditions
+        employee = Employee.objects.all()[0]
+        employee.pk = None
+        employee.save()
+        invalidation.touch(Employee)
+
+        self.assertEqual(cxt.get_count(tree=Employee), count + 1)
+
+    def test_unversioned(self):
+        # Without any fields of the root model, only the global data version
+        # invalidates the count
+        DataField.objects.all().delete()
+        self.assertEqual(counts.get_versions({}, tree=Employee),
+                         [('data', metadata.get_data_version())])
+
+    @override_settings(AVOCADO_QUERY_COUNT_REFRESH_ASYNC=True)
+    def test_refresh_async(self):
+        self.assertEqual(counts.get_count('test', lambda: 1,
+                                          self.context_json), 1)
+
+        self.incr_version()
+
+        # The stale count is served while it is recomputed
+        self.assertEqual(counts.get_count('test', lambda: 2,
+                                          self.context_json), 1)
+
+        while counts._pending:
+            time.sleep(0.01)
+
+        self.assertEqual(counts.get_count('test', lambda: 3,
+                                          self.context_json), 2)
@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.core import management
+from avocado.models import DataView, DataConcept, DataField
+from avocado.query import keysets
+from avocado.query.pipeline import QueryProcessor
+from ....models import Employee
+
+__all__ = ('KeysetTestCase',)
+
+
+class KeysetTestCase(TestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+
+        self.first_name = DataField.objects.get(field_name='first_name')\
+            .concepts.all()[0]
+        self.salary = DataConcept.objects.get(fields__field_name='salary')
+
+    def _pages(self, processor, limit):
+        rows = []
+        after = None
+
+        while True:
+            iterable = processor.get_iterable(keyset=True, after=after,
+                                              limit=limit)
+            page = list(iterable)
+
+            if not page:
+                break
+
+            self.assertTrue(len(page) <= limit)
+            rows.extend(page)
+            after = iterable.cursor
+
+        return rows
+
+    def test_pages(self):
+        for direction in ('asc', 'desc'):
+            view = DataView(json=[
+                {'concept': self.first_name.pk},
+                {'concept': self.salary.pk, 'sort': direction,
+                 'visible': False},
+            ])
+            processor = QueryProcessor(view=view, tree=Employee)
+            rows = list(processor.get_iterable())
+
+            for limit in (1, 2, 4, 10):
+                self.assertEqual(self._pages(processor, limit), rows)
+
+    def test_nulls(self):
+        Employee.objects.filter(pk__in=[2, 5]).update(title=None)
+
+        for direction in ('asc', 'desc'):
+            queryset = Employee.objects.values_list('pk')\
+                .order_by(direction == 'desc' and '-title__salary' or
+                          'title__salary', 'pk')
+            rows = [tuple(r) for r in queryset]
+
+            pages = []
+            cursor = None
+
+            for i in range(3):
+                iterable = keysets.seek(queryset, key=cursor, limit=2)
+                pages.extend(iterable)
+                cursor = iterable.cursor
+
+            self.assertEqual(pages, rows)
+
+    def test_default_ordering(self):
+        queryset = Employee.objects.all()
+        self.assertEqual(keysets.get_ordering(queryset), [('id', False)])
+
+        iterable = keysets.seek(queryset, limit=4)
+        rows = list(iterable)
+        self.assertEqual([r[0] for r in rows], [1, 2, 3, 4])
+        self.assertEqual(len(rows[0]), len(Employee._meta.fields))
+        self.assertEqual(iterable.key, (4,))
+
+        rows = list(keysets.seek(queryset, key=iterable.cursor))
+        self.assertEqual([r[0] for r in rows], [5, 6])
+
+    def test_invalid(self):
+        queryset = Employee.objects.all()
+
+        self.assertRaises(keysets.InvalidCursor, keysets.seek, queryset,
+                          'foo')
+        self.assertRaises(keysets.InvalidCursor, keysets.seek, queryset,
+                          (1, 2))
+        self.assertRaises(ValueError, keysets.seek,
+                          queryset.order_by('?'))
+        self.assertRaises(ValueError, QueryProcessor(tree=Employee)
+                          .get_iterable, offset=2, keyset=True)
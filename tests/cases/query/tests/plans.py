@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.core import management
+from avocado.query import plans
+from avocado.models import DataContext, DataView, DataQuery, DataField, \
+    DataConcept
+from ....models import Employee
+
+__all__ = ('QueryPlanTestCase',)
+
+
+class QueryPlanTestCase(TestCase):
+    fixtures = ['employee_data.json']
+
+    def setUp(self):
+        management.call_command('avocado', 'init', 'tests', quiet=True)
+        plans.plan_cache.clear()
+
+        self.context_json = {
+            'type': 'and',
+            'children': [{
+                'field': 'tests.title.name',
+                'operator': 'exact',
+                'value': 'CEO',
+            }, {
+                'field': 'tests.employee.first_name',
+                'operator': 'exact',
+                'value': 'John',
+            }]
+        }
+
+        concept = DataConcept.objects.get(fields__field_name='first_name')
+        self.view_json = [{'concept': concept.pk, 'sort': 'desc'}]
+
+    def test_context(self):
+        context = DataContext(self.context_json)
+        sql = context.sql(tree=Employee)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(context.sql(tree=Employee), sql)
+            language = context.language(tree=Employee)
+
+        self.assertEqual(language, context.parse(tree=Employee).language)
+        self.assertEqual(plans.plan_cache.hits, 2)
+        self.assertEqual(len(plans.plan_cache), 1)
+
+        # Returned language is a copy
+        context.language(tree=Employee)['type'] = 'or'
+        self.assertEqual(context.language(tree=Employee)['type'], 'and')
+
+    def test_data_version(self):
+        context = DataContext(self.context_json)
+        context.apply(tree=Employee)
+
+        DataField.objects.filter(field_name='first_name')\
+            .update(data_version=2)
+        # Bulk updates require the version to be incremented explicitly
+        from avocado import metadata
+        metadata.increment_data_version()
+
+        context.apply(tree=Employee)
+        self.assertEqual(plans.plan_cache.hits, 0)
+        self.assertEqual(len(plans.plan_cache), 2)
+
+    def test_composite(self):
+        context = DataContext(self.context_json)
+        context.save()
+
+        composite = DataContext({'composite': context.pk})
+        composite.apply(tree=Employee)
+        composite.apply(tree=Employee)
+        self.assertEqual(len(plans.plan_cache), 0)
+
+    def test_view(self):
+        view = DataView(self.view_json)
+        sql = view.sql(tree=Employee)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(view.sql(tree=Employee), sql)
+
+        self.assertEqual(plans.plan_cache.hits, 1)
+
+    def test_query(self):
+        query = DataQuery({'context': self.context_json,
+                           'view': self.view_json})
+        sql = query.sql(tree=Employee)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(query.sql(tree=Employee), sql)
+
+        self.assertEqual(str(query.apply(tree=Employee).query),
+                         str(query.parse(tree=Employee)
+                             .apply(queryset=Employee.objects.all()).query))
@@ -35,6 +35,31 @@ class AggregatorTestCase(TestCase):
         # We just flushed the cache so it should not be cached anymore
         self.assertFalse(self.is_manager.count.cached(self.is_manager))
 
+    @override_settings(AVOCADO_DATA_CACHE_ENABLED=True)
+    def test_count_args_cached(self):
+        self.is_manager.count.flush(self.is_manager, 'is_manager')
+        self.is_manager.count.flush(self.is_manager, 'is_manager',
+                                    distinct=True)
+
+        expected = [{'values': [False], 'count': 5},
+                    {'values': [True], 'count': 1}]
+
+        self.assertEqual(self.is_manager.count('is_manager'), expected)
+        self.assertTrue(self.is_manager.count.cached(self.is_manager,
+                                                     'is_manager'))
+        self.assertFalse(self.is_manager.count.cached(self.is_manager,
+                                                      'is_manager',
+                                                      distinct=True))
+        self.assertFalse(self.is_manager.count.cached(self.is_manager))
+
+        # The cached results are evaluated
+        with self.assertNumQueries(0):
+            self.assertEqual(self.is_manager.count('is_manager'), expected)
+
+        self.is_manager.count.flush(self.is_manager, 'is_manager')
+        self.assertFalse(self.is_manager.count.cached(self.is_manager,
+                                                      'is_manager'))
+
     def test_max(self):
         self.assertEqual(self.is_manager.max(), [{'max': 1}])
         self.assertEqual(self.salary.max(), [{'max': 200000}])
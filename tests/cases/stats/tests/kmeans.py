@@ -4,7 +4,7 @@ from django.test import TestCase
 from avocado.stats import kmeans
 from itertools import chain
 
-__all__ = ('KmeansTestCase',)
+__all__ = ('KmeansTestCase', 'KmeansFallbackTestCase')
 
 random_points_file = open(
         os.path.join(os.path.dirname(__file__), 
@@ -339,3 +339,135 @@ class KmeansTestCase(TestCase):
         centroid_counts, _ = kmeans.weighted_counts(int_points, counts, 3)
         m_counts = [c['count'] for c in centroid_counts]
         self.assertSequenceEqual(expected_counts, m_counts)
+
+    def test_array_engine(self):
+        if kmeans.numpy is None:
+            return
+
+        array_result = kmeans.kmeans_optm(random_points_3d, k=5)
+        array_outliers = kmeans.find_outliers(int_points, normalized=False)
+
+        numpy = kmeans.numpy
+        kmeans.numpy = None
+
+        try:
+            result = kmeans.kmeans_optm(random_points_3d, k=5)
+            outliers = kmeans.find_outliers(int_points, normalized=False)
+        finally:
+            kmeans.numpy = numpy
+
+        self.assertEqual(result, array_result)
+        self.assertEqual(outliers, array_outliers)
+
+    def test_kmeans_stream(self):
+        random.seed(0)
+        result = kmeans.kmeans_stream(int_points_3d, 3, batch_size=50)
+
+        self.assertTrue(len(result['centroids']) <= 3)
+        self.assertEqual(len(result['indexes']), len(int_points_3d))
+        self.assertEqual(len(result['distances']), len(int_points_3d))
+
+        # The points with values of 100 are the outliers.
+        expected_outliers = [i for i, p in enumerate(int_points_3d)
+                             if 100 in p]
+        self.assertSequenceEqual(expected_outliers, result['outliers'])
+
+        for centroid in result['centroids']:
+            for value in centroid:
+                self.assertTrue(1 - EPSILON_10 <= value <= 100 + EPSILON_10)
+
+        # Single pass iterators only produce the centroids.
+        random.seed(0)
+        result = kmeans.kmeans_stream(iter(int_points), 3, batch_size=50)
+
+        self.assertTrue(len(result['centroids']) <= 3)
+        self.assertEqual(result['indexes'], None)
+        self.assertEqual(result['distances'], None)
+        self.assertEqual(result['outliers'], [])
+
+        self.assertRaises(ValueError, kmeans.kmeans_stream, iter([]), 3)
+        self.assertRaises(ValueError, kmeans.kmeans_stream, int_points, 0)
+
+    def test_kmeans_stream_sorted(self):
+        rng = random.Random(0)
+        points = sorted(rng.gauss(center, 1)
+                        for center in (0, 50, 100) for _ in xrange(5000))
+
+        # The first batches only contain points of the first cluster
+        for data in (points, iter(points)):
+            result = kmeans.kmeans_stream(data, 3, batch_size=1000, seed=0)
+            centroids = sorted(result['centroids'])
+
+            self.assertEqual(len(centroids), 3)
+            for centroid, center in zip(centroids, (0, 50, 100)):
+                self.assertTrue(abs(centroid - center) < 1)
+
+    def test_sample_stream(self):
+        points = range(100)
+        sample, std, flat = kmeans.sample_stream(
+            kmeans.iter_batches(points, 7), 10, random.Random(0))
+
+        self.assertTrue(flat)
+        self.assertEqual(len(sample), 10)
+        self.assertTrue(set(sample) <= set(points))
+        self.assertAlmostEqual(std[0], kmeans.std_dev(points))
+
+    def test_minibatch_update(self):
+        centroids = [[0.0, 0.0], [10.0, 10.0]]
+        counts = [1, 3]
+
+        centroids, counts = kmeans.minibatch_update(
+            [[1.0, 1.0], [2.0, 2.0], [11.0, 11.0]], centroids, counts)
+
+        self.assertSequenceAlmostEqual([[1.0, 1.0], [10.25, 10.25]],
+                                       centroids)
+        self.assertSequenceEqual([3, 4], counts)
+
+    def test_kmeans_plus_plus(self):
+        centroids = kmeans.kmeans_plus_plus(
+            int_points_3d, 3, random.Random(0))
+
+        # Each of the initial centroids is chosen from a distinct cluster
+        # since the points within a cluster are identical.
+        self.assertEqual(len(centroids), 3)
+        self.assertEqual(len(set(tuple(c) for c in centroids)), 3)
+
+        # Fewer centroids are returned when there are not enough distinct
+        # points.
+        self.assertEqual(len(kmeans.kmeans_plus_plus([1, 1, 1], 3)), 1)
+
+        self.assertRaises(ValueError, kmeans.kmeans_plus_plus, [], 3)
+
+    def test_kmeans_seed(self):
+        result1 = kmeans.kmeans(random_points_3d, 3, init='k-means++', seed=1)
+        result2 = kmeans.kmeans(random_points_3d, 3, init='k-means++', seed=1)
+        self.assertEqual(result1, result2)
+
+        result1 = kmeans.kmeans(random_points_3d, 3, seed=1)
+        result2 = kmeans.kmeans(random_points_3d, 3, seed=1)
+        self.assertEqual(result1, result2)
+
+        self.assertRaises(ValueError, kmeans.kmeans, random_points_3d, 3,
+                          init='unknown')
+
+    def test_kmeans_optm_restarts(self):
+        clean_points = [p for p in int_points_3d if 100 not in p]
+
+        result = kmeans.kmeans_optm(clean_points, k=3, restarts=3, seed=0)
+        parallel = kmeans.kmeans_optm(clean_points, k=3, restarts=3, seed=0,
+                                      processes=2)
+
+        self.assertEqual(result, parallel)
+        self.assertSequenceAlmostEqual(
+            [[1., 1., 1.], [2., 2., 2.], [3., 3., 3.]],
+            sorted(result['centroids']))
+
+
+class KmeansFallbackTestCase(KmeansTestCase):
+    "Runs the k-means tests against the pure Python implementation."
+    def setUp(self):
+        self.numpy = kmeans.numpy
+        kmeans.numpy = None
+
+    def tearDown(self):
+        kmeans.numpy = self.numpy
@@ -2,6 +2,8 @@ import os
 import sys
 from django.test import TestCase
 from django.core import management
+from django.core.cache import cache
+from django.test.utils import override_settings
 from avocado.models import DataField, DataConcept, DataContext, DataView
 
 __all__ = ('CommandsTestCase',)
@@ -10,6 +12,8 @@ class CommandsTestCase(TestCase):
     fixtures = ['employee_data.json', 'legacy.json']
 
     def setUp(self):
+        # Instances cached by previous tests are not rolled back
+        cache.clear()
         self.stdout = sys.stdout
         sys.stdout = open(os.devnull, 'w')
 
@@ -38,6 +42,33 @@ class CommandsTestCase(TestCase):
         # to get incremented.
         self.assertEqual(DataField.objects.filter()[:1].get().data_version, 2)
 
+    @override_settings(AVOCADO_DATA_CACHE_ENABLED=True)
+    def test_cache(self):
+        from avocado.management.subcommands.cache import is_stale, \
+            cache_field, get_methods
+
+        # Methods that do not apply to this field, such as `avg`, are
+        # skipped. SQLite does not support `stddev` for numeric fields.
+        methods = ('size', 'values', 'labels', 'avg', 'sum')
+
+        management.call_command('avocado', 'init', 'tests')
+        field = DataField.objects.get_by_natural_key('tests', 'title', 'name')
+        self.assertEqual(get_methods(field, methods),
+                         ['size', 'values', 'labels'])
+        self.assertTrue(is_stale(field, methods))
+
+        management.call_command('avocado', 'cache', 'tests', only_stale=True,
+                                methods=methods)
+        self.assertFalse(is_stale(field, methods))
+
+        # Already cached methods are skipped
+        timings = cache_field(field.pk, methods)
+        self.assertEqual(timings, [(m, None) for m in methods[:3]])
+
+        timings = cache_field(field.pk, ['size'], flush=True)
+        self.assertEqual(timings[0][0], 'size')
+        self.assertNotEqual(timings[0][1], None)
+
     def test_init(self):
         management.call_command('avocado', 'init', 'tests')
         self.assertEqual(DataField.objects.filter(published=True).count(), 18)